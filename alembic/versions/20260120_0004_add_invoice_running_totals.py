@@ -0,0 +1,71 @@
+"""add invoice running totals
+
+Revision ID: 20260120_0004
+Revises: 20260120_0003
+Create Date: 2026-01-20 00:04:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0004"
+down_revision = "20260120_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "invoices",
+        sa.Column("total_paid", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "invoices",
+        sa.Column("balance", sa.Numeric(12, 2), nullable=False, server_default="0"),
+    )
+
+    # Backfill running totals and the derived status from existing payments
+    op.execute(
+        """
+        UPDATE invoices
+        SET total_paid = paid.total
+        FROM (
+            SELECT invoice_id, SUM(amount) AS total
+            FROM payments
+            GROUP BY invoice_id
+        ) AS paid
+        WHERE paid.invoice_id = invoices.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE invoices
+        SET balance = amount - total_paid,
+            status = CASE
+                WHEN status = 'cancelled' THEN status
+                WHEN amount - total_paid <= 0 THEN 'paid'
+                WHEN total_paid > 0 THEN 'partially_paid'
+                ELSE 'pending'
+            END
+        """
+    )
+    # Every insert must provide the balance explicitly from here on
+    op.alter_column("invoices", "balance", server_default=None)
+
+    op.create_index("ix_invoices_school_status", "invoices", ["school_id", "status"])
+    # Outstanding-balance filters only ever target open invoices
+    op.create_index(
+        "ix_invoices_open_balance",
+        "invoices",
+        ["school_id", "balance"],
+        postgresql_where=sa.text("status IN ('pending', 'partially_paid')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_invoices_open_balance", table_name="invoices")
+    op.drop_index("ix_invoices_school_status", table_name="invoices")
+    op.drop_column("invoices", "balance")
+    op.drop_column("invoices", "total_paid")
@@ -0,0 +1,31 @@
+"""add keyset pagination indexes
+
+Revision ID: 20260120_0005
+Revises: 20260120_0004
+Create Date: 2026-01-20 00:05:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20260120_0005"
+down_revision = "20260120_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filtered list endpoints page by id: (filter column, id) lets the
+    # planner seek straight to the cursor and read rows already in order
+    op.create_index("ix_students_school_id_id", "students", ["school_id", "id"])
+    op.create_index("ix_invoices_school_id_id", "invoices", ["school_id", "id"])
+    op.create_index("ix_invoices_student_id_id", "invoices", ["student_id", "id"])
+    op.create_index("ix_payments_invoice_id_id", "payments", ["invoice_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payments_invoice_id_id", table_name="payments")
+    op.drop_index("ix_invoices_student_id_id", table_name="invoices")
+    op.drop_index("ix_invoices_school_id_id", table_name="invoices")
+    op.drop_index("ix_students_school_id_id", table_name="students")
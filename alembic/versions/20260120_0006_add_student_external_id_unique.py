@@ -0,0 +1,28 @@
+"""add unique (school_id, external_id) on students
+
+Revision ID: 20260120_0006
+Revises: 20260120_0005
+Create Date: 2026-01-20 00:06:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20260120_0006"
+down_revision = "20260120_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Conflict target of the roster upsert. NULL external_ids stay
+    # unconstrained (NULLs are distinct), so manually created students
+    # are unaffected.
+    op.create_unique_constraint(
+        "uq_students_school_external_id", "students", ["school_id", "external_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_students_school_external_id", "students", type_="unique")
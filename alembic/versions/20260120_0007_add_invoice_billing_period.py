@@ -0,0 +1,31 @@
+"""add invoice billing period
+
+Revision ID: 20260120_0007
+Revises: 20260120_0006
+Create Date: 2026-01-20 00:07:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0007"
+down_revision = "20260120_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Set by billing runs ("YYYY-MM"); NULL for manually created invoices
+    op.add_column("invoices", sa.Column("billing_period", sa.String(length=7), nullable=True))
+    # One generated invoice per student and period, so billing runs can be
+    # re-run safely; also serves the run's NOT EXISTS probe
+    op.create_unique_constraint(
+        "uq_invoices_student_billing_period", "invoices", ["student_id", "billing_period"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_invoices_student_billing_period", "invoices", type_="unique")
+    op.drop_column("invoices", "billing_period")
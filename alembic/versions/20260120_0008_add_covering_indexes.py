@@ -0,0 +1,48 @@
+"""add covering and partial indexes
+
+Revision ID: 20260120_0008
+Revises: 20260120_0007
+Create Date: 2026-01-20 00:08:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0008"
+down_revision = "20260120_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # School + status filters page by id; supersedes (school_id, status)
+    op.create_index(
+        "ix_invoices_school_status_id", "invoices", ["school_id", "status", "id"]
+    )
+    op.drop_index("ix_invoices_school_status", table_name="invoices")
+    # Overdue scans only read open invoices, by school and due date
+    op.create_index(
+        "ix_invoices_open_due_date",
+        "invoices",
+        ["school_id", "due_date"],
+        postgresql_include=["balance"],
+        postgresql_where=sa.text("status IN ('pending', 'partially_paid')"),
+    )
+    # Per-invoice payment sums become index-only scans; supersedes (invoice_id)
+    op.create_index(
+        "ix_payments_invoice_id_amount",
+        "payments",
+        ["invoice_id"],
+        postgresql_include=["amount"],
+    )
+    op.drop_index("ix_payments_invoice_id", table_name="payments")
+
+
+def downgrade() -> None:
+    op.create_index("ix_payments_invoice_id", "payments", ["invoice_id"])
+    op.drop_index("ix_payments_invoice_id_amount", table_name="payments")
+    op.drop_index("ix_invoices_open_due_date", table_name="invoices")
+    op.create_index("ix_invoices_school_status", "invoices", ["school_id", "status"])
+    op.drop_index("ix_invoices_school_status_id", table_name="invoices")
@@ -0,0 +1,176 @@
+"""partition payments by paid_at
+
+Revision ID: 20260120_0009
+Revises: 20260120_0008
+Create Date: 2026-01-20 00:09:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20260120_0009"
+down_revision = "20260120_0008"
+branch_labels = None
+depends_on = None
+
+# Months of partitions created ahead of the current one
+MONTHS_AHEAD = 3
+
+# Creates the missing monthly partitions of `parent` between two months
+# (inclusive), moving any rows the DEFAULT partition holds for them. Used
+# here and by app.core.partitions for ongoing maintenance.
+ENSURE_MONTHLY_PARTITIONS = """
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+    parent text, key_column text, first_month date, last_month date
+) RETURNS integer AS $$
+DECLARE
+    month_start date := date_trunc('month', first_month)::date;
+    partition_name text;
+    lower_bound text;
+    upper_bound text;
+    created integer := 0;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(parent)
+    ) THEN
+        RETURN 0;
+    END IF;
+    -- Serialize concurrent maintenance runs for the same table
+    PERFORM pg_advisory_xact_lock(hashtext('partitions:' || parent));
+    WHILE month_start <= last_month LOOP
+        partition_name := parent || to_char(month_start, '"_y"YYYY"m"MM');
+        lower_bound := to_char(month_start, 'YYYY-MM-DD') || ' 00:00:00+00';
+        upper_bound := to_char(month_start + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00';
+        IF to_regclass(partition_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                partition_name, parent
+            );
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                parent || '_default', key_column, lower_bound, key_column, upper_bound,
+                partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, partition_name, lower_bound, upper_bound
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+PAYMENT_COLUMNS = "id, invoice_id, paid_at, amount, method, reference, created_at, updated_at"
+
+
+def upgrade() -> None:
+    op.execute(ENSURE_MONTHLY_PARTITIONS)
+
+    # Keep the id sequence while the old table is replaced
+    op.execute("ALTER SEQUENCE payments_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE payments ALTER COLUMN id DROP DEFAULT")
+    op.execute("ALTER TABLE payments RENAME TO payments_unpartitioned")
+    op.execute(
+        "ALTER TABLE payments_unpartitioned "
+        "RENAME CONSTRAINT payments_pkey TO payments_unpartitioned_pkey"
+    )
+    op.execute("DROP INDEX ix_payments_invoice_id_amount")
+    op.execute("DROP INDEX ix_payments_invoice_id_id")
+
+    # Unique constraints on a partitioned table must include the partition
+    # key, so the primary key becomes (id, paid_at); ids still come from
+    # the sequence and stay unique
+    op.execute(
+        """
+        CREATE TABLE payments (
+            id integer NOT NULL DEFAULT nextval('payments_id_seq'),
+            invoice_id integer NOT NULL REFERENCES invoices (id),
+            paid_at timestamp with time zone NOT NULL,
+            amount numeric(12, 2) NOT NULL,
+            method varchar(32) NOT NULL,
+            reference varchar(128),
+            created_at timestamp with time zone DEFAULT now(),
+            updated_at timestamp with time zone DEFAULT now(),
+            CONSTRAINT payments_pkey PRIMARY KEY (id, paid_at)
+        ) PARTITION BY RANGE (paid_at)
+        """
+    )
+    # Catches rows outside the monthly partitions until maintenance moves them
+    op.execute("CREATE TABLE payments_default PARTITION OF payments DEFAULT")
+    op.execute(
+        f"""
+        SELECT ensure_monthly_partitions(
+            'payments',
+            'paid_at',
+            coalesce(
+                (SELECT min(paid_at) AT TIME ZONE 'UTC' FROM payments_unpartitioned),
+                now() AT TIME ZONE 'UTC'
+            )::date,
+            (date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '{MONTHS_AHEAD} months')::date
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO payments ({PAYMENT_COLUMNS}) "
+        f"SELECT {PAYMENT_COLUMNS} FROM payments_unpartitioned"
+    )
+    op.execute("DROP TABLE payments_unpartitioned")
+    op.execute("ALTER SEQUENCE payments_id_seq OWNED BY payments.id")
+
+    # Created on the parent, so every partition (present and future) gets them
+    op.create_index(
+        "ix_payments_invoice_id_amount",
+        "payments",
+        ["invoice_id"],
+        postgresql_include=["amount"],
+    )
+    op.create_index("ix_payments_invoice_id_id", "payments", ["invoice_id", "id"])
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE payments_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE payments ALTER COLUMN id DROP DEFAULT")
+    op.execute("ALTER TABLE payments RENAME TO payments_partitioned")
+    op.execute(
+        "ALTER TABLE payments_partitioned "
+        "RENAME CONSTRAINT payments_pkey TO payments_partitioned_pkey"
+    )
+    op.execute("DROP INDEX ix_payments_invoice_id_id")
+    op.execute("DROP INDEX ix_payments_invoice_id_amount")
+    op.execute(
+        """
+        CREATE TABLE payments (
+            id integer NOT NULL DEFAULT nextval('payments_id_seq'),
+            invoice_id integer NOT NULL REFERENCES invoices (id),
+            paid_at timestamp with time zone NOT NULL,
+            amount numeric(12, 2) NOT NULL,
+            method varchar(32) NOT NULL,
+            reference varchar(128),
+            created_at timestamp with time zone DEFAULT now(),
+            updated_at timestamp with time zone DEFAULT now(),
+            CONSTRAINT payments_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO payments ({PAYMENT_COLUMNS}) "
+        f"SELECT {PAYMENT_COLUMNS} FROM payments_partitioned"
+    )
+    # Drops the partitions too
+    op.execute("DROP TABLE payments_partitioned")
+    op.execute("ALTER SEQUENCE payments_id_seq OWNED BY payments.id")
+    op.create_index(
+        "ix_payments_invoice_id_amount",
+        "payments",
+        ["invoice_id"],
+        postgresql_include=["amount"],
+    )
+    op.create_index("ix_payments_invoice_id_id", "payments", ["invoice_id", "id"])
+    op.execute("DROP FUNCTION ensure_monthly_partitions(text, text, date, date)")
@@ -0,0 +1,121 @@
+"""add archive tables and opening balances
+
+Revision ID: 20260120_0010
+Revises: 20260120_0009
+Create Date: 2026-01-20 00:10:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "20260120_0010"
+down_revision = "20260120_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Settled invoices and their payments moved out of the live tables by
+    # the archival job; ids and columns are kept as they were
+    op.create_table(
+        "invoices_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "school_id",
+            sa.Integer(),
+            sa.ForeignKey("schools.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "student_id",
+            sa.Integer(),
+            sa.ForeignKey("students.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("issue_date", sa.Date(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="invoice_status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("total_paid", sa.Numeric(12, 2), nullable=False),
+        sa.Column("balance", sa.Numeric(12, 2), nullable=False),
+        sa.Column("billing_period", sa.String(length=7), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_invoices_archive_school_id_id", "invoices_archive", ["school_id", "id"]
+    )
+    op.create_index(
+        "ix_invoices_archive_student_id_id", "invoices_archive", ["student_id", "id"]
+    )
+
+    op.create_table(
+        "payments_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column(
+            "invoice_id",
+            sa.Integer(),
+            sa.ForeignKey("invoices_archive.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("paid_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("method", sa.String(length=32), nullable=False),
+        sa.Column("reference", sa.String(length=128), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_payments_archive_invoice_id_id", "payments_archive", ["invoice_id", "id"]
+    )
+
+    # Statement totals of each student's archived invoices, per school
+    op.create_table(
+        "opening_balances",
+        sa.Column(
+            "school_id",
+            sa.Integer(),
+            sa.ForeignKey("schools.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "student_id",
+            sa.Integer(),
+            sa.ForeignKey("students.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("total_invoiced", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("total_paid", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_opening_balances_student_id", "opening_balances", ["student_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_opening_balances_student_id", table_name="opening_balances")
+    op.drop_table("opening_balances")
+    op.drop_index("ix_payments_archive_invoice_id_id", table_name="payments_archive")
+    op.drop_table("payments_archive")
+    op.drop_index("ix_invoices_archive_student_id_id", table_name="invoices_archive")
+    op.drop_index("ix_invoices_archive_school_id_id", table_name="invoices_archive")
+    op.drop_table("invoices_archive")
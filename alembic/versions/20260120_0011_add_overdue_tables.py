@@ -0,0 +1,71 @@
+"""add overdue state and events
+
+Revision ID: 20260120_0011
+Revises: 20260120_0010
+Create Date: 2026-01-20 00:11:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0011"
+down_revision = "20260120_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Invoices the overdue scan currently considers overdue
+    op.create_table(
+        "overdue_invoices",
+        sa.Column("invoice_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("detected_on", sa.Date(), nullable=False),
+    )
+    op.create_index(
+        "ix_overdue_invoices_school_id_due_date",
+        "overdue_invoices",
+        ["school_id", "due_date"],
+    )
+
+    # Append-only log of the state changes the scan saw
+    op.create_table(
+        "overdue_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("invoice_id", sa.Integer(), nullable=False),
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "kind",
+            sa.Enum("overdue", "cleared", name="overdue_event_kind"),
+            nullable=False,
+        ),
+        sa.Column("due_date", sa.Date(), nullable=False),
+        sa.Column("balance", sa.Numeric(12, 2), nullable=True),
+        sa.Column("as_of", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_overdue_events_invoice_id_id", "overdue_events", ["invoice_id", "id"]
+    )
+    op.create_index(
+        "ix_overdue_events_school_id_id", "overdue_events", ["school_id", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_overdue_events_school_id_id", table_name="overdue_events")
+    op.drop_index("ix_overdue_events_invoice_id_id", table_name="overdue_events")
+    op.drop_table("overdue_events")
+    sa.Enum(name="overdue_event_kind").drop(op.get_bind(), checkfirst=True)
+    op.drop_index("ix_overdue_invoices_school_id_due_date", table_name="overdue_invoices")
+    op.drop_table("overdue_invoices")
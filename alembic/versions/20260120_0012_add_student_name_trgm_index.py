@@ -0,0 +1,46 @@
+"""add trigram index for student name search
+
+Revision ID: 20260120_0012
+Revises: 20260120_0011
+Create Date: 2026-01-20 00:12:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0012"
+down_revision = "20260120_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Lets school_id live in the same GIN index as the name trigrams
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # CONCURRENTLY so roster writes to students are not blocked while the
+    # index builds; it cannot run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_students_school_full_name_trgm",
+            "students",
+            [
+                "school_id",
+                # Must match Student.full_name() exactly for the planner to use it
+                sa.text("(first_name || ' ' || last_name) gin_trgm_ops"),
+            ],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_students_school_full_name_trgm",
+            table_name="students",
+            postgresql_concurrently=True,
+        )
+    # The extensions are left installed; other objects may depend on them
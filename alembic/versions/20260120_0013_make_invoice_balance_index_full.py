@@ -0,0 +1,33 @@
+"""make the invoice balance index non-partial
+
+Revision ID: 20260120_0013
+Revises: 20260120_0012
+Create Date: 2026-01-20 00:13:00
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260120_0013"
+down_revision = "20260120_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # min_balance filters any status, so the planner never matched the
+    # open-invoice predicate of ix_invoices_open_balance
+    op.create_index("ix_invoices_school_id_balance", "invoices", ["school_id", "balance"])
+    op.drop_index("ix_invoices_open_balance", table_name="invoices")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_invoices_open_balance",
+        "invoices",
+        ["school_id", "balance"],
+        postgresql_where=sa.text("status IN ('pending', 'partially_paid')"),
+    )
+    op.drop_index("ix_invoices_school_id_balance", table_name="invoices")
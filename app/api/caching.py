@@ -0,0 +1,118 @@
+"""Response caching helpers shared by the API routers.
+
+Responses built here bypass `response_model` validation: bodies are
+encoded once (on a cache miss or from an already validated schema) and
+sent as raw bytes with a content-hash `ETag`, so a matching
+`If-None-Match` can be answered with `304 Not Modified`.
+"""
+from typing import Awaitable, Callable
+
+from fastapi import BackgroundTasks, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.async_cache import (
+    build_cache_key_async,
+    cache_get_meta_async,
+    cache_get_or_compute_async,
+    refresh_cache_entry_async,
+)
+from app.core.cache import CacheEntry, CacheMeta, compute_etag
+from app.core.config import settings
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})}
+    )
+
+
+def json_body_response(
+    request: Request, body: str, etag: str, headers: dict[str, str] | None = None
+) -> Response:
+    """Send an encoded JSON body, or 304 if the client already has it."""
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, **(headers or {})},
+    )
+
+
+def entity_response(request: Request, entity: BaseModel) -> Response:
+    """Serialize a single entity once and serve it with an ETag."""
+    body = entity.model_dump_json()
+    return json_body_response(request, body, compute_etag(body))
+
+
+def _age_header(meta: CacheMeta) -> dict[str, str]:
+    return {"Age": str(int(meta.age))}
+
+
+async def cached_statement(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    scope: str,
+    load: Callable[[AsyncSession], Awaitable[BaseModel | None]],
+    db: AsyncSession,
+    session_factory: Callable[[], AsyncSession],
+) -> Response | None:
+    """Serve a statement through the cache with stale-while-revalidate.
+
+    `load` builds the statement from an async session, returning None
+    when the entity does not exist. Misses are built with the request
+    session; refreshes of stale entries run as background tasks with
+    their own session. The `Age` header tells the client how old the
+    data is. Conditional requests are answered from the entry's ETag
+    without reading its body.
+    """
+    cache_key = await build_cache_key_async(request, scope)
+
+    def encode(statement: BaseModel | None) -> str | None:
+        return statement.model_dump_json() if statement else None
+
+    async def request_load() -> str | None:
+        return encode(await load(db))
+
+    async def refresh_load() -> str | None:
+        async with session_factory() as session:
+            return encode(await load(session))
+
+    def schedule_refresh() -> None:
+        background_tasks.add_task(
+            refresh_cache_entry_async,
+            cache_key,
+            refresh_load,
+            settings.statement_cache_ttl,
+            settings.statement_cache_soft_ttl,
+        )
+
+    if request.headers.get("if-none-match"):
+        meta = await cache_get_meta_async(cache_key)
+        if meta is not None and etag_matches(request, meta.etag):
+            if meta.is_stale:
+                schedule_refresh()
+            return not_modified(meta.etag, _age_header(meta))
+
+    entry: CacheEntry | None = await cache_get_or_compute_async(
+        cache_key,
+        request_load,
+        ttl=settings.statement_cache_ttl,
+        soft_ttl=settings.statement_cache_soft_ttl,
+        on_stale=schedule_refresh,
+    )
+    if entry is None:
+        return None
+    return json_body_response(request, entry.body, entry.etag, _age_header(entry))
@@ -0,0 +1,22 @@
+"""Responses for endpoints taking a sparse fieldset (`?fields=`).
+
+Without a fieldset the full read schema is returned through the route's
+`response_model` as usual. With one, the body is serialized with the
+reduced schema (see `app.utils.fieldsets`) and sent as is, since it no
+longer matches the declared `response_model`.
+"""
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.schemas.pagination import PaginatedResponse
+from app.utils.fieldsets import partial_schema
+
+
+def page_response(
+    result: dict, schema: type[BaseModel], fields: list[str] | None
+) -> PaginatedResponse | Response:
+    """A page of `schema` items, reduced to `fields` when given."""
+    if fields is None:
+        return PaginatedResponse(**result)
+    page = PaginatedResponse[partial_schema(schema, fields)](**result)
+    return Response(content=page.model_dump_json(), media_type="application/json")
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.security import verify_api_key
+from app.schemas.billing import BillingRunCreate, BillingRunResult
+from app.services.billing_service import run_billing
+
+router = APIRouter(
+    prefix="/billing-runs", tags=["billing"], dependencies=[Depends(verify_api_key)]
+)
+
+
+@router.post("", response_model=BillingRunResult)
+def run_billing_endpoint(
+    run_in: BillingRunCreate, db: Session = Depends(get_db)
+) -> BillingRunResult:
+    """Invoice all active students for a period.
+
+    Safe to re-run: students already invoiced for the period are skipped.
+    """
+    return run_billing(db, run_in)
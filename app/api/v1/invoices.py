@@ -1,18 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.api.caching import entity_response
+from app.api.fieldsets import page_response
+from app.core.db import get_async_read_db, get_db, get_read_db
 from app.core.security import verify_api_key
 from app.models.invoice import InvoiceStatus
-from app.schemas.invoice import InvoiceCreate, InvoiceRead, InvoiceUpdate
+from app.schemas.invoice import (
+    InvoiceBulkCreate,
+    InvoiceBulkResult,
+    InvoiceCreate,
+    InvoiceRead,
+    InvoiceUpdate,
+)
+from app.schemas.batch import BatchResponse
 from app.schemas.pagination import PaginatedResponse
 from app.services.invoice_service import (
+    bulk_create_invoices,
     cancel_invoice,
     create_invoice,
     get_invoice,
-    list_invoices,
+    get_invoices_batch_async,
+    list_invoices_async,
     update_invoice,
 )
+from app.services.overdue_service import list_overdue_invoices_async
+from app.utils.batch import parse_keys
+from app.utils.fieldsets import parse_fields, partial_schema
+from app.utils.pagination import TotalMode
 
 router = APIRouter(
     prefix="/invoices", tags=["invoices"], dependencies=[Depends(verify_api_key)]
@@ -26,32 +45,95 @@ def create_invoice_endpoint(
     return create_invoice(db, invoice_in)
 
 
+@router.post("/bulk", response_model=InvoiceBulkResult)
+def bulk_create_invoices_endpoint(
+    bulk_in: InvoiceBulkCreate, db: Session = Depends(get_db)
+) -> InvoiceBulkResult:
+    """Create many invoices in one request.
+
+    Valid rows are created even if others are rejected; check `errors`.
+    """
+    return bulk_create_invoices(db, bulk_in.invoices)
+
+
 @router.get("", response_model=PaginatedResponse[InvoiceRead])
-def list_invoices_endpoint(
+async def list_invoices_endpoint(
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="Resume after a page's next_cursor"),
+    total: TotalMode = Query(default=TotalMode.exact),
     school_id: int | None = None,
     student_id: int | None = None,
     status: InvoiceStatus | None = None,
-    db: Session = Depends(get_db),
-) -> PaginatedResponse[InvoiceRead]:
-    result = list_invoices(
+    min_balance: Decimal | None = Query(default=None, ge=0),
+    include_archived: bool = Query(default=False, description="Also list archived rows"),
+    fields: str | None = Query(default=None, description="Comma-separated fields to return"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> PaginatedResponse[InvoiceRead] | Response:
+    selected = parse_fields(fields, InvoiceRead)
+    result = await list_invoices_async(
         db,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        total=total,
         school_id=school_id,
         student_id=student_id,
         status=status,
+        min_balance=min_balance,
+        include_archived=include_archived,
+        fields=selected,
+    )
+    return page_response(result, InvoiceRead, selected)
+
+
+@router.get("/batch", response_model=BatchResponse[InvoiceRead])
+async def get_invoices_batch_endpoint(
+    ids: str = Query(description="Comma-separated ids"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> BatchResponse[InvoiceRead]:
+    """Fetch many invoices by id, in the requested order."""
+    result = await get_invoices_batch_async(db, parse_keys(ids, int))
+    return BatchResponse(**result)
+
+
+@router.get("/overdue", response_model=PaginatedResponse[InvoiceRead])
+async def list_overdue_invoices_endpoint(
+    limit: int = Query(default=10, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="Resume after a page's next_cursor"),
+    total: TotalMode = Query(default=TotalMode.exact),
+    school_id: int | None = None,
+    student_id: int | None = None,
+    as_of: date | None = Query(default=None, description="Overdue as of this day (default today)"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> PaginatedResponse[InvoiceRead]:
+    """Open invoices past their due date, oldest due first."""
+    result = await list_overdue_invoices_async(
+        db,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        total=total,
+        school_id=school_id,
+        student_id=student_id,
+        as_of=as_of,
     )
     return PaginatedResponse(**result)
 
 
 @router.get("/{invoice_id}", response_model=InvoiceRead)
-def get_invoice_endpoint(invoice_id: int, db: Session = Depends(get_db)) -> InvoiceRead:
-    invoice = get_invoice(db, invoice_id)
+def get_invoice_endpoint(
+    invoice_id: int,
+    request: Request,
+    fields: str | None = Query(default=None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_read_db),
+) -> InvoiceRead:
+    selected = parse_fields(fields, InvoiceRead)
+    invoice = get_invoice(db, invoice_id, selected)
     if not invoice:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found")
-    return invoice
+    return entity_response(request, partial_schema(InvoiceRead, selected).model_validate(invoice))
 
 
 @router.put("/{invoice_id}", response_model=InvoiceRead)
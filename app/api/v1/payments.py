@@ -1,11 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import io
+import tempfile
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.api.caching import entity_response
+from app.core.db import get_async_read_db, get_db, get_read_db
 from app.core.security import verify_api_key
+from app.schemas.batch import BatchResponse
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.payment import PaymentCreate, PaymentRead
-from app.services.payment_service import create_payment, get_payment, list_payments
+from app.services.payment_import_service import SOURCE_ERRORS, import_payments_csv
+from app.services.payment_service import (
+    create_payment,
+    get_payment,
+    get_payments_batch_async,
+    list_payments_async,
+)
+from app.utils.batch import parse_keys
+from app.utils.pagination import TotalMode
+
+# Uploads and reports larger than this are spooled to disk
+SPOOL_MAX_BYTES = 1024 * 1024
 
 router = APIRouter(
     prefix="/payments", tags=["payments"], dependencies=[Depends(verify_api_key)]
@@ -19,29 +39,98 @@ def create_payment_endpoint(
     return create_payment(db, payment_in)
 
 
+def _stream_report(report):
+    with report:
+        yield from report
+
+
+@router.post(
+    "/import",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}}, "description": "Per-line import report"}},
+)
+async def import_payments_endpoint(
+    request: Request, db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """Import payments from a CSV request body (`Content-Type: text/csv`).
+
+    The body is spooled to disk as it arrives and imported in chunks; the
+    response is a CSV report with one result per line. Created/rejected
+    counts are also returned in the `X-Import-Created` and
+    `X-Import-Rejected` headers.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    report = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+", newline="")
+    try:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        # Closing the wrapper closes the spooled upload too
+        with io.TextIOWrapper(
+            upload, encoding="utf-8-sig", errors=SOURCE_ERRORS, newline=""
+        ) as source:
+            counts = await run_in_threadpool(import_payments_csv, db, source, report)
+    except BaseException:
+        upload.close()
+        report.close()
+        raise
+
+    report.seek(0)
+    return StreamingResponse(
+        _stream_report(report),
+        media_type="text/csv",
+        headers={
+            "X-Import-Created": str(counts["created"]),
+            "X-Import-Rejected": str(counts["rejected"]),
+        },
+    )
+
+
 @router.get("", response_model=PaginatedResponse[PaymentRead])
-def list_payments_endpoint(
+async def list_payments_endpoint(
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="Resume after a page's next_cursor"),
+    total: TotalMode = Query(default=TotalMode.exact),
     invoice_id: int | None = None,
     student_id: int | None = None,
     school_id: int | None = None,
-    db: Session = Depends(get_db),
+    paid_from: datetime | None = Query(default=None, description="Paid at or after"),
+    paid_to: datetime | None = Query(default=None, description="Paid before"),
+    include_archived: bool = Query(default=False, description="Also list archived rows"),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> PaginatedResponse[PaymentRead]:
-    result = list_payments(
+    result = await list_payments_async(
         db,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        total=total,
         invoice_id=invoice_id,
         student_id=student_id,
         school_id=school_id,
+        paid_from=paid_from,
+        paid_to=paid_to,
+        include_archived=include_archived,
     )
     return PaginatedResponse(**result)
 
 
+@router.get("/batch", response_model=BatchResponse[PaymentRead])
+async def get_payments_batch_endpoint(
+    ids: str = Query(description="Comma-separated ids"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> BatchResponse[PaymentRead]:
+    """Fetch many payments by id, in the requested order."""
+    result = await get_payments_batch_async(db, parse_keys(ids, int))
+    return BatchResponse(**result)
+
+
 @router.get("/{payment_id}", response_model=PaymentRead)
-def get_payment_endpoint(payment_id: int, db: Session = Depends(get_db)) -> PaymentRead:
+def get_payment_endpoint(
+    payment_id: int, request: Request, db: Session = Depends(get_read_db)
+) -> PaymentRead:
     payment = get_payment(db, payment_id)
     if not payment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
-    return payment
+    return entity_response(request, PaymentRead.model_validate(payment))
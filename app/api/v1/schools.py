@@ -1,9 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from datetime import date
+from typing import Callable
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.cache import build_cache_key, cache_get, cache_set
-from app.core.db import get_db
+from app.api.caching import cached_statement, entity_response
+from app.core.cache import school_scope
+from app.core.db import (
+    get_async_db,
+    get_async_read_db,
+    get_async_session_factory,
+    get_db,
+    get_read_db,
+)
 from app.core.security import verify_api_key
+from app.schemas.batch import BatchResponse
+from app.schemas.overdue import SchoolOverdueSummary
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.school import SchoolCreate, SchoolRead, SchoolUpdate
 from app.schemas.statement import SchoolStatement
@@ -11,10 +32,14 @@ from app.services.school_service import (
     create_school,
     delete_school,
     get_school,
-    list_schools,
+    get_schools_batch_async,
+    list_schools_async,
     update_school,
 )
-from app.services.statement_service import get_school_statement
+from app.services.overdue_service import get_school_overdue_summary_async
+from app.services.statement_service import get_school_statement_async
+from app.utils.batch import parse_keys
+from app.utils.pagination import TotalMode
 
 router = APIRouter(
     prefix="/schools", tags=["schools"], dependencies=[Depends(verify_api_key)]
@@ -29,21 +54,38 @@ def create_school_endpoint(
 
 
 @router.get("", response_model=PaginatedResponse[SchoolRead])
-def list_schools_endpoint(
+async def list_schools_endpoint(
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="Resume after a page's next_cursor"),
+    total: TotalMode = Query(default=TotalMode.exact),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> PaginatedResponse[SchoolRead]:
-    result = list_schools(db, limit=limit, offset=offset)
+    result = await list_schools_async(db, limit=limit, offset=offset, cursor=cursor, total=total)
     return PaginatedResponse(**result)
 
 
+@router.get("/batch", response_model=BatchResponse[SchoolRead])
+async def get_schools_batch_endpoint(
+    ids: str | None = Query(default=None, description="Comma-separated ids"),
+    external_ids: str | None = Query(default=None, description="Comma-separated external ids"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> BatchResponse[SchoolRead]:
+    """Fetch many schools by ids or external_ids, in the requested order."""
+    result = await get_schools_batch_async(
+        db, ids=parse_keys(ids, int), external_ids=parse_keys(external_ids)
+    )
+    return BatchResponse(**result)
+
+
 @router.get("/{school_id}", response_model=SchoolRead)
-def get_school_endpoint(school_id: int, db: Session = Depends(get_db)) -> SchoolRead:
+def get_school_endpoint(
+    school_id: int, request: Request, db: Session = Depends(get_read_db)
+) -> SchoolRead:
     school = get_school(db, school_id)
     if not school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="School not found")
-    return school
+    return entity_response(request, SchoolRead.model_validate(school))
 
 
 @router.put("/{school_id}", response_model=SchoolRead)
@@ -64,15 +106,37 @@ def delete_school_endpoint(school_id: int, db: Session = Depends(get_db)) -> Non
 
 
 @router.get("/{school_id}/statement", response_model=SchoolStatement)
-def get_school_statement_endpoint(
-    school_id: int, request: Request, db: Session = Depends(get_db)
+async def get_school_statement_endpoint(
+    school_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    include_archived: bool = Query(default=False, description="Also list archived invoices"),
+    # Cache entries are built on the primary: a replica could still be
+    # missing the write that invalidated the previous entry
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: Callable[[], AsyncSession] = Depends(get_async_session_factory),
 ) -> SchoolStatement:
-    cache_key = build_cache_key(request)
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
-    statement = get_school_statement(db, school_id)
+    statement = await cached_statement(
+        request,
+        background_tasks,
+        school_scope(school_id),
+        lambda session: get_school_statement_async(session, school_id, include_archived),
+        db,
+        session_factory,
+    )
     if not statement:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="School not found")
-    cache_set(cache_key, statement.model_dump(mode="json"))
     return statement
+
+
+@router.get("/{school_id}/overdue-summary", response_model=SchoolOverdueSummary)
+async def get_school_overdue_summary_endpoint(
+    school_id: int,
+    as_of: date | None = Query(default=None, description="Overdue as of this day (default today)"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> SchoolOverdueSummary:
+    """Count and balance of the school's overdue invoices, by days past due."""
+    summary = await get_school_overdue_summary_async(db, school_id, as_of)
+    if not summary:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="School not found")
+    return summary
@@ -1,20 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Callable
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.cache import build_cache_key, cache_get, cache_set
-from app.core.db import get_db
+from app.api.caching import cached_statement, entity_response
+from app.api.fieldsets import page_response
+from app.core.cache import student_scope
+from app.core.db import (
+    get_async_db,
+    get_async_read_db,
+    get_async_session_factory,
+    get_db,
+    get_read_db,
+)
 from app.core.security import verify_api_key
+from app.schemas.batch import BatchResponse
 from app.schemas.pagination import PaginatedResponse
 from app.schemas.statement import StudentStatement
-from app.schemas.student import StudentCreate, StudentRead, StudentUpdate
-from app.services.statement_service import get_student_statement
+from app.schemas.student import (
+    StudentBulkUpsert,
+    StudentBulkUpsertResult,
+    StudentCreate,
+    StudentRead,
+    StudentUpdate,
+)
+from app.services.statement_service import get_student_statement_async
 from app.services.student_service import (
+    bulk_upsert_students,
     create_student,
     delete_student,
     get_student,
-    list_students,
+    get_students_batch_async,
+    list_students_async,
+    search_students_async,
     update_student,
 )
+from app.utils.batch import parse_keys
+from app.utils.fieldsets import parse_fields, partial_schema
+from app.utils.pagination import TotalMode
 
 router = APIRouter(
     prefix="/students", tags=["students"], dependencies=[Depends(verify_api_key)]
@@ -28,23 +61,81 @@ def create_student_endpoint(
     return create_student(db, student_in)
 
 
+@router.put("/bulk", response_model=StudentBulkUpsertResult)
+def bulk_upsert_students_endpoint(
+    bulk_in: StudentBulkUpsert, db: Session = Depends(get_db)
+) -> StudentBulkUpsertResult:
+    """Create or update students by (school external_id, student external_id)."""
+    return bulk_upsert_students(db, bulk_in.students)
+
+
 @router.get("", response_model=PaginatedResponse[StudentRead])
-def list_students_endpoint(
+async def list_students_endpoint(
     limit: int = Query(default=10, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="Resume after a page's next_cursor"),
+    total: TotalMode = Query(default=TotalMode.exact),
+    school_id: int | None = None,
+    fields: str | None = Query(default=None, description="Comma-separated fields to return"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> PaginatedResponse[StudentRead] | Response:
+    selected = parse_fields(fields, StudentRead)
+    result = await list_students_async(
+        db,
+        limit=limit,
+        offset=offset,
+        school_id=school_id,
+        cursor=cursor,
+        total=total,
+        fields=selected,
+    )
+    return page_response(result, StudentRead, selected)
+
+
+@router.get("/batch", response_model=BatchResponse[StudentRead])
+async def get_students_batch_endpoint(
+    ids: str | None = Query(default=None, description="Comma-separated ids"),
+    external_ids: str | None = Query(default=None, description="Comma-separated external ids"),
+    school_id: int | None = Query(default=None, description="Only students of this school"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> BatchResponse[StudentRead]:
+    """Fetch many students by ids or external_ids, in the requested order.
+
+    External ids are unique per school only; pass `school_id` to resolve
+    them within one school.
+    """
+    result = await get_students_batch_async(
+        db,
+        ids=parse_keys(ids, int),
+        external_ids=parse_keys(external_ids),
+        school_id=school_id,
+    )
+    return BatchResponse(**result)
+
+
+@router.get("/search", response_model=list[StudentRead])
+async def search_students_endpoint(
+    q: str = Query(min_length=2, max_length=100, description="Part of the student's name"),
     school_id: int | None = None,
-    db: Session = Depends(get_db),
-) -> PaginatedResponse[StudentRead]:
-    result = list_students(db, limit=limit, offset=offset, school_id=school_id)
-    return PaginatedResponse(**result)
+    limit: int = Query(default=20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> list[StudentRead]:
+    """Students whose name matches q (typos tolerated on Postgres), best match first."""
+    return await search_students_async(db, q, school_id=school_id, limit=limit)
 
 
 @router.get("/{student_id}", response_model=StudentRead)
-def get_student_endpoint(student_id: int, db: Session = Depends(get_db)) -> StudentRead:
-    student = get_student(db, student_id)
+def get_student_endpoint(
+    student_id: int,
+    request: Request,
+    fields: str | None = Query(default=None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_read_db),
+) -> StudentRead:
+    selected = parse_fields(fields, StudentRead)
+    student = get_student(db, student_id, selected)
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-    return student
+    return entity_response(request, partial_schema(StudentRead, selected).model_validate(student))
 
 
 @router.put("/{student_id}", response_model=StudentRead)
@@ -65,15 +156,24 @@ def delete_student_endpoint(student_id: int, db: Session = Depends(get_db)) -> N
 
 
 @router.get("/{student_id}/statement", response_model=StudentStatement)
-def get_student_statement_endpoint(
-    student_id: int, request: Request, db: Session = Depends(get_db)
+async def get_student_statement_endpoint(
+    student_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    include_archived: bool = Query(default=False, description="Also list archived invoices"),
+    # Cache entries are built on the primary: a replica could still be
+    # missing the write that invalidated the previous entry
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: Callable[[], AsyncSession] = Depends(get_async_session_factory),
 ) -> StudentStatement:
-    cache_key = build_cache_key(request)
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
-    statement = get_student_statement(db, student_id)
+    statement = await cached_statement(
+        request,
+        background_tasks,
+        student_scope(student_id),
+        lambda session: get_student_statement_async(session, student_id, include_archived),
+        db,
+        session_factory,
+    )
     if not statement:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-    cache_set(cache_key, statement.model_dump(mode="json"))
     return statement
@@ -0,0 +1,29 @@
+"""Move settled invoices and their payments to the archive tables.
+
+Usage:
+    python -m app.cli.archive_invoices [--before YYYY-MM-DD] [--chunk-size N]
+
+Archives paid and cancelled invoices issued before --before (default:
+`ARCHIVE_AFTER_DAYS` days ago); see `app.services.archive_service`. Safe
+to interrupt and rerun.
+"""
+import argparse
+from datetime import date
+
+from app.core.db import SessionLocal
+from app.services.archive_service import archive_settled_invoices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        moved = archive_settled_invoices(db, args.before, args.chunk_size)
+    print(f"invoices={moved['invoices']} payments={moved['payments']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Create the upcoming monthly partitions of partitioned tables.
+
+Usage:
+    python -m app.cli.ensure_partitions [--months-ahead N]
+
+Runs the same maintenance as the workers' background thread (see
+`app.core.partitions`), e.g. from a scheduled job when the thread is
+disabled. A no-op on databases other than Postgres.
+"""
+import argparse
+
+from app.core.db import SessionLocal
+from app.core.partitions import ensure_partitions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months-ahead", type=int, default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        created = ensure_partitions(db, args.months_ahead)
+    for table, count in created.items():
+        print(f"{table}: created={count}")
+
+
+if __name__ == "__main__":
+    main()
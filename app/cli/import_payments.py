@@ -0,0 +1,31 @@
+"""Import a payments CSV from the command line.
+
+Usage:
+    python -m app.cli.import_payments payments.csv [--report report.csv] [--chunk-size N]
+
+Uses the same importer as `POST /api/v1/payments/import`. The per-line
+report goes to --report (stdout by default); the summary goes to stderr.
+"""
+import argparse
+import sys
+
+from app.core.db import SessionLocal
+from app.services.payment_import_service import SOURCE_ERRORS, import_payments_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="CSV with invoice_id,paid_at,amount,method[,reference]")
+    parser.add_argument("--report", type=argparse.FileType("w"), default=sys.stdout)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db, open(
+        args.source, encoding="utf-8-sig", errors=SOURCE_ERRORS, newline=""
+    ) as source:
+        counts = import_payments_csv(db, source, args.report, args.chunk_size)
+    print(f"created={counts['created']} rejected={counts['rejected']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Record overdue state changes of invoices.
+
+Usage:
+    python -m app.cli.scan_overdue [--as-of YYYY-MM-DD] [--chunk-size N]
+
+Flags open invoices due before --as-of (default: today) as overdue and
+clears those that no longer are, logging each change to
+`overdue_events`; see `app.services.overdue_service`. Meant to run
+daily; safe to interrupt and rerun.
+"""
+import argparse
+from datetime import date
+
+from app.core.db import SessionLocal
+from app.services.overdue_service import scan_overdue_invoices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        result = scan_overdue_invoices(db, args.as_of, args.chunk_size)
+    print(
+        f"as_of={result['as_of']} flagged={result['flagged']} "
+        f"cleared={result['cleared']} chunks={result['chunks']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Cache reads, coalesced builds and background refreshes for the async read endpoints.
+
+Uses `redis.asyncio` so cache round trips do not hold a worker thread.
+Key layout, entry format, the in-process tier and scope versions come
+from `app.core.cache`, so both stacks read and write the same entries
+and see the same invalidations. Writes (and therefore version bumps)
+stay on the sync path.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from app.core.cache import (
+    CacheEntry,
+    CacheMeta,
+    _META_FIELDS,
+    _entry_fields,
+    _entry_from_fields,
+    _local_cache_versions,
+    _local_entry,
+    _lock_name,
+    _meta_from_values,
+    _new_entry,
+    _record_fetched_versions,
+    _remember_entry,
+    _request_key_prefix,
+    _version_key,
+    _version_tags,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_async_redis_client: aioredis.Redis | None = None
+
+_inflight: dict[str, asyncio.Future] = {}
+
+AsyncLoader = Callable[[], Awaitable[dict | str | None]]
+
+
+def get_async_redis_client() -> aioredis.Redis:
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _async_redis_client
+
+
+async def get_cache_versions_async(*scopes: str) -> list[int]:
+    """Async `cache.get_cache_versions`: one MGET for scopes not known locally."""
+    if not scopes:
+        return []
+    versions = _local_cache_versions(scopes)
+    missing = [scope for scope in scopes if scope not in versions]
+    values: list[str | None] = []
+    if missing:
+        try:
+            values = await get_async_redis_client().mget(
+                [_version_key(scope) for scope in missing]
+            )
+        except Exception:
+            values = [None] * len(missing)
+    _record_fetched_versions(versions, missing, values)
+    return [versions[scope] for scope in scopes]
+
+
+async def build_cache_key_async(request: Request, *scopes: str) -> str:
+    """Build a cache key from the request and the versions of its scopes."""
+    versions = await get_cache_versions_async(*scopes)
+    return f"{_request_key_prefix(request)}:{_version_tags(scopes, versions)}"
+
+
+async def cache_get_meta_async(key: str) -> CacheMeta | None:
+    """Read an entry's metadata without transferring its body."""
+    local = _local_entry(key)
+    if local is not None:
+        return local
+    try:
+        return _meta_from_values(await get_async_redis_client().hmget(key, _META_FIELDS))
+    except Exception:
+        return None
+
+
+async def cache_get_entry_async(key: str) -> CacheEntry | None:
+    local = _local_entry(key)
+    if local is not None:
+        return local
+    try:
+        entry = _entry_from_fields(await get_async_redis_client().hgetall(key))
+    except Exception:
+        return None
+    _remember_entry(key, entry)
+    return entry
+
+
+async def cache_get_async(key: str) -> Any | None:
+    entry = await cache_get_entry_async(key)
+    return entry.value if entry else None
+
+
+async def cache_set_async(
+    key: str, value: dict | str, ttl: int = 60, soft_ttl: int | None = None
+) -> CacheEntry:
+    entry = _new_entry(value, ttl, soft_ttl)
+    _remember_entry(key, entry)
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=True)
+        pipe.hset(key, mapping=_entry_fields(entry))
+        pipe.expire(key, ttl)
+        await pipe.execute()
+    except Exception:
+        pass
+    return entry
+
+
+async def _wait_for_remote_builder(key: str) -> CacheEntry | None:
+    """Poll for a value being built by another worker.
+
+    Returns None when the wait times out or the lock disappears without a
+    value being stored (e.g. the entity does not exist, or the holder crashed).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.cache_lock_wait
+    client = get_async_redis_client()
+    while loop.time() < deadline:
+        await asyncio.sleep(settings.cache_lock_poll_interval)
+        entry = await cache_get_entry_async(key)
+        if entry is not None:
+            return entry
+        try:
+            if not await client.exists(_lock_name(key)):
+                return None
+        except Exception:
+            return None
+    return None
+
+
+async def _try_lock(key: str):
+    """Try to take the cross-worker build lock for key without blocking.
+
+    Returns (lock, acquired); lock is None when Redis is unreachable.
+    """
+    try:
+        lock = get_async_redis_client().lock(
+            _lock_name(key), timeout=settings.cache_lock_ttl, blocking=False
+        )
+        return lock, await lock.acquire()
+    except Exception:
+        return None, False
+
+
+async def _release(lock) -> None:
+    try:
+        await lock.release()
+    except Exception:
+        # Lock expired while building; the next holder owns it now
+        pass
+
+
+async def _load_and_store(
+    key: str, loader: AsyncLoader, ttl: int, soft_ttl: int | None
+) -> CacheEntry | None:
+    value = await loader()
+    if value is None:
+        return None
+    return await cache_set_async(key, value, ttl, soft_ttl)
+
+
+async def _build_with_remote_lock(
+    key: str, loader: AsyncLoader, ttl: int, soft_ttl: int | None
+) -> CacheEntry | None:
+    lock, acquired = await _try_lock(key)
+
+    if lock is not None and not acquired:
+        entry = await _wait_for_remote_builder(key)
+        if entry is not None:
+            return entry
+
+    try:
+        # The previous holder may have stored the value while we acquired
+        entry = await cache_get_entry_async(key) if acquired else None
+        if entry is None or entry.is_stale:
+            entry = await _load_and_store(key, loader, ttl, soft_ttl)
+        return entry
+    finally:
+        if acquired:
+            await _release(lock)
+
+
+async def refresh_cache_entry_async(
+    key: str, loader: AsyncLoader, ttl: int = 60, soft_ttl: int | None = None
+) -> None:
+    """Rebuild a stale entry unless another task or worker already is.
+
+    Intended to run in the background after a stale value was served.
+    """
+    if key in _inflight:
+        return None
+    future = _inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        lock, acquired = await _try_lock(key)
+        if lock is not None and not acquired:
+            return None
+        try:
+            future.set_result(await _load_and_store(key, loader, ttl, soft_ttl))
+        finally:
+            if acquired:
+                await _release(lock)
+    except Exception:
+        logger.warning("Background refresh of %s failed", key, exc_info=True)
+    finally:
+        _inflight.pop(key, None)
+        if not future.done():
+            future.set_result(None)
+
+
+async def cache_get_or_compute_async(
+    key: str,
+    loader: AsyncLoader,
+    ttl: int = 60,
+    soft_ttl: int | None = None,
+    on_stale: Callable[[], Any] | None = None,
+) -> CacheEntry | None:
+    """Return the cached entry for key, building it at most once per miss.
+
+    `loader` returns a JSON-serializable dict or an encoded JSON body, or
+    None when there is nothing to cache (e.g. the entity does not exist).
+    Concurrent misses in the event loop wait for one build. A stale entry
+    is returned as-is after calling `on_stale`, which should schedule a
+    `refresh_cache_entry_async` (typically as a background task).
+    """
+    entry = await cache_get_entry_async(key)
+    if entry is not None:
+        if entry.is_stale and on_stale is not None:
+            on_stale()
+        return entry
+
+    future = _inflight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), timeout=settings.cache_lock_wait
+            )
+        except asyncio.TimeoutError:
+            # The leader is taking too long; build independently
+            return await _load_and_store(key, loader, ttl, soft_ttl)
+
+    future = _inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        entry = await _build_with_remote_lock(key, loader, ttl, soft_ttl)
+        future.set_result(entry)
+        return entry
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        # Followers re-raise it; don't warn about an unretrieved exception
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(key, None)
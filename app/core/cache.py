@@ -1,19 +1,60 @@
 """Redis-based caching for expensive operations.
 
 Used primarily for caching account statements which require
-aggregation across multiple tables. Cache is invalidated
-when invoices or payments are created/updated.
+aggregation across multiple tables.
+
+Cache keys are tagged with generation counters ("versions") for the
+entities they depend on, e.g. `school:1` or `student:7`. Writes bump the
+version with a single INCR instead of scanning for keys, so invalidation
+is O(1); entries built against an old version are never read again and
+simply expire by TTL.
+
+When `settings.local_cache_enabled` is set, an in-process LRU tier sits
+in front of Redis for both payloads and scope versions, so hot entries
+are served without a network hop. Version bumps are published on
+`settings.cache_invalidation_channel`; every worker runs a listener
+that applies them to its local version table, keeping the tiers
+coherent across processes and ECS tasks. If a message is missed, local
+entries still expire after `settings.local_cache_ttl` seconds.
+
+Cache misses are coalesced by `app.core.async_cache`, which serves the
+statement endpoints: within a worker only one task runs the loader for
+a key while the others wait for its result, and across workers a
+short-lived Redis lock (`_lock_name`) elects a single builder. Waiters
+give up after `settings.cache_lock_wait` seconds and build the value
+themselves, and the lock expires after `settings.cache_lock_ttl`
+seconds, so a crashed holder cannot block readers.
+
+Entries have a soft and a hard TTL. Up to the soft TTL an entry is fresh;
+between the soft and the hard TTL it is stale but still served, and the
+caller schedules a background refresh (stale-while-revalidate, see
+`app.core.async_cache.refresh_cache_entry_async`). Redis
+drops the entry at the hard TTL.
+
+Entries hold the final encoded response body and its content-hash ETag
+in a Redis hash, so hits are sent as raw bytes and conditional requests
+can be answered from the ETag field alone.
 """
+import hashlib
 import json
+import logging
+import time
+from dataclasses import dataclass
 from typing import Any
 
 import redis
 from fastapi import Request
 
 from app.core.config import settings
+from app.core.local_cache import LocalLRUCache
 
+logger = logging.getLogger(__name__)
 
 _redis_client: redis.Redis | None = None
+_pubsub_thread: Any | None = None
+
+_local_values = LocalLRUCache(settings.local_cache_max_entries, settings.local_cache_ttl)
+_local_versions = LocalLRUCache(settings.local_cache_max_entries, settings.local_cache_ttl)
 
 
 def get_redis_client() -> redis.Redis:
@@ -23,7 +64,147 @@ def get_redis_client() -> redis.Redis:
     return _redis_client
 
 
-def build_cache_key(request: Request) -> str:
+def school_scope(school_id: int) -> str:
+    return f"school:{school_id}"
+
+
+def student_scope(student_id: int) -> str:
+    return f"student:{student_id}"
+
+
+def table_scope(table: str) -> str:
+    """Scope for cached data that depends on a whole table (e.g. list totals)."""
+    return f"table:{table}"
+
+
+def _version_key(scope: str) -> str:
+    return f"cache:version:{scope}"
+
+
+def _remember_version(scope: str, version: int) -> None:
+    # Messages may arrive out of order; never move a scope backwards
+    current = _local_versions.get(scope)
+    if current is None or version > current:
+        _local_versions.set(scope, version)
+
+
+def _local_cache_versions(scopes: tuple[str, ...]) -> dict[str, int]:
+    """Versions of scopes known to this worker's local tier."""
+    versions: dict[str, int] = {}
+    if settings.local_cache_enabled:
+        for scope in scopes:
+            version = _local_versions.get(scope)
+            if version is not None:
+                versions[scope] = version
+    return versions
+
+
+def _record_fetched_versions(
+    versions: dict[str, int], missing: list[str], values: list[str | None]
+) -> None:
+    for scope, value in zip(missing, values):
+        versions[scope] = int(value) if value else 0
+        if settings.local_cache_enabled:
+            _remember_version(scope, versions[scope])
+
+
+def get_cache_versions(*scopes: str) -> list[int]:
+    """Fetch the current version of each scope in one round trip.
+
+    Scopes that were never bumped (or an unreachable Redis) read as 0.
+    With the local tier enabled, known versions are served in-process
+    and only unknown scopes are fetched.
+    """
+    if not scopes:
+        return []
+    versions = _local_cache_versions(scopes)
+    missing = [scope for scope in scopes if scope not in versions]
+    values: list[str | None] = []
+    if missing:
+        try:
+            values = get_redis_client().mget([_version_key(scope) for scope in missing])
+        except Exception:
+            values = [None] * len(missing)
+    _record_fetched_versions(versions, missing, values)
+    return [versions[scope] for scope in scopes]
+
+
+def bump_cache_versions(*scopes: str) -> None:
+    """Invalidate every cache entry tagged with any of the given scopes.
+
+    The new versions are published so other workers' local tiers follow.
+    """
+    if not scopes:
+        return None
+    try:
+        client = get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(_version_key(scope))
+        new_versions = dict(zip(scopes, pipe.execute()))
+        client.publish(settings.cache_invalidation_channel, json.dumps(new_versions))
+    except Exception:
+        # Without Redis there is nothing shared to invalidate; drop local state
+        for scope in scopes:
+            _local_versions.delete(scope)
+        return None
+    if settings.local_cache_enabled:
+        for scope, version in new_versions.items():
+            _remember_version(scope, version)
+
+
+def _handle_invalidation_message(message: dict) -> None:
+    try:
+        versions = json.loads(message["data"])
+        for scope, version in versions.items():
+            _remember_version(scope, int(version))
+    except Exception:
+        logger.warning("Ignoring malformed cache invalidation message: %r", message)
+
+
+def _handle_listener_error(exc: BaseException, pubsub: Any, thread: Any) -> None:
+    # Messages may have been missed while disconnected; re-read versions
+    logger.warning("Cache invalidation listener error: %s", exc)
+    _local_versions.clear()
+
+
+def start_invalidation_listener() -> None:
+    """Subscribe this worker to version bumps published by other workers.
+
+    No-op unless the local tier is enabled. Safe to call more than once.
+    """
+    global _pubsub_thread
+    if not settings.local_cache_enabled or _pubsub_thread is not None:
+        return None
+    try:
+        pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{settings.cache_invalidation_channel: _handle_invalidation_message})
+        _pubsub_thread = pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=_handle_listener_error
+        )
+    except Exception:
+        logger.warning("Could not start cache invalidation listener", exc_info=True)
+
+
+def stop_invalidation_listener() -> None:
+    global _pubsub_thread
+    if _pubsub_thread is None:
+        return None
+    try:
+        _pubsub_thread.stop()
+    except Exception:
+        pass
+    _pubsub_thread = None
+    clear_local_cache()
+
+
+def clear_local_cache() -> None:
+    """Drop every entry held by this worker's in-process tier."""
+    _local_versions.clear()
+    _local_values.clear()
+
+
+def _request_key_prefix(request: Request) -> str:
     method = request.method.upper()
     path = request.url.path
     params = sorted(request.query_params.items())
@@ -34,28 +215,131 @@ def build_cache_key(request: Request) -> str:
     return f"cache:{method}:{path}:{query_string}"
 
 
-def cache_get(key: str) -> dict | None:
-    try:
-        value = get_redis_client().get(key)
-        if not value:
-            return None
-        return json.loads(value)
-    except Exception:
+def _version_tags(scopes: tuple[str, ...] | list[str], versions: list[int]) -> str:
+    return ",".join(f"{scope}@{version}" for scope, version in zip(scopes, versions))
+
+
+def compute_etag(body: str) -> str:
+    """Strong ETag derived from the content hash of an encoded body."""
+    return '"' + hashlib.sha256(body.encode()).hexdigest()[:32] + '"'
+
+
+@dataclass(frozen=True)
+class CacheMeta:
+    """Metadata of a cached entry: enough for soft-TTL and ETag checks."""
+
+    etag: str
+    stored_at: float
+    fresh_for: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.age >= self.fresh_for
+
+
+@dataclass(frozen=True)
+class CacheEntry(CacheMeta):
+    """A cached, already JSON-encoded response body."""
+
+    body: str
+
+    @property
+    def value(self) -> Any:
+        return json.loads(self.body)
+
+
+_META_FIELDS = ["etag", "stored_at", "fresh_for"]
+
+
+def _meta_from_values(values: list[str | None]) -> CacheMeta | None:
+    etag, stored_at, fresh_for = values
+    if etag is None:
+        return None
+    return CacheMeta(etag=etag, stored_at=float(stored_at), fresh_for=float(fresh_for))
+
+
+def _entry_from_fields(fields: dict[str, str]) -> CacheEntry | None:
+    if not fields or "body" not in fields:
         return None
+    return CacheEntry(
+        body=fields["body"],
+        etag=fields["etag"],
+        stored_at=float(fields["stored_at"]),
+        fresh_for=float(fields["fresh_for"]),
+    )
+
+
+def _new_entry(value: dict | str, ttl: int, soft_ttl: int | None) -> CacheEntry:
+    body = value if isinstance(value, str) else json.dumps(value, default=str)
+    return CacheEntry(
+        body=body,
+        etag=compute_etag(body),
+        stored_at=time.time(),
+        fresh_for=min(soft_ttl, ttl) if soft_ttl is not None else ttl,
+    )
+
+
+def _entry_fields(entry: CacheEntry) -> dict[str, str | float]:
+    return {
+        "body": entry.body,
+        "etag": entry.etag,
+        "stored_at": entry.stored_at,
+        "fresh_for": entry.fresh_for,
+    }
+
 
+def _local_entry(key: str) -> CacheEntry | None:
+    if settings.local_cache_enabled:
+        return _local_values.get(key)
+    return None
 
-def cache_set(key: str, value: dict, ttl: int = 60) -> None:
+
+def _remember_entry(key: str, entry: CacheEntry | None) -> None:
+    if settings.local_cache_enabled and entry is not None:
+        _local_values.set(key, entry)
+
+
+def cache_get_entry(key: str) -> CacheEntry | None:
+    local = _local_entry(key)
+    if local is not None:
+        return local
     try:
-        payload = json.dumps(value, default=str)
-        get_redis_client().setex(key, ttl, payload)
+        entry = _entry_from_fields(get_redis_client().hgetall(key))
     except Exception:
         return None
+    _remember_entry(key, entry)
+    return entry
+
+
+def cache_get(key: str) -> Any | None:
+    entry = cache_get_entry(key)
+    return entry.value if entry else None
 
 
-def cache_invalidate_prefix(prefix: str) -> None:
+def cache_set(
+    key: str, value: dict | str, ttl: int = 60, soft_ttl: int | None = None
+) -> CacheEntry:
+    """Store value for `ttl` seconds, treating it as fresh for `soft_ttl`.
+
+    `value` is either a dict or an already JSON-encoded body, which is
+    stored verbatim so hits can be sent without re-encoding. `soft_ttl`
+    defaults to `ttl`, i.e. the entry never goes stale.
+    """
+    entry = _new_entry(value, ttl, soft_ttl)
+    _remember_entry(key, entry)
     try:
-        client = get_redis_client()
-        for key in client.scan_iter(match=f"{prefix}*"):
-            client.delete(key)
+        pipe = get_redis_client().pipeline(transaction=True)
+        pipe.hset(key, mapping=_entry_fields(entry))
+        pipe.expire(key, ttl)
+        pipe.execute()
     except Exception:
-        return None
+        pass
+    return entry
+
+
+def _lock_name(key: str) -> str:
+    return f"cache:lock:{key}"
@@ -16,10 +16,81 @@ def _get_api_key() -> str:
 
 class Settings(BaseSettings):
     database_url: str = "postgresql+psycopg2://mattilda_user:mattilda_password@db:5432/mattilda_db"
+    # Defaults to database_url with the asyncio driver (asyncpg/aiosqlite)
+    async_database_url: str | None = None
+    # Optional streaming replica for read-only endpoints (sync driver URL;
+    # the async URL is derived from it)
+    read_database_url: str | None = None
+    # Reads fall back to the primary while the replica lags more than this
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval: float = 5.0
+
+    # Connection pool, per engine (sync and async each get their own)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    # Recycle connections before RDS/proxy idle limits close them (seconds)
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Postgres server-side limits for every session (milliseconds, 0 disables)
+    db_statement_timeout_ms: int = 15_000
+    db_idle_in_transaction_timeout_ms: int = 60_000
+
+    # Rows per multi-row INSERT in bulk endpoints
+    bulk_insert_chunk_size: int = 1000
+    # Keys per multi-get request (?ids= / ?external_ids=)
+    batch_lookup_max_keys: int = 500
+    # Billing runs: students per INSERT ... SELECT transaction, and the TTL
+    # of the run's Redis lock (renewed after every chunk, seconds)
+    billing_run_chunk_size: int = 500
+    billing_run_lock_ttl: float = 60.0
+
+    # Monthly partitions (Postgres) are created this many months ahead, by
+    # a maintenance thread per worker running every interval (seconds, 0
+    # disables it)
+    partition_months_ahead: int = 3
+    partition_maintenance_interval: float = 0
+
+    # Paid/cancelled invoices issued longer ago than this (days) are moved
+    # to the archive tables, this many invoices per transaction
+    archive_after_days: int = 730
+    archive_chunk_size: int = 500
+
+    # Overdue scans: invoices per transaction, and the TTL of the scan's
+    # Redis lock (renewed after every chunk, seconds)
+    overdue_scan_chunk_size: int = 500
+    overdue_scan_lock_ttl: float = 60.0
+
     api_key: str = _get_api_key()
     redis_url: str = "redis://redis:6379/0"
     environment: str = "development"
 
+    # Optional per-worker in-memory tier in front of Redis (see app.core.cache)
+    local_cache_enabled: bool = False
+    local_cache_max_entries: int = 512
+    local_cache_ttl: float = 10.0
+    cache_invalidation_channel: str = "cache:invalidate"
+
+    # Statements are fresh for the soft TTL, then served stale while a
+    # background refresh runs, until Redis drops them at the hard TTL (seconds)
+    statement_cache_soft_ttl: int = 60
+    statement_cache_ttl: int = 300
+
+    # Exact list totals, cached per filter combination (seconds)
+    count_cache_ttl: int = 300
+
+    # Single-flight rebuilds of cache misses (seconds)
+    cache_lock_ttl: float = 10.0
+    cache_lock_wait: float = 5.0
+    cache_lock_poll_interval: float = 0.05
+
+    # Idempotency-Key responses are kept for the TTL; an in-flight claim
+    # expires after the lock TTL, and duplicates wait up to the wait time
+    # for the first request to finish (seconds)
+    idempotency_ttl: int = 86_400
+    idempotency_lock_ttl: int = 60
+    idempotency_wait: float = 10.0
+
     model_config = SettingsConfigDict(env_prefix="", case_sensitive=False)
 
 
@@ -1,15 +1,208 @@
-"""Database session and connection management."""
-from sqlalchemy import create_engine
-from typing import Generator
+"""Database session and connection management.
 
+Two stacks share the same database: the sync engine/`Session` used by
+write endpoints, and an asyncio engine/`AsyncSession` used by the read
+endpoints so they wait on I/O without holding a worker thread.
+
+Both engines use a bounded, pre-pinged, recycled pool sized from
+settings, and every Postgres session gets a server-side
+`statement_timeout` and `idle_in_transaction_session_timeout`, so a
+runaway query or a leaked transaction cannot hold a connection forever.
+Checkout waits are recorded in `app.core.metrics`.
+
+With `read_database_url` set, read-only endpoints (`get_read_db`,
+`get_async_read_db`) use a streaming replica while writes and
+read-after-write flows stay on the primary (`get_db`). A lag guard
+sends reads back to the primary while the replica is behind by more
+than `replica_max_lag_seconds`. Anything stored in the cache is built
+on the primary, even for replica reads (see `is_replica_session`): the
+replica may not have the write that invalidated the previous entry yet.
+"""
+import threading
+import time
+from typing import Any, AsyncGenerator, Callable, Generator
+
+from sqlalchemy import create_engine, exc, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import record_pool_checkout
+
+
+class _CheckoutTimingMixin:
+	"""Record how long each checkout waited, including pool timeouts."""
+
+	def connect(self):
+		start = time.perf_counter()
+		timed_out = False
+		try:
+			return super().connect()
+		except exc.TimeoutError:
+			timed_out = True
+			raise
+		finally:
+			record_pool_checkout(self.logging_name, time.perf_counter() - start, timed_out)
+
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+	pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+	pass
+
+
+def to_async_url(url: str) -> str:
+	"""Map a sync driver URL onto the matching asyncio driver."""
+	return url.replace("+psycopg2", "+asyncpg").replace("+pysqlite", "+aiosqlite")
+
+
+def _session_timeouts() -> dict[str, str]:
+	return {
+		"statement_timeout": str(settings.db_statement_timeout_ms),
+		"idle_in_transaction_session_timeout": str(settings.db_idle_in_transaction_timeout_ms),
+	}
 
-engine = create_engine(settings.database_url, future=True)
+
+def engine_options(url: str, name: str) -> dict[str, Any]:
+	"""Pool and connection options for an engine on url.
+
+	SQLite (tests, benchmarks) keeps SQLAlchemy's defaults.
+	"""
+	parsed = make_url(url)
+	if parsed.get_backend_name() == "sqlite":
+		return {}
+
+	is_async = parsed.get_driver_name() == "asyncpg"
+	if is_async:
+		connect_args = {"server_settings": _session_timeouts()}
+	else:
+		connect_args = {
+			"options": " ".join(f"-c {key}={value}" for key, value in _session_timeouts().items())
+		}
+	return {
+		"poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+		"pool_logging_name": name,
+		"pool_size": settings.db_pool_size,
+		"max_overflow": settings.db_max_overflow,
+		"pool_timeout": settings.db_pool_timeout,
+		"pool_recycle": settings.db_pool_recycle,
+		"pool_pre_ping": settings.db_pool_pre_ping,
+		"connect_args": connect_args,
+	}
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+	"""Current occupancy of a bounded pool; saturation is checked out / capacity."""
+	if not isinstance(pool, QueuePool):
+		return {}
+	capacity = pool.size() + settings.db_max_overflow
+	return {
+		"size": pool.size(),
+		"checked_out": pool.checkedout(),
+		"overflow": max(pool.overflow(), 0),
+		"capacity": capacity,
+		"saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+	}
+
+
+engine = create_engine(
+	settings.database_url, future=True, **engine_options(settings.database_url, "sync")
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+
+async_engine = create_async_engine(
+	_async_database_url, **engine_options(_async_database_url, "async")
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.read_database_url:
+	read_engine = create_engine(
+		settings.read_database_url,
+		future=True,
+		**engine_options(settings.read_database_url, "read"),
+	)
+	_async_read_database_url = to_async_url(settings.read_database_url)
+	async_read_engine = create_async_engine(
+		_async_read_database_url, **engine_options(_async_read_database_url, "async-read")
+	)
+	ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+	AsyncReadSessionLocal = async_sessionmaker(
+		async_read_engine, autoflush=False, expire_on_commit=False
+	)
+else:
+	read_engine = async_read_engine = None
+	ReadSessionLocal = SessionLocal
+	AsyncReadSessionLocal = AsyncSessionLocal
+
+# Seconds since the last replayed transaction; 0 when fully caught up
+# (an idle primary produces no WAL, so the replay timestamp alone would
+# report growing lag) or when not a replica
+REPLICA_LAG_SQL = text(
+	"SELECT CASE WHEN pg_is_in_recovery() "
+	"AND pg_last_wal_receive_lsn() <> pg_last_wal_replay_lsn() "
+	"THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+	"ELSE 0 END"
+)
+
+
+class ReplicaLagGuard:
+	"""Track whether the replica is fresh enough to serve reads.
+
+	Lag is measured at most once per `replica_lag_check_interval`; an
+	unreachable replica counts as lagging, so reads fail over to the
+	primary.
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._checked_at = float("-inf")
+		self.fresh = True
+		self.lag: float | None = None
+
+	def _due(self) -> bool:
+		return time.monotonic() - self._checked_at >= settings.replica_lag_check_interval
+
+	def _record(self, lag: float | None) -> bool:
+		with self._lock:
+			self._checked_at = time.monotonic()
+			self.lag = lag
+			self.fresh = lag is not None and lag <= settings.replica_max_lag_seconds
+			return self.fresh
+
+	def check(self) -> bool:
+		if read_engine is None:
+			return False
+		if not self._due():
+			return self.fresh
+		try:
+			with read_engine.connect() as connection:
+				lag = float(connection.execute(REPLICA_LAG_SQL).scalar() or 0)
+		except Exception:
+			lag = None
+		return self._record(lag)
+
+	async def check_async(self) -> bool:
+		if async_read_engine is None:
+			return False
+		if not self._due():
+			return self.fresh
+		try:
+			async with async_read_engine.connect() as connection:
+				lag = float((await connection.execute(REPLICA_LAG_SQL)).scalar() or 0)
+		except Exception:
+			lag = None
+		return self._record(lag)
+
+
+replica_guard = ReplicaLagGuard()
+
 Base = declarative_base()
 
 
@@ -23,3 +216,40 @@ def get_db() -> Generator[Session, None, None]:
 		yield db
 	finally:
 		db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+	"""FastAPI dependency that provides an asyncio database session."""
+	async with AsyncSessionLocal() as db:
+		yield db
+
+
+def get_async_session_factory() -> Callable[[], AsyncSession]:
+	"""FastAPI dependency that provides a factory for sessions outliving the request.
+
+	Used by background tasks, which run after the request session is closed.
+	"""
+	return AsyncSessionLocal
+
+
+def get_read_db() -> Generator[Session, None, None]:
+	"""FastAPI dependency for read-only endpoints: the replica when fresh."""
+	db = ReadSessionLocal() if replica_guard.check() else SessionLocal()
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+	"""Async `get_read_db`."""
+	fresh = await replica_guard.check_async()
+	async with (AsyncReadSessionLocal if fresh else AsyncSessionLocal)() as db:
+		yield db
+
+
+def is_replica_session(db: Session | AsyncSession) -> bool:
+	"""Whether db reads from the replica rather than the primary."""
+	if read_engine is None:
+		return False
+	return db.get_bind() in (read_engine, async_read_engine.sync_engine)
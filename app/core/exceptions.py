@@ -1,7 +1,7 @@
 """Domain exceptions for business logic errors.
 
 These exceptions are caught by FastAPI exception handlers in main.py
-and converted to appropriate HTTP responses (400, 404, 422).
+and converted to appropriate HTTP responses (400, 404, 409, 422).
 """
 
 
@@ -33,3 +33,9 @@ class BusinessRuleError(DomainException):
     """Raised when an operation violates a business rule (e.g., overpayment)."""
 
     pass
+
+
+class ConflictError(DomainException):
+    """Raised when an operation conflicts with one already in progress."""
+
+    pass
@@ -0,0 +1,189 @@
+"""`Idempotency-Key` support for POST endpoints, backed by Redis.
+
+Clients (and payment-processor webhooks) retry POSTs on timeouts. When a
+request to one of the middleware's `paths` carries an `Idempotency-Key`
+header, the first request claims the key with `SET NX` and runs
+normally; its response (status, headers and body) is stored under the
+key for `settings.idempotency_ttl` seconds. Retries with the same key
+get the stored response byte-for-byte, marked with an
+`Idempotent-Replayed: true` header, without reaching the endpoint or
+the database.
+
+A duplicate that arrives while the first request is still running polls
+until the response is stored, for up to `settings.idempotency_wait`
+seconds, and then gets 409. The claim expires after
+`settings.idempotency_lock_ttl` seconds, so a crashed worker cannot hold
+a key forever. 5xx, 401 and 403 responses are not stored: the key is
+released and the client can retry. Reusing a key with a different
+request body is rejected with 422.
+
+Keys are only claimed or replayed for requests with a valid API key;
+others pass straight through to the endpoint, which rejects them, so a
+stored response is never handed to an unauthenticated caller.
+
+If Redis is unreachable, requests pass through without idempotency.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from collections.abc import Iterable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.async_cache import get_async_redis_client
+from app.core.config import settings
+from app.core.security import verify_api_key
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Responses that depend on the attempt rather than the request: released
+# instead of stored, so a corrected retry runs again
+_UNSTORED_STATUSES = frozenset({401, 403})
+
+_IN_PROGRESS = "in_progress"
+_COMPLETED = "completed"
+
+
+def _error(status_code: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code, content={"error": {"code": code, "message": message}}
+    )
+
+
+def _record_key(request: Request, key: str) -> str:
+    return f"idempotency:{request.method}:{request.url.path}:{key}"
+
+
+def _authenticated(request: Request) -> bool:
+    try:
+        verify_api_key(request.headers.get("x-api-key"))
+    except HTTPException:
+        return False
+    return True
+
+
+def _fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def _completed_record(fingerprint: str, status_code: int, headers, body: bytes) -> str:
+    return json.dumps(
+        {
+            "state": _COMPLETED,
+            "fingerprint": fingerprint,
+            "status": status_code,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")] for name, value in headers
+            ],
+            "body": base64.b64encode(body).decode(),
+        }
+    )
+
+
+async def _release(record_key: str) -> None:
+    try:
+        await get_async_redis_client().delete(record_key)
+    except Exception:
+        pass
+
+
+def _replay(record: dict) -> Response:
+    response = Response(
+        content=base64.b64decode(record["body"]), status_code=record["status"]
+    )
+    # Stored headers already include Content-Type and Content-Length
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]
+    ] + [(REPLAYED_HEADER.lower().encode(), b"true")]
+    return response
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """Make POSTs to `paths` idempotent per `Idempotency-Key` header."""
+
+    def __init__(self, app, paths: Iterable[str]) -> None:
+        super().__init__(app)
+        self.paths = frozenset(paths)
+
+    async def dispatch(self, request: Request, call_next):  # type: ignore[override]
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None or request.method != "POST" or request.url.path not in self.paths:
+            return await call_next(request)
+        if not _authenticated(request):
+            # Rejected by the endpoint; never claim or replay a key for it
+            return await call_next(request)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(
+                400,
+                "VALIDATION_ERROR",
+                f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+            )
+
+        record_key = _record_key(request, key)
+        fingerprint = _fingerprint(await request.body())
+        client = get_async_redis_client()
+        claim = json.dumps({"state": _IN_PROGRESS, "fingerprint": fingerprint})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.idempotency_wait
+        while True:
+            try:
+                claimed = await client.set(
+                    record_key, claim, nx=True, ex=settings.idempotency_lock_ttl
+                )
+                stored = None if claimed else await client.get(record_key)
+            except Exception:
+                logger.warning("Idempotency store unavailable for %s", record_key, exc_info=True)
+                return await call_next(request)
+            if claimed:
+                return await self._run_and_store(request, call_next, record_key, fingerprint)
+            if stored is not None:
+                record = json.loads(stored)
+                if record["fingerprint"] != fingerprint:
+                    return _error(
+                        422,
+                        "IDEMPOTENCY_KEY_REUSED",
+                        "Idempotency-Key was already used with a different request body",
+                    )
+                if record["state"] == _COMPLETED:
+                    return _replay(record)
+            # In progress elsewhere, or released after a failure: wait and retry
+            if loop.time() >= deadline:
+                return _error(
+                    409, "CONFLICT", "A request with this Idempotency-Key is still in progress"
+                )
+            await asyncio.sleep(settings.cache_lock_poll_interval)
+
+    async def _run_and_store(
+        self, request: Request, call_next, record_key: str, fingerprint: str
+    ) -> Response:
+        client = get_async_redis_client()
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            await _release(record_key)
+            raise
+
+        if response.status_code >= 500 or response.status_code in _UNSTORED_STATUSES:
+            await _release(record_key)
+        else:
+            record = _completed_record(
+                fingerprint, response.status_code, response.raw_headers, body
+            )
+            try:
+                await client.set(record_key, record, ex=settings.idempotency_ttl)
+            except Exception:
+                logger.warning("Could not store response for %s", record_key, exc_info=True)
+
+        buffered = Response(content=body, status_code=response.status_code)
+        buffered.raw_headers = response.raw_headers
+        return buffered
@@ -0,0 +1,52 @@
+"""In-process LRU cache with per-entry TTL.
+
+Used as the first tier in front of Redis (see `app.core.cache`). Each
+worker process has its own instance, so entries must be small enough to
+duplicate per worker and short-lived enough that a missed invalidation
+only serves stale data for a bounded time.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LocalLRUCache:
+    """Thread-safe LRU cache bounded by entry count and TTL."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
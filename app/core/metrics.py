@@ -2,6 +2,7 @@ import threading
 
 _lock = threading.Lock()
 _requests_total = 0
+_pool_checkouts: dict[str, dict[str, float]] = {}
 
 
 def increment_requests() -> None:
@@ -13,3 +14,21 @@ def increment_requests() -> None:
 def get_requests_total() -> int:
     with _lock:
         return _requests_total
+
+
+def record_pool_checkout(pool: str, wait_seconds: float, timed_out: bool = False) -> None:
+    """Record how long a connection checkout from `pool` waited."""
+    wait_ms = wait_seconds * 1000
+    with _lock:
+        stats = _pool_checkouts.setdefault(
+            pool, {"count": 0, "timeouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+        )
+        stats["count"] += 1
+        stats["timeouts"] += int(timed_out)
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+
+
+def get_pool_checkout_stats() -> dict[str, dict[str, float]]:
+    with _lock:
+        return {pool: dict(stats) for pool, stats in _pool_checkouts.items()}
@@ -0,0 +1,107 @@
+"""Monthly range partitions for time-series tables (Postgres only).
+
+Models declare their partition key in `__table_args__` info (see
+`Payment`). Migration 20260120_0009 turns those tables into tables
+partitioned by month, with a DEFAULT partition, and installs the
+`ensure_monthly_partitions` database function. `ensure_partitions`
+calls it to create the partitions of the coming months ahead of time,
+so inserts land in a monthly partition rather than in the DEFAULT one
+(rows that did are moved when their month is created).
+
+SQLite and unpartitioned tables (e.g. built with `create_all`) are left
+alone, so tests run on plain tables.
+
+Each worker runs the maintenance every
+`settings.partition_maintenance_interval` seconds in a daemon thread;
+the database function takes an advisory lock, so workers don't collide.
+"""
+import logging
+import threading
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import Base, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ENSURE_PARTITIONS_SQL = text(
+    """
+    SELECT ensure_monthly_partitions(
+        :table,
+        :column,
+        date_trunc('month', now() AT TIME ZONE 'UTC')::date,
+        (date_trunc('month', now() AT TIME ZONE 'UTC')
+            + make_interval(months => :months_ahead))::date
+    )
+    """
+)
+
+_maintenance_thread: threading.Thread | None = None
+_maintenance_stop = threading.Event()
+
+
+def partitioned_tables() -> list[Table]:
+    """Tables whose model declares a `partition_key`."""
+    return [table for table in Base.metadata.sorted_tables if "partition_key" in table.info]
+
+
+def ensure_partitions(db: Session, months_ahead: int | None = None) -> dict[str, int]:
+    """Create missing partitions up to `months_ahead` months from now.
+
+    Returns the number of partitions created per table.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return {}
+    months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+    created = {}
+    for table in partitioned_tables():
+        created[table.name] = db.scalar(
+            ENSURE_PARTITIONS_SQL,
+            {
+                "table": table.name,
+                "column": table.info["partition_key"],
+                "months_ahead": months_ahead,
+            },
+        )
+        # Each table's lock and DDL in its own short transaction
+        db.commit()
+    return created
+
+
+def _run_maintenance() -> None:
+    while True:
+        try:
+            with SessionLocal() as db:
+                created = ensure_partitions(db)
+            if any(created.values()):
+                logger.info("Created partitions: %s", created)
+        except Exception:
+            logger.warning("Partition maintenance failed", exc_info=True)
+        if _maintenance_stop.wait(settings.partition_maintenance_interval):
+            return
+
+
+def start_partition_maintenance() -> None:
+    """Start this worker's partition maintenance thread.
+
+    No-op unless `settings.partition_maintenance_interval` is set. Safe
+    to call more than once.
+    """
+    global _maintenance_thread
+    if settings.partition_maintenance_interval <= 0 or _maintenance_thread is not None:
+        return None
+    _maintenance_stop.clear()
+    _maintenance_thread = threading.Thread(
+        target=_run_maintenance, name="partition-maintenance", daemon=True
+    )
+    _maintenance_thread.start()
+
+
+def stop_partition_maintenance() -> None:
+    global _maintenance_thread
+    if _maintenance_thread is None:
+        return None
+    _maintenance_stop.set()
+    _maintenance_thread = None
@@ -3,25 +3,61 @@
 This module configures the FastAPI app, registers routes,
 middleware, and exception handlers for domain exceptions.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from app.api.v1.billing import router as billing_router
 from app.api.v1.health import router as health_router
 from app.api.v1.invoices import router as invoices_router
 from app.api.v1.payments import router as payments_router
 from app.api.v1.schools import router as schools_router
 from app.api.v1.students import router as students_router
+from app.core.cache import start_invalidation_listener, stop_invalidation_listener
+from app.core.db import (
+    async_engine,
+    async_read_engine,
+    engine,
+    pool_status,
+    read_engine,
+    replica_guard,
+)
 from app.core.exceptions import (
     BusinessRuleError,
+    ConflictError,
     DomainException,
     EntityNotFoundError,
     ValidationError,
 )
+from app.core.idempotency import IdempotencyMiddleware
 from app.core.logging import LoggingMiddleware
-from app.core.metrics import get_requests_total
-
-app = FastAPI(title="Mattilda Backend Challenge API")
-
+from app.core.partitions import start_partition_maintenance, stop_partition_maintenance
+from app.core.metrics import get_pool_checkout_stats, get_requests_total
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_invalidation_listener()
+    start_partition_maintenance()
+    yield
+    stop_partition_maintenance()
+    stop_invalidation_listener()
+
+
+app = FastAPI(title="Mattilda Backend Challenge API", lifespan=lifespan)
+
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths={
+        "/api/v1/schools",
+        "/api/v1/students",
+        "/api/v1/invoices",
+        "/api/v1/invoices/bulk",
+        "/api/v1/payments",
+    },
+)
+# Added last so it is outermost and also logs replayed responses
 app.add_middleware(LoggingMiddleware)
 
 
@@ -53,6 +89,14 @@ async def business_rule_error_handler(request: Request, exc: BusinessRuleError)
     )
 
 
+@app.exception_handler(ConflictError)
+async def conflict_error_handler(request: Request, exc: ConflictError) -> JSONResponse:
+    return JSONResponse(
+        status_code=409,
+        content={"error": {"code": "CONFLICT", "message": str(exc)}},
+    )
+
+
 @app.exception_handler(DomainException)
 async def domain_exception_handler(request: Request, exc: DomainException) -> JSONResponse:
     return JSONResponse(
@@ -68,7 +112,21 @@ def root() -> dict:
 
 @app.get("/metrics")
 def metrics() -> dict:
-    return {"requests_total": get_requests_total()}
+    checkouts = get_pool_checkout_stats()
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    replica = None
+    if read_engine is not None:
+        pools["read"] = read_engine.pool
+        pools["async-read"] = async_read_engine.sync_engine.pool
+        replica = {"fresh": replica_guard.fresh, "lag_seconds": replica_guard.lag}
+    return {
+        "requests_total": get_requests_total(),
+        "db_pools": {
+            name: {**pool_status(pool), "checkouts": checkouts.get(name, {})}
+            for name, pool in pools.items()
+        },
+        "replica": replica,
+    }
 
 
 app.include_router(health_router)
@@ -76,3 +134,4 @@ app.include_router(schools_router, prefix="/api/v1")
 app.include_router(students_router, prefix="/api/v1")
 app.include_router(invoices_router, prefix="/api/v1")
 app.include_router(payments_router, prefix="/api/v1")
+app.include_router(billing_router, prefix="/api/v1")
@@ -1,12 +1,20 @@
+from app.models.archive import InvoiceArchive, OpeningBalance, PaymentArchive
 from app.models.invoice import Invoice, InvoiceStatus
+from app.models.overdue import OverdueEvent, OverdueEventKind, OverdueInvoice
 from app.models.payment import Payment
 from app.models.school import School
 from app.models.student import Student, StudentStatus
 
 __all__ = [
     "Invoice",
+    "InvoiceArchive",
     "InvoiceStatus",
+    "OpeningBalance",
+    "OverdueEvent",
+    "OverdueEventKind",
+    "OverdueInvoice",
     "Payment",
+    "PaymentArchive",
     "School",
     "Student",
     "StudentStatus",
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum as SqlEnum,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+from app.models.invoice import InvoiceStatus
+
+
+class InvoiceArchive(Base):
+    """A settled invoice moved out of `invoices` by the archival job.
+
+    Same columns as `Invoice` (ids are kept), plus when it was archived.
+    """
+
+    __tablename__ = "invoices_archive"
+    __table_args__ = (
+        Index("ix_invoices_archive_school_id_id", "school_id", "id"),
+        Index("ix_invoices_archive_student_id_id", "student_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    school_id: Mapped[int] = mapped_column(
+        ForeignKey("schools.id", ondelete="CASCADE"), nullable=False
+    )
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"), nullable=False
+    )
+    issue_date: Mapped[date] = mapped_column(Date, nullable=False)
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    currency: Mapped[str] = mapped_column(String(8), nullable=False)
+    status: Mapped[InvoiceStatus] = mapped_column(
+        SqlEnum(InvoiceStatus, name="invoice_status"), nullable=False
+    )
+    description: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    total_paid: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    billing_period: Mapped[str | None] = mapped_column(String(7), nullable=True)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class PaymentArchive(Base):
+    """A payment of an archived invoice; same columns as `Payment`."""
+
+    __tablename__ = "payments_archive"
+    __table_args__ = (Index("ix_payments_archive_invoice_id_id", "invoice_id", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    invoice_id: Mapped[int] = mapped_column(
+        ForeignKey("invoices_archive.id", ondelete="CASCADE"), nullable=False
+    )
+    paid_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    method: Mapped[str] = mapped_column(String(32), nullable=False)
+    reference: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class OpeningBalance(Base):
+    """Statement totals of a student's archived invoices at one school.
+
+    Carried forward by the archival job so statements stay exact while
+    only scanning live invoices. Cancelled invoices count for nothing,
+    as in statements.
+    """
+
+    __tablename__ = "opening_balances"
+
+    school_id: Mapped[int] = mapped_column(
+        ForeignKey("schools.id", ondelete="CASCADE"), primary_key=True
+    )
+    student_id: Mapped[int] = mapped_column(
+        ForeignKey("students.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    total_invoiced: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=Decimal("0")
+    )
+    total_paid: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=Decimal("0")
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -5,7 +5,19 @@ from decimal import Decimal
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, DateTime, Enum as SqlEnum, ForeignKey, Numeric, String, func
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum as SqlEnum,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    UniqueConstraint,
+    bindparam,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -29,8 +41,55 @@ class InvoiceStatus(str, Enum):
     cancelled = "cancelled"
 
 
+def derive_invoice_status(
+    amount: Decimal, balance: Decimal, current: InvoiceStatus
+) -> InvoiceStatus:
+    """Derive the payment status of an invoice from its outstanding balance.
+
+    Cancelled invoices stay cancelled regardless of balance.
+    """
+    if current == InvoiceStatus.cancelled:
+        return InvoiceStatus.cancelled
+    if balance <= Decimal("0"):
+        return InvoiceStatus.paid
+    if balance < amount:
+        return InvoiceStatus.partially_paid
+    return InvoiceStatus.pending
+
+
+OPEN_INVOICE_STATUSES = (InvoiceStatus.pending, InvoiceStatus.partially_paid)
+
+# Predicate of the partial indexes on open invoices. Queries must repeat it
+# with inline literals (see `Invoice.is_open`) for the planner to use them.
+_OPEN_INVOICE_PREDICATE = text("status IN ('pending', 'partially_paid')")
+
+
+def _default_balance(context) -> Decimal:
+    return context.get_current_parameters()["amount"]
+
+
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        UniqueConstraint(
+            "student_id", "billing_period", name="uq_invoices_student_billing_period"
+        ),
+        # Keyset pages of a school's invoices, optionally filtered by status
+        Index("ix_invoices_school_id_id", "school_id", "id"),
+        Index("ix_invoices_school_status_id", "school_id", "status", "id"),
+        Index("ix_invoices_student_id_id", "student_id", "id"),
+        # min_balance filters, within a school
+        Index("ix_invoices_school_id_balance", "school_id", "balance"),
+        # Overdue scans: open invoices of a school by due date
+        Index(
+            "ix_invoices_open_due_date",
+            "school_id",
+            "due_date",
+            postgresql_include=["balance"],
+            postgresql_where=_OPEN_INVOICE_PREDICATE,
+            sqlite_where=_OPEN_INVOICE_PREDICATE,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     school_id: Mapped[int] = mapped_column(ForeignKey("schools.id"), nullable=False)
@@ -45,6 +104,15 @@ class Invoice(Base):
         nullable=False,
     )
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Running totals maintained by the payment write path (see apply_payment)
+    total_paid: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0"), server_default="0"
+    )
+    balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=_default_balance
+    )
+    # "YYYY-MM" for invoices generated by a billing run (see billing_service)
+    billing_period: Mapped[str | None] = mapped_column(String(7), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -58,6 +126,22 @@ class Invoice(Base):
         back_populates="invoice", cascade="all, delete-orphan"
     )
 
+    @classmethod
+    def is_open(cls):
+        """Filter for pending or partially paid invoices.
+
+        The statuses are rendered inline so the condition matches the
+        partial indexes' predicate even with bound parameters.
+        """
+        return cls.status.in_(
+            bindparam(
+                "open_statuses",
+                [status.value for status in OPEN_INVOICE_STATUSES],
+                expanding=True,
+                literal_execute=True,
+            )
+        )
+
     def calculate_balance(self) -> "InvoiceBalance":
         """
         Based on the payments made, calculate the total paid amount, remaining balance and
@@ -68,15 +152,7 @@ class Invoice(Base):
         payments = self.payments or []
         total_paid = sum((payment.amount for payment in payments), Decimal("0"))
         balance = self.amount - total_paid
-
-        if self.status == InvoiceStatus.cancelled:
-            computed_status = InvoiceStatus.cancelled
-        elif balance <= Decimal("0"):
-            computed_status = InvoiceStatus.paid
-        elif balance < self.amount:
-            computed_status = InvoiceStatus.partially_paid
-        else:
-            computed_status = InvoiceStatus.pending
+        computed_status = derive_invoice_status(self.amount, balance, self.status)
 
         return InvoiceBalance(
             amount=self.amount,
@@ -84,3 +160,18 @@ class Invoice(Base):
             balance=balance,
             status=computed_status.value,
         )
+
+    def apply_payment(self, amount: Decimal) -> None:
+        """Add a payment to the stored running totals and advance the status.
+
+        Must be called inside the transaction that inserts the payment so the
+        stored `total_paid`, `balance` and `status` never drift from the
+        payments table.
+        """
+        self.total_paid = (self.total_paid or Decimal("0")) + amount
+        self.refresh_balance()
+
+    def refresh_balance(self) -> None:
+        """Recompute `balance` and `status` from `amount` and `total_paid`."""
+        self.balance = self.amount - (self.total_paid or Decimal("0"))
+        self.status = derive_invoice_status(self.amount, self.balance, self.status)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from sqlalchemy import Date, DateTime, Enum as SqlEnum, Index, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class OverdueEventKind(str, Enum):
+    """Overdue state changes recorded by the overdue scan."""
+
+    overdue = "overdue"
+    cleared = "cleared"
+
+
+class OverdueInvoice(Base):
+    """An invoice the overdue scan last saw open past its due date.
+
+    Deliberately not a foreign key to `invoices`: the scan only reads
+    invoices, and invoices that go away (e.g. archived) are cleared by
+    the next scan.
+    """
+
+    __tablename__ = "overdue_invoices"
+    __table_args__ = (Index("ix_overdue_invoices_school_id_due_date", "school_id", "due_date"),)
+
+    invoice_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    school_id: Mapped[int] = mapped_column(nullable=False)
+    student_id: Mapped[int] = mapped_column(nullable=False)
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # Scan date on which the invoice was first seen overdue
+    detected_on: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class OverdueEvent(Base):
+    """An invoice becoming overdue, or ceasing to be (paid, cancelled, ...)."""
+
+    __tablename__ = "overdue_events"
+    __table_args__ = (
+        Index("ix_overdue_events_invoice_id_id", "invoice_id", "id"),
+        Index("ix_overdue_events_school_id_id", "school_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    invoice_id: Mapped[int] = mapped_column(nullable=False)
+    school_id: Mapped[int] = mapped_column(nullable=False)
+    student_id: Mapped[int] = mapped_column(nullable=False)
+    kind: Mapped[OverdueEventKind] = mapped_column(
+        SqlEnum(OverdueEventKind, name="overdue_event_kind"), nullable=False
+    )
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # Outstanding balance when the change was seen; None if the invoice is gone
+    balance: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    as_of: Mapped[date] = mapped_column(Date, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -15,6 +15,14 @@ if TYPE_CHECKING:
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Per-invoice payment sums read the amounts from the index alone
+        Index("ix_payments_invoice_id_amount", "invoice_id", postgresql_include=["amount"]),
+        # Keyset pages of an invoice's payments
+        Index("ix_payments_invoice_id_id", "invoice_id", "id"),
+        # Partitioned by month of paid_at on Postgres (see app.core.partitions)
+        {"info": {"partition_key": "paid_at"}},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     invoice_id: Mapped[int] = mapped_column(ForeignKey("invoices.id"), nullable=False)
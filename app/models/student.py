@@ -4,7 +4,16 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum as SqlEnum, ForeignKey, String, func
+from sqlalchemy import (
+    DateTime,
+    Enum as SqlEnum,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    func,
+    literal_column,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -21,6 +30,11 @@ class StudentStatus(str, Enum):
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        UniqueConstraint("school_id", "external_id", name="uq_students_school_external_id"),
+        # Keyset pages of a school's students
+        Index("ix_students_school_id_id", "school_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     school_id: Mapped[int] = mapped_column(ForeignKey("schools.id"), nullable=False)
@@ -43,3 +57,25 @@ class Student(Base):
     invoices: Mapped[list[Invoice]] = relationship(
         back_populates="student", cascade="all, delete-orphan"
     )
+
+    @classmethod
+    def full_name(cls):
+        """`first_name || ' ' || last_name`, as indexed for name search.
+
+        The separator is rendered inline so the expression matches the
+        trigram index's.
+        """
+        return cls.first_name + literal_column("' '", String) + cls.last_name
+
+
+# Name search (see student_service.search_students): trigram GIN index on
+# the full name, with school_id in the same index (btree_gin) so scoped
+# searches need one index scan. Postgres only; it needs the pg_trgm and
+# btree_gin extensions (migration 20260120_0012).
+Index(
+    "ix_students_school_full_name_trgm",
+    Student.school_id,
+    Student.full_name().label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
@@ -0,0 +1,13 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    """Rows found for a multi-get, in the requested key order."""
+
+    items: list[T]
+    # Requested keys that matched nothing
+    missing: list[int | str]
@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+
+class BillingRunCreate(BaseModel):
+    """Invoice every active student (of one school, or all) for a period."""
+
+    period: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$", examples=["2026-02"])
+    amount: Decimal = Field(gt=0)
+    currency: str = "MXN"
+    # Invoices are issued on the first day of the period and due on this day
+    due_day: int = Field(default=10, ge=1, le=28)
+    school_id: int | None = None
+    description: str | None = None
+
+
+class BillingRunResult(BaseModel):
+    period: str
+    school_id: int | None
+    created: int
+    skipped: int
+    chunks: int
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class BulkRowError(BaseModel):
+    """A rejected row of a bulk request, by its position in the request."""
+
+    index: int
+    message: str
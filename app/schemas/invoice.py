@@ -4,6 +4,7 @@ from decimal import Decimal
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.invoice import InvoiceStatus
+from app.schemas.bulk import BulkRowError
 
 
 class InvoiceBase(BaseModel):
@@ -32,7 +33,24 @@ class InvoiceUpdate(BaseModel):
 
 class InvoiceRead(InvoiceBase):
     id: int
+    total_paid: Decimal
+    balance: Decimal
+    billing_period: str | None = None
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class InvoiceBulkCreate(BaseModel):
+    invoices: list[InvoiceCreate] = Field(min_length=1, max_length=10_000)
+
+
+class InvoiceBulkCreated(BaseModel):
+    index: int
+    id: int
+
+
+class InvoiceBulkResult(BaseModel):
+    created: list[InvoiceBulkCreated]
+    errors: list[BulkRowError]
@@ -0,0 +1,22 @@
+from datetime import date
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class OverdueAgingBucket(BaseModel):
+    """Overdue invoices whose days past due fall in [min_days, max_days]."""
+
+    min_days: int
+    max_days: int | None
+    invoices: int
+    balance: Decimal
+
+
+class SchoolOverdueSummary(BaseModel):
+    school_id: int
+    as_of: date
+    invoices: int
+    balance: Decimal
+    oldest_due_date: date | None
+    buckets: list[OverdueAgingBucket]
@@ -7,6 +7,7 @@ T = TypeVar("T")
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: int | None
     limit: int
     offset: int
+    next_cursor: str | None = None
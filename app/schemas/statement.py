@@ -13,6 +13,7 @@ class StatementInvoiceItem(BaseModel):
     balance: Decimal
     status: str
     due_date: date
+    archived: bool = False
 
 
 class SchoolStatement(BaseModel):
@@ -1,8 +1,9 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.student import StudentStatus
+from app.schemas.bulk import BulkRowError
 
 
 class StudentBase(BaseModel):
@@ -30,3 +31,24 @@ class StudentRead(StudentBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class StudentUpsert(BaseModel):
+    """A roster row from the SIS, keyed on the school's and student's external ids."""
+
+    school_external_id: str
+    external_id: str
+    first_name: str
+    last_name: str
+    status: StudentStatus = StudentStatus.active
+
+
+class StudentBulkUpsert(BaseModel):
+    students: list[StudentUpsert] = Field(min_length=1, max_length=10_000)
+
+
+class StudentBulkUpsertResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    errors: list[BulkRowError]
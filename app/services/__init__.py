@@ -1,28 +1,46 @@
+from app.services.billing_service import run_billing
 from app.services.invoice_service import (
+	bulk_create_invoices,
 	cancel_invoice,
 	create_invoice,
 	get_invoice,
 	list_invoices,
+	list_invoices_async,
 	update_invoice,
 )
-from app.services.payment_service import create_payment, get_payment, list_payments
+from app.services.payment_service import (
+	create_payment,
+	get_payment,
+	list_payments,
+	list_payments_async,
+)
 from app.services.school_service import (
 	create_school,
 	delete_school,
 	get_school,
 	list_schools,
+	list_schools_async,
 	update_school,
 )
-from app.services.statement_service import get_school_statement, get_student_statement
+from app.services.statement_service import (
+	get_school_statement,
+	get_school_statement_async,
+	get_student_statement,
+	get_student_statement_async,
+)
 from app.services.student_service import (
+	bulk_upsert_students,
 	create_student,
 	delete_student,
 	get_student,
 	list_students,
+	list_students_async,
 	update_student,
 )
 
 __all__ = [
+	"bulk_create_invoices",
+	"bulk_upsert_students",
 	"cancel_invoice",
 	"create_invoice",
 	"create_payment",
@@ -34,12 +52,19 @@ __all__ = [
 	"get_payment",
 	"get_school",
 	"get_school_statement",
+	"get_school_statement_async",
 	"get_student",
 	"get_student_statement",
+	"get_student_statement_async",
 	"list_invoices",
+	"list_invoices_async",
 	"list_payments",
+	"list_payments_async",
 	"list_schools",
+	"list_schools_async",
 	"list_students",
+	"list_students_async",
+	"run_billing",
 	"update_invoice",
 	"update_school",
 	"update_student",
@@ -0,0 +1,162 @@
+"""Archive tier for settled invoices and their payments.
+
+Paid and cancelled invoices never change again, but statements and list
+queries would keep scanning them forever. The archival job moves those
+issued before a horizon (`settings.archive_after_days`), with their
+payments, into `invoices_archive` / `payments_archive`, in id-ordered
+chunks of `settings.archive_chunk_size` invoices, each in its own short
+transaction. Rows keep their ids.
+
+In the same transaction the chunk's statement totals are added to the
+per-student, per-school `opening_balances`, so statement totals are the
+live rows plus the opening balance and stay exact. Cancelled invoices
+count for nothing, as in statements.
+
+Archived rows stay queryable: list queries and statements accept
+`include_archived`, which reads `live UNION ALL archive` through an
+alias of the live model (see `union_with_archive`).
+
+The job is restartable: a chunk is either fully moved or not at all,
+and a rerun picks up whatever is left.
+"""
+from collections.abc import Sequence
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Select, Table, delete, func, insert, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
+from app.core.config import settings
+from app.models.archive import InvoiceArchive, OpeningBalance, PaymentArchive
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+
+SETTLED_STATUSES = (InvoiceStatus.paid, InvoiceStatus.cancelled)
+
+
+def live_columns(table: Table, model) -> list:
+    """`table`'s columns named like `model`'s, in the model's column order."""
+    return [table.c[column.key] for column in model.__table__.c]
+
+
+def union_with_archive(model, live: Select, archived: Select):
+    """Alias `model` over `live UNION ALL archived`.
+
+    Both selects must return `live_columns` of their tables. Rows load as
+    `model` instances, so paging and serialization work unchanged.
+    """
+    return aliased(model, union_all(live, archived).subquery(model.__tablename__))
+
+
+def _opening_balance_upsert(db: Session):
+    """INSERT ... ON CONFLICT DO UPDATE adding to the stored totals."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(OpeningBalance)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(OpeningBalance)
+    else:
+        raise NotImplementedError(f"Opening balances are not supported on {dialect}")
+
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[OpeningBalance.school_id, OpeningBalance.student_id],
+        set_={
+            "total_invoiced": OpeningBalance.total_invoiced + excluded.total_invoiced,
+            "total_paid": OpeningBalance.total_paid + excluded.total_paid,
+            "updated_at": func.now(),
+        },
+    )
+
+
+def _archive_chunk(db: Session, invoice_ids: Sequence[int]) -> int:
+    """Move invoices (locked by the caller) and their payments; return payments moved."""
+    invoices = Invoice.__table__
+    payments = Payment.__table__
+
+    # Statement totals of the chunk, per student and school
+    paid = (
+        select(Payment.invoice_id, func.sum(Payment.amount).label("paid"))
+        .where(Payment.invoice_id.in_(invoice_ids))
+        .group_by(Payment.invoice_id)
+        .subquery()
+    )
+    openings = [
+        {
+            "school_id": row.school_id,
+            "student_id": row.student_id,
+            "total_invoiced": row.total_invoiced,
+            "total_paid": row.total_paid,
+        }
+        for row in db.execute(
+            select(
+                Invoice.school_id,
+                Invoice.student_id,
+                func.sum(Invoice.amount).label("total_invoiced"),
+                func.sum(func.coalesce(paid.c.paid, Decimal("0"))).label("total_paid"),
+            )
+            .outerjoin(paid, paid.c.invoice_id == Invoice.id)
+            .where(Invoice.id.in_(invoice_ids), Invoice.status != InvoiceStatus.cancelled)
+            .group_by(Invoice.school_id, Invoice.student_id)
+        )
+    ]
+
+    db.execute(
+        insert(InvoiceArchive).from_select(
+            [column.key for column in invoices.c],
+            select(*invoices.c).where(invoices.c.id.in_(invoice_ids)),
+        )
+    )
+    moved_payments = db.execute(
+        insert(PaymentArchive).from_select(
+            [column.key for column in payments.c],
+            select(*payments.c).where(payments.c.invoice_id.in_(invoice_ids)),
+        )
+    ).rowcount
+    if openings:
+        db.execute(_opening_balance_upsert(db), openings)
+    db.execute(delete(payments).where(payments.c.invoice_id.in_(invoice_ids)))
+    db.execute(delete(invoices).where(invoices.c.id.in_(invoice_ids)))
+    return moved_payments
+
+
+def archive_settled_invoices(
+    db: Session, before: date | None = None, chunk_size: int | None = None
+) -> dict[str, int]:
+    """Archive paid and cancelled invoices issued before `before`.
+
+    `before` defaults to `settings.archive_after_days` ago. Invoices
+    locked by another transaction are skipped and picked up by the next
+    run. Returns the number of invoices and payments moved.
+    """
+    before = before or date.today() - timedelta(days=settings.archive_after_days)
+    chunk_size = chunk_size or settings.archive_chunk_size
+    moved = {"invoices": 0, "payments": 0}
+    last_id = 0
+
+    while True:
+        chunk = db.execute(
+            select(Invoice.id, Invoice.school_id, Invoice.student_id)
+            .where(
+                Invoice.status.in_(SETTLED_STATUSES),
+                Invoice.issue_date < before,
+                Invoice.id > last_id,
+            )
+            .order_by(Invoice.id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not chunk:
+            return moved
+
+        invoice_ids = [row.id for row in chunk]
+        moved["payments"] += _archive_chunk(db, invoice_ids)
+        moved["invoices"] += len(invoice_ids)
+        db.commit()
+
+        scopes = {school_scope(row.school_id) for row in chunk}
+        scopes |= {student_scope(row.student_id) for row in chunk}
+        bump_cache_versions(*sorted(scopes), table_scope("invoices"), table_scope("payments"))
+        last_id = invoice_ids[-1]
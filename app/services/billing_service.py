@@ -0,0 +1,149 @@
+"""Recurring tuition billing runs.
+
+A billing run invoices every active student of a school (or of all
+schools) for a period ("YYYY-MM"). Invoices are generated in the
+database with INSERT ... SELECT over chunks of students, each chunk in
+its own short transaction. A NOT EXISTS probe skips students already
+invoiced for the period, backed by the unique (student_id,
+billing_period) constraint, so re-running a period only fills the gaps.
+
+A Redis lock per period makes sure only one run for that period is in
+flight across all API tasks; it is renewed after every chunk.
+"""
+from datetime import date
+from decimal import Decimal
+
+from redis.exceptions import LockError
+from sqlalchemy import Date, Numeric, String, cast, exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import (
+    bump_cache_versions,
+    get_redis_client,
+    school_scope,
+    student_scope,
+    table_scope,
+)
+from app.core.config import settings
+from app.core.exceptions import ConflictError, EntityNotFoundError
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.school import School
+from app.models.student import Student, StudentStatus
+from app.schemas.billing import BillingRunCreate
+
+INSERT_COLUMNS = (
+    "school_id",
+    "student_id",
+    "issue_date",
+    "due_date",
+    "amount",
+    "currency",
+    "status",
+    "description",
+    "total_paid",
+    "balance",
+    "billing_period",
+)
+
+
+def _lock_name(period: str) -> str:
+    return f"lock:billing-run:{period}"
+
+
+def _active_students(run: BillingRunCreate):
+    conditions = [Student.status == StudentStatus.active]
+    if run.school_id is not None:
+        conditions.append(Student.school_id == run.school_id)
+    return conditions
+
+
+def _invoice_rows(run: BillingRunCreate, first_id: int, last_id: int):
+    """SELECT producing one invoice row per uninvoiced active student in (first_id, last_id]."""
+    year, month = (int(part) for part in run.period.split("-"))
+    amount = literal(run.amount, Numeric(12, 2))
+    already_billed = exists().where(
+        Invoice.student_id == Student.id, Invoice.billing_period == run.period
+    )
+    return select(
+        Student.school_id,
+        Student.id,
+        literal(date(year, month, 1), Date),
+        literal(date(year, month, run.due_day), Date),
+        amount,
+        literal(run.currency, String),
+        # Explicit cast: Postgres types a bare parameter in a SELECT list as
+        # text, which does not assign to the enum column
+        cast(literal(InvoiceStatus.pending.value), Invoice.status.type),
+        literal(run.description, String),
+        literal(Decimal("0"), Numeric(12, 2)),
+        amount,
+        literal(run.period, String),
+    ).where(
+        *_active_students(run),
+        Student.id > first_id,
+        Student.id <= last_id,
+        ~already_billed,
+    )
+
+
+def run_billing(db: Session, run: BillingRunCreate) -> dict:
+    """Generate the period's invoices; see the module docstring.
+
+    Raises ConflictError if a run for the same period is in progress.
+    Returns the number of invoices created, the number of active students
+    skipped because they were already invoiced, and the chunk count.
+    """
+    if run.school_id is not None and db.get(School, run.school_id) is None:
+        raise EntityNotFoundError("School", run.school_id)
+
+    lock = get_redis_client().lock(
+        _lock_name(run.period), timeout=settings.billing_run_lock_ttl, blocking=False
+    )
+    if not lock.acquire():
+        raise ConflictError(f"A billing run for {run.period} is already in progress")
+
+    created = skipped = chunks = 0
+    try:
+        last_id = 0
+        while True:
+            student_ids = db.scalars(
+                select(Student.id)
+                .where(*_active_students(run), Student.id > last_id)
+                .order_by(Student.id)
+                .limit(settings.billing_run_chunk_size)
+            ).all()
+            if not student_ids:
+                break
+
+            inserted = db.execute(
+                insert(Invoice)
+                .from_select(INSERT_COLUMNS, _invoice_rows(run, last_id, student_ids[-1]))
+                .returning(Invoice.school_id, Invoice.student_id)
+            ).all()
+            db.commit()
+
+            chunks += 1
+            created += len(inserted)
+            skipped += len(student_ids) - len(inserted)
+            last_id = student_ids[-1]
+            if inserted:
+                scopes = {school_scope(school_id) for school_id, _ in inserted}
+                scopes |= {student_scope(student_id) for _, student_id in inserted}
+                bump_cache_versions(*sorted(scopes), table_scope("invoices"))
+            # Keep the lock for another TTL while work remains
+            lock.reacquire()
+    finally:
+        db.rollback()
+        try:
+            lock.release()
+        except LockError:
+            # Expired while a chunk ran; the next run may already hold it
+            pass
+
+    return {
+        "period": run.period,
+        "school_id": run.school_id,
+        "created": created,
+        "skipped": skipped,
+        "chunks": chunks,
+    }
@@ -5,20 +5,63 @@ Invoices are financial records linking a student to a school
 with an amount due by a specific date.
 """
 from datetime import date
+from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.cache import cache_invalidate_prefix
-from app.core.exceptions import EntityNotFoundError, ValidationError
-from app.models.invoice import Invoice, InvoiceStatus
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
+from app.core.config import settings
+from app.core.exceptions import DomainException, EntityNotFoundError, ValidationError
+from app.models.archive import InvoiceArchive
+from app.models.invoice import Invoice, InvoiceStatus, derive_invoice_status
 from app.models.student import Student
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate
-from app.utils.pagination import paginate
+from app.services.archive_service import live_columns, union_with_archive
+from app.utils.batch import get_batch_async
+from app.utils.fieldsets import load_fields, load_fields_options
+from app.utils.pagination import TotalMode, paginate, paginate_async
 
 
-def get_invoice(db: Session, invoice_id: int) -> Invoice | None:
-	return db.get(Invoice, invoice_id)
+def get_invoice(
+	db: Session, invoice_id: int, fields: list[str] | None = None
+) -> Invoice | None:
+	"""Fetch an invoice, loading only `fields` when given (see app.utils.fieldsets)."""
+	return db.get(Invoice, invoice_id, options=load_fields_options(Invoice, fields))
+
+
+async def get_invoices_batch_async(db: AsyncSession, ids: list[int]) -> dict:
+	"""Fetch invoices by ids in one query (see app.utils.batch)."""
+	return await get_batch_async(db, Invoice.id, ids)
+
+
+def _check_invoice_rules(
+	student_school_id: int | None,
+	*,
+	school_id: int,
+	student_id: int,
+	issue_date: date,
+	due_date: date,
+	amount: float,
+) -> None:
+	"""Apply the invoice business rules given the student's school (None if missing)."""
+	if student_school_id is None:
+		raise EntityNotFoundError("Student", student_id)
+	if student_school_id != school_id:
+		raise ValidationError("Invoice school_id must match student's school_id")
+	if amount <= 0:
+		raise ValidationError("Invoice amount must be greater than zero")
+	if due_date < issue_date:
+		raise ValidationError("Invoice due_date must be on or after issue_date")
+
+
+def _check_new_invoice_status(status: InvoiceStatus) -> None:
+	"""A new invoice has no payments yet, so it can only start pending or cancelled."""
+	if status not in (InvoiceStatus.pending, InvoiceStatus.cancelled):
+		raise ValidationError(
+			"New invoices can only be pending or cancelled; status follows payments"
+		)
 
 
 def _validate_invoice_input(
@@ -38,14 +81,69 @@ def _validate_invoice_input(
 	- Due date must be on or after issue date
 	"""
 	student = db.get(Student, student_id)
-	if not student:
-		raise EntityNotFoundError("Student", student_id)
-	if student.school_id != school_id:
-		raise ValidationError("Invoice school_id must match student's school_id")
-	if amount <= 0:
-		raise ValidationError("Invoice amount must be greater than zero")
-	if due_date < issue_date:
-		raise ValidationError("Invoice due_date must be on or after issue_date")
+	_check_invoice_rules(
+		student.school_id if student else None,
+		school_id=school_id,
+		student_id=student_id,
+		issue_date=issue_date,
+		due_date=due_date,
+		amount=amount,
+	)
+
+
+def _invoice_filters(
+	columns,
+	school_id: int | None,
+	student_id: int | None,
+	status: InvoiceStatus | None,
+	min_balance: Decimal | None,
+) -> list:
+	"""WHERE clauses on `columns` (the model or a table's `.c`)."""
+	filters = []
+
+	if school_id is not None:
+		filters.append(columns.school_id == school_id)
+
+	if student_id is not None:
+		filters.append(columns.student_id == student_id)
+
+	if status is not None:
+		filters.append(columns.status == status)
+
+	if min_balance is not None:
+		filters.append(columns.balance >= min_balance)
+
+	return filters
+
+
+def _list_invoices_query(
+	school_id: int | None,
+	student_id: int | None,
+	status: InvoiceStatus | None,
+	min_balance: Decimal | None,
+	include_archived: bool = False,
+) -> tuple[Select, list[str]]:
+	filters = (school_id, student_id, status, min_balance)
+	if include_archived:
+		live, archive = Invoice.__table__, InvoiceArchive.__table__
+		source = union_with_archive(
+			Invoice,
+			select(*live.c).where(*_invoice_filters(live.c, *filters)),
+			select(*live_columns(archive, Invoice)).where(*_invoice_filters(archive.c, *filters)),
+		)
+		base_query = select(source)
+	else:
+		base_query = select(Invoice).where(*_invoice_filters(Invoice, *filters))
+
+	# Cached totals are invalidated by writes to the narrowest filtered entity
+	if school_id is not None:
+		count_scopes = [school_scope(school_id)]
+	elif student_id is not None:
+		count_scopes = [student_scope(student_id)]
+	else:
+		count_scopes = [table_scope("invoices")]
+
+	return base_query, count_scopes
 
 
 def list_invoices(
@@ -55,19 +153,56 @@ def list_invoices(
 	school_id: int | None = None,
 	student_id: int | None = None,
 	status: InvoiceStatus | None = None,
+	min_balance: Decimal | None = None,
+	include_archived: bool = False,
+	cursor: str | None = None,
+	total: TotalMode = TotalMode.exact,
+	fields: list[str] | None = None,
 ) -> dict:
-	base_query = select(Invoice)
+	"""List invoices, filtering on the stored status and balance columns.
 
-	if school_id is not None:
-		base_query = base_query.where(Invoice.school_id == school_id)
-
-	if student_id is not None:
-		base_query = base_query.where(Invoice.student_id == student_id)
+	Archived invoices are only included with `include_archived`; with
+	`fields`, only those columns are loaded.
+	"""
+	base_query, count_scopes = _list_invoices_query(
+		school_id, student_id, status, min_balance, include_archived
+	)
+	return paginate(
+		load_fields(base_query, fields),
+		db,
+		limit,
+		offset,
+		cursor=cursor,
+		total=total,
+		count_scopes=count_scopes,
+	)
 
-	if status is not None:
-		base_query = base_query.where(Invoice.status == status)
 
-	return paginate(base_query, db, limit, offset)
+async def list_invoices_async(
+	db: AsyncSession,
+	limit: int,
+	offset: int,
+	school_id: int | None = None,
+	student_id: int | None = None,
+	status: InvoiceStatus | None = None,
+	min_balance: Decimal | None = None,
+	include_archived: bool = False,
+	cursor: str | None = None,
+	total: TotalMode = TotalMode.exact,
+	fields: list[str] | None = None,
+) -> dict:
+	base_query, count_scopes = _list_invoices_query(
+		school_id, student_id, status, min_balance, include_archived
+	)
+	return await paginate_async(
+		load_fields(base_query, fields),
+		db,
+		limit,
+		offset,
+		cursor=cursor,
+		total=total,
+		count_scopes=count_scopes,
+	)
 
 
 def create_invoice(db: Session, invoice_in: InvoiceCreate) -> Invoice:
@@ -79,21 +214,109 @@ def create_invoice(db: Session, invoice_in: InvoiceCreate) -> Invoice:
 		due_date=invoice_in.due_date,
 		amount=float(invoice_in.amount),
 	)
+	_check_new_invoice_status(invoice_in.status)
 	invoice = Invoice(**invoice_in.model_dump())
 	db.add(invoice)
 	db.commit()
 	db.refresh(invoice)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/schools/{invoice.school_id}/statement"
-	)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/students/{invoice.student_id}/statement"
+	bump_cache_versions(
+		school_scope(invoice.school_id),
+		student_scope(invoice.student_id),
+		table_scope("invoices"),
 	)
 	return invoice
 
 
+def bulk_create_invoices(db: Session, invoices_in: list[InvoiceCreate]) -> dict:
+	"""Create many invoices at once, skipping (and reporting) invalid rows.
+
+	The student/school pairs of all rows are checked with a single query
+	and valid rows are inserted with multi-row INSERT ... RETURNING in
+	chunks of `settings.bulk_insert_chunk_size`, in one transaction.
+	Cache versions are bumped once per affected school and student.
+
+	Returns a dict with `created` ({index, id} per inserted row, in input
+	order) and `errors` ({index, message} per rejected row).
+	"""
+	student_ids = {invoice_in.student_id for invoice_in in invoices_in}
+	student_schools = dict(
+		db.execute(select(Student.id, Student.school_id).where(Student.id.in_(student_ids))).all()
+	)
+
+	valid: list[tuple[int, InvoiceCreate]] = []
+	errors: list[dict] = []
+	for index, invoice_in in enumerate(invoices_in):
+		try:
+			_check_invoice_rules(
+				student_schools.get(invoice_in.student_id),
+				school_id=invoice_in.school_id,
+				student_id=invoice_in.student_id,
+				issue_date=invoice_in.issue_date,
+				due_date=invoice_in.due_date,
+				amount=float(invoice_in.amount),
+			)
+			_check_new_invoice_status(invoice_in.status)
+		except DomainException as exc:
+			errors.append({"index": index, "message": str(exc)})
+		else:
+			valid.append((index, invoice_in))
+
+	created: list[dict] = []
+	chunk_size = settings.bulk_insert_chunk_size
+	statement = insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True)
+	for start in range(0, len(valid), chunk_size):
+		chunk = valid[start : start + chunk_size]
+		rows = [
+			{**invoice_in.model_dump(), "total_paid": Decimal("0"), "balance": invoice_in.amount}
+			for _, invoice_in in chunk
+		]
+		ids = db.scalars(statement, rows).all()
+		created.extend(
+			{"index": index, "id": invoice_id} for (index, _), invoice_id in zip(chunk, ids)
+		)
+	db.commit()
+
+	if valid:
+		scopes = {school_scope(invoice_in.school_id) for _, invoice_in in valid}
+		scopes |= {student_scope(invoice_in.student_id) for _, invoice_in in valid}
+		bump_cache_versions(*sorted(scopes), table_scope("invoices"))
+
+	return {"created": created, "errors": errors}
+
+
+def _check_status_update(invoice: Invoice, updates: dict) -> None:
+	"""Validate an update against the payments already applied to the invoice.
+	
+	Business Rules:
+	- Amount cannot drop below the amount already paid
+	- Status follows payments (pending → partially_paid → paid); the only
+	  status that can be set by hand is cancelled. A status matching the
+	  derived one is accepted as a no-op.
+	"""
+	amount = updates.get("amount", invoice.amount)
+	total_paid = invoice.total_paid or Decimal("0")
+	if amount < total_paid:
+		raise ValidationError("Invoice amount cannot be less than the amount already paid")
+
+	status = updates.get("status")
+	if status is None or status == InvoiceStatus.cancelled:
+		return
+	derived = derive_invoice_status(amount, amount - total_paid, invoice.status)
+	if status != derived:
+		raise ValidationError(
+			f"Invoice status is derived from its payments ({derived.value}); "
+			"only cancelled can be set"
+		)
+
+
 def update_invoice(db: Session, invoice_id: int, invoice_in: InvoiceUpdate) -> Invoice | None:
-	invoice = db.get(Invoice, invoice_id)
+	"""Update an invoice, re-deriving its balance and status from its payments.
+
+	The row is locked until commit, so a payment applied concurrently
+	(see `payment_service._apply_payment_statement`) either lands before
+	the rules are checked against `total_paid` or waits for this update.
+	"""
+	invoice = db.get(Invoice, invoice_id, with_for_update=True)
 	if not invoice:
 		return None
 	updates = invoice_in.model_dump(exclude_unset=True)
@@ -111,16 +334,17 @@ def update_invoice(db: Session, invoice_id: int, invoice_in: InvoiceUpdate) -> I
 		due_date=due_date,
 		amount=amount,
 	)
+	_check_status_update(invoice, updates)
 
 	for field, value in updates.items():
 		setattr(invoice, field, value)
+	invoice.refresh_balance()
 	db.commit()
 	db.refresh(invoice)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/schools/{invoice.school_id}/statement"
-	)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/students/{invoice.student_id}/statement"
+	bump_cache_versions(
+		school_scope(invoice.school_id),
+		student_scope(invoice.student_id),
+		table_scope("invoices"),
 	)
 	return invoice
 
@@ -137,10 +361,9 @@ def cancel_invoice(db: Session, invoice_id: int) -> Invoice | None:
 	invoice.status = InvoiceStatus.cancelled
 	db.commit()
 	db.refresh(invoice)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/schools/{invoice.school_id}/statement"
-	)
-	cache_invalidate_prefix(
-		f"cache:GET:/api/v1/students/{invoice.student_id}/statement"
+	bump_cache_versions(
+		school_scope(invoice.school_id),
+		student_scope(invoice.student_id),
+		table_scope("invoices"),
 	)
 	return invoice
@@ -0,0 +1,340 @@
+"""Overdue invoices: live queries and the overdue scan.
+
+An invoice is overdue on a day (`as_of`) when it is still open (pending
+or partially paid) and its due date is before that day. Listing and
+summarizing overdue invoices reads `invoices` directly through the
+partial index on open invoices (`ix_invoices_open_due_date`), so the
+answers are always current.
+
+The overdue scan records state changes for dunning: it keeps the set
+of invoices it last saw overdue in `overdue_invoices` and appends an
+`overdue` event when one joins the set and a `cleared` event when one
+leaves it (paid, cancelled, due date moved, archived). It only reads
+`invoices`, in keyset-ordered chunks (per school, by due date, on the
+partial index), and every chunk commits its own short transaction, so
+it never holds locks or a long transaction on `invoices`. An
+interrupted scan is simply run again: already recorded changes are not
+recorded twice.
+
+A Redis lock makes sure only one scan is in flight across all API
+tasks; it is renewed after every chunk.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from redis.exceptions import LockError
+from sqlalchemy import Select, case, exists, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis_client, school_scope, student_scope, table_scope
+from app.core.config import settings
+from app.core.exceptions import ConflictError
+from app.models.invoice import Invoice
+from app.models.overdue import OverdueEvent, OverdueEventKind, OverdueInvoice
+from app.models.school import School
+from app.schemas.overdue import OverdueAgingBucket, SchoolOverdueSummary
+from app.utils.pagination import TotalMode, paginate, paginate_async
+
+SCAN_LOCK_NAME = "lock:overdue-scan"
+
+# Days past due of the summary's aging buckets, as (min_days, max_days)
+AGING_BUCKETS = ((1, 30), (31, 60), (61, 90), (91, None))
+
+
+def _overdue_filters(
+    as_of: date, school_id: int | None = None, student_id: int | None = None
+) -> list:
+    filters = [Invoice.is_open(), Invoice.due_date < as_of]
+    if school_id is not None:
+        filters.append(Invoice.school_id == school_id)
+    if student_id is not None:
+        filters.append(Invoice.student_id == student_id)
+    return filters
+
+
+def _list_overdue_query(
+    as_of: date, school_id: int | None, student_id: int | None
+) -> tuple[Select, list[str]]:
+    base_query = select(Invoice).where(*_overdue_filters(as_of, school_id, student_id))
+
+    if school_id is not None:
+        count_scopes = [school_scope(school_id)]
+    elif student_id is not None:
+        count_scopes = [student_scope(student_id)]
+    else:
+        count_scopes = [table_scope("invoices")]
+
+    return base_query, count_scopes
+
+
+def list_overdue_invoices(
+    db: Session,
+    limit: int,
+    offset: int,
+    school_id: int | None = None,
+    student_id: int | None = None,
+    as_of: date | None = None,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+) -> dict:
+    """List open invoices due before `as_of` (default today), oldest due first."""
+    base_query, count_scopes = _list_overdue_query(
+        as_of or date.today(), school_id, student_id
+    )
+    return paginate(
+        base_query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        sort_column=Invoice.due_date,
+        count_scopes=count_scopes,
+    )
+
+
+async def list_overdue_invoices_async(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    school_id: int | None = None,
+    student_id: int | None = None,
+    as_of: date | None = None,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+) -> dict:
+    base_query, count_scopes = _list_overdue_query(
+        as_of or date.today(), school_id, student_id
+    )
+    return await paginate_async(
+        base_query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        sort_column=Invoice.due_date,
+        count_scopes=count_scopes,
+    )
+
+
+def _summary_query(school_id: int, as_of: date) -> Select:
+    """Count, balance and oldest due date of a school's overdue invoices per aging bucket."""
+    bucket = case(
+        *(
+            (Invoice.due_date >= as_of - timedelta(days=max_days), index)
+            for index, (_, max_days) in enumerate(AGING_BUCKETS)
+            if max_days is not None
+        ),
+        else_=len(AGING_BUCKETS) - 1,
+    )
+    overdue = (
+        select(bucket.label("bucket"), Invoice.balance, Invoice.due_date)
+        .where(*_overdue_filters(as_of, school_id))
+        .subquery()
+    )
+    return select(
+        overdue.c.bucket,
+        func.count().label("invoices"),
+        func.sum(overdue.c.balance).label("balance"),
+        func.min(overdue.c.due_date).label("oldest_due_date"),
+    ).group_by(overdue.c.bucket)
+
+
+def _summary(school_id: int, as_of: date, rows) -> SchoolOverdueSummary:
+    by_bucket = {row.bucket: row for row in rows}
+    buckets = []
+    for index, (min_days, max_days) in enumerate(AGING_BUCKETS):
+        row = by_bucket.get(index)
+        buckets.append(
+            OverdueAgingBucket(
+                min_days=min_days,
+                max_days=max_days,
+                invoices=row.invoices if row else 0,
+                balance=row.balance if row else Decimal("0"),
+            )
+        )
+    return SchoolOverdueSummary(
+        school_id=school_id,
+        as_of=as_of,
+        invoices=sum(bucket.invoices for bucket in buckets),
+        balance=sum((bucket.balance for bucket in buckets), Decimal("0")),
+        oldest_due_date=min((row.oldest_due_date for row in rows), default=None),
+        buckets=buckets,
+    )
+
+
+def get_school_overdue_summary(
+    db: Session, school_id: int, as_of: date | None = None
+) -> SchoolOverdueSummary | None:
+    """Aging summary of a school's overdue invoices; None if the school doesn't exist."""
+    if db.get(School, school_id) is None:
+        return None
+    as_of = as_of or date.today()
+    rows = db.execute(_summary_query(school_id, as_of)).all()
+    return _summary(school_id, as_of, rows)
+
+
+async def get_school_overdue_summary_async(
+    db: AsyncSession, school_id: int, as_of: date | None = None
+) -> SchoolOverdueSummary | None:
+    if await db.get(School, school_id) is None:
+        return None
+    as_of = as_of or date.today()
+    rows = (await db.execute(_summary_query(school_id, as_of))).all()
+    return _summary(school_id, as_of, rows)
+
+
+def _event(row, kind: OverdueEventKind, balance: Decimal | None, as_of: date) -> dict:
+    return {
+        "invoice_id": row.invoice_id,
+        "school_id": row.school_id,
+        "student_id": row.student_id,
+        "kind": kind,
+        "due_date": row.due_date,
+        "balance": balance,
+        "as_of": as_of,
+    }
+
+
+def _clear_resolved(db: Session, as_of: date, chunk_size: int, lock) -> tuple[int, int]:
+    """Drop invoices no longer overdue from the overdue set; return (cleared, chunks)."""
+    cleared = chunks = 0
+    last_id = 0
+    while True:
+        invoice_ids = db.scalars(
+            select(OverdueInvoice.invoice_id)
+            .where(OverdueInvoice.invoice_id > last_id)
+            .order_by(OverdueInvoice.invoice_id)
+            .limit(chunk_size)
+        ).all()
+        if not invoice_ids:
+            db.commit()
+            return cleared, chunks
+
+        still_overdue = select(Invoice.id).where(
+            Invoice.id.in_(invoice_ids), *_overdue_filters(as_of)
+        )
+        rows = db.execute(
+            select(
+                OverdueInvoice.invoice_id,
+                OverdueInvoice.school_id,
+                OverdueInvoice.student_id,
+                OverdueInvoice.due_date,
+                Invoice.balance,
+            )
+            .outerjoin(Invoice, Invoice.id == OverdueInvoice.invoice_id)
+            .where(
+                OverdueInvoice.invoice_id.in_(invoice_ids),
+                OverdueInvoice.invoice_id.not_in(still_overdue),
+            )
+        ).all()
+        if rows:
+            db.execute(
+                insert(OverdueEvent),
+                [_event(row, OverdueEventKind.cleared, row.balance, as_of) for row in rows],
+            )
+            db.execute(
+                OverdueInvoice.__table__.delete().where(
+                    OverdueInvoice.invoice_id.in_([row.invoice_id for row in rows])
+                )
+            )
+        db.commit()
+
+        chunks += 1
+        cleared += len(rows)
+        last_id = invoice_ids[-1]
+        lock.reacquire()
+
+
+def _flag_overdue(db: Session, as_of: date, chunk_size: int, lock) -> tuple[int, int]:
+    """Add newly overdue invoices to the overdue set; return (flagged, chunks)."""
+    flagged = chunks = 0
+    school_ids = db.scalars(select(School.id).order_by(School.id)).all()
+    db.commit()
+
+    not_flagged = ~exists().where(OverdueInvoice.invoice_id == Invoice.id)
+    for school_id in school_ids:
+        last = None
+        while True:
+            query = (
+                select(
+                    Invoice.id.label("invoice_id"),
+                    Invoice.school_id,
+                    Invoice.student_id,
+                    Invoice.due_date,
+                    Invoice.balance,
+                )
+                .where(*_overdue_filters(as_of, school_id), not_flagged)
+                .order_by(Invoice.due_date, Invoice.id)
+                .limit(chunk_size)
+            )
+            if last is not None:
+                query = query.where(tuple_(Invoice.due_date, Invoice.id) > tuple_(*last))
+            rows = db.execute(query).all()
+            if not rows:
+                db.commit()
+                break
+
+            db.execute(
+                insert(OverdueInvoice),
+                [
+                    {
+                        "invoice_id": row.invoice_id,
+                        "school_id": row.school_id,
+                        "student_id": row.student_id,
+                        "due_date": row.due_date,
+                        "detected_on": as_of,
+                    }
+                    for row in rows
+                ],
+            )
+            db.execute(
+                insert(OverdueEvent),
+                [_event(row, OverdueEventKind.overdue, row.balance, as_of) for row in rows],
+            )
+            db.commit()
+
+            chunks += 1
+            flagged += len(rows)
+            last = (rows[-1].due_date, rows[-1].invoice_id)
+            lock.reacquire()
+    return flagged, chunks
+
+
+def scan_overdue_invoices(
+    db: Session, as_of: date | None = None, chunk_size: int | None = None
+) -> dict:
+    """Record the overdue state changes as of `as_of` (default today).
+
+    See the module docstring. Raises ConflictError if a scan is already
+    in progress. Returns the number of invoices that became overdue
+    (`flagged`), stopped being overdue (`cleared`), and the chunk count.
+    """
+    as_of = as_of or date.today()
+    chunk_size = chunk_size or settings.overdue_scan_chunk_size
+
+    lock = get_redis_client().lock(
+        SCAN_LOCK_NAME, timeout=settings.overdue_scan_lock_ttl, blocking=False
+    )
+    if not lock.acquire():
+        raise ConflictError("An overdue scan is already in progress")
+
+    try:
+        cleared, clear_chunks = _clear_resolved(db, as_of, chunk_size, lock)
+        flagged, flag_chunks = _flag_overdue(db, as_of, chunk_size, lock)
+    finally:
+        db.rollback()
+        try:
+            lock.release()
+        except LockError:
+            # Expired while a chunk ran; the next scan may already hold it
+            pass
+
+    return {
+        "as_of": as_of,
+        "flagged": flagged,
+        "cleared": cleared,
+        "chunks": clear_chunks + flag_chunks,
+    }
@@ -0,0 +1,195 @@
+"""Bulk payment import from bank / payment-processor CSV files.
+
+Files are read row by row and processed in chunks, so memory stays flat
+regardless of file size. Per chunk:
+
+- rows are parsed with the `PaymentCreate` schema,
+- the referenced invoices are loaded (and locked) with one query, and
+  the not-cancelled and no-overpayment rules are checked against their
+  stored running totals plus the chunk's earlier payments,
+- accepted payments are inserted with a multi-row INSERT ... RETURNING
+  and the invoices' totals, balances and statuses are updated in one
+  executemany UPDATE, then the chunk is committed and the affected cache
+  scopes are bumped once.
+
+Every data line gets a result (created or rejected with a reason), which
+is written to a CSV report as the import proceeds. Sources are decoded
+with `SOURCE_ERRORS`, so bytes that are not UTF-8 (e.g. a Latin-1 bank
+export) reject their line instead of aborting the import midway.
+"""
+import csv
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TextIO
+
+import pydantic
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.models.invoice import Invoice, InvoiceStatus, derive_invoice_status
+from app.models.payment import Payment
+from app.schemas.payment import PaymentCreate
+
+CSV_COLUMNS = ("invoice_id", "paid_at", "amount", "method", "reference")
+REQUIRED_COLUMNS = {"invoice_id", "paid_at", "amount", "method"}
+REPORT_COLUMNS = ("line", "status", "payment_id", "invoice_id", "message")
+# Error handler to decode sources with: undecodable bytes become lone
+# surrogates, which `_parse` detects per line
+SOURCE_ERRORS = "surrogateescape"
+
+
+def _check_utf8(value: str) -> None:
+    try:
+        value.encode("utf-8", errors="strict")
+    except UnicodeEncodeError as exc:
+        raise ValidationError("Line is not valid UTF-8") from exc
+
+
+def _parse(row: dict[str, str]) -> PaymentCreate:
+    for column in CSV_COLUMNS:
+        _check_utf8(row.get(column) or "")
+    data = {column: (row.get(column) or "").strip() or None for column in CSV_COLUMNS}
+    try:
+        payment_in = PaymentCreate.model_validate(data)
+    except pydantic.ValidationError as exc:
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise ValidationError(f"{field}: {error['msg']}") from exc
+    if payment_in.amount <= 0:
+        raise ValidationError("Payment amount must be greater than zero")
+    return payment_in
+
+
+def _rejected(line: int, invoice_id: int | None, message: str) -> dict:
+    return {
+        "line": line,
+        "status": "rejected",
+        "payment_id": None,
+        "invoice_id": invoice_id,
+        "message": message,
+    }
+
+
+def _import_chunk(db: Session, chunk: list[tuple[int, dict[str, str]]]) -> list[dict]:
+    results: dict[int, dict] = {}
+    parsed: list[tuple[int, PaymentCreate]] = []
+    for line, row in chunk:
+        try:
+            parsed.append((line, _parse(row)))
+        except ValidationError as exc:
+            results[line] = _rejected(line, None, str(exc))
+
+    invoice_ids = {payment_in.invoice_id for _, payment_in in parsed}
+    invoices = {
+        invoice.id: invoice
+        for invoice in db.execute(
+            select(
+                Invoice.id,
+                Invoice.school_id,
+                Invoice.student_id,
+                Invoice.amount,
+                Invoice.total_paid,
+                Invoice.status,
+            )
+            .where(Invoice.id.in_(invoice_ids))
+            .with_for_update()
+        )
+    }
+
+    # Running totals include the chunk's earlier accepted payments
+    totals = {invoice_id: invoice.total_paid for invoice_id, invoice in invoices.items()}
+    accepted: list[tuple[int, PaymentCreate]] = []
+    for line, payment_in in parsed:
+        invoice = invoices.get(payment_in.invoice_id)
+        if invoice is None:
+            message = f"Invoice with id {payment_in.invoice_id} not found"
+        elif invoice.status == InvoiceStatus.cancelled:
+            message = "Cannot add payment to cancelled invoice"
+        elif totals[invoice.id] + payment_in.amount > invoice.amount:
+            message = "Total payments cannot exceed invoice amount"
+        else:
+            totals[invoice.id] += payment_in.amount
+            accepted.append((line, payment_in))
+            continue
+        results[line] = _rejected(line, payment_in.invoice_id, message)
+
+    if accepted:
+        payment_ids = db.scalars(
+            insert(Payment).returning(Payment.id, sort_by_parameter_order=True),
+            [payment_in.model_dump() for _, payment_in in accepted],
+        ).all()
+        for (line, payment_in), payment_id in zip(accepted, payment_ids):
+            results[line] = {
+                "line": line,
+                "status": "created",
+                "payment_id": payment_id,
+                "invoice_id": payment_in.invoice_id,
+                "message": None,
+            }
+
+        paid_invoices = {invoices[payment_in.invoice_id] for _, payment_in in accepted}
+        db.execute(
+            update(Invoice),
+            [
+                {
+                    "id": invoice.id,
+                    "total_paid": totals[invoice.id],
+                    "balance": invoice.amount - totals[invoice.id],
+                    "status": derive_invoice_status(
+                        invoice.amount, invoice.amount - totals[invoice.id], invoice.status
+                    ),
+                }
+                for invoice in paid_invoices
+            ],
+        )
+    db.commit()
+
+    if accepted:
+        scopes = {school_scope(invoice.school_id) for invoice in paid_invoices}
+        scopes |= {student_scope(invoice.student_id) for invoice in paid_invoices}
+        bump_cache_versions(*sorted(scopes), table_scope("invoices"), table_scope("payments"))
+
+    return [results[line] for line, _ in chunk]
+
+
+def import_payments(
+    db: Session, rows: Iterable[tuple[int, dict[str, str]]], chunk_size: int | None = None
+) -> Iterator[dict]:
+    """Import `(line_number, row)` pairs, yielding one result per row.
+
+    Each chunk of `chunk_size` rows (default `settings.bulk_insert_chunk_size`)
+    is committed on its own, so an interrupted import keeps the chunks
+    already reported as created.
+    """
+    rows = iter(rows)
+    chunk_size = chunk_size or settings.bulk_insert_chunk_size
+    while chunk := list(islice(rows, chunk_size)):
+        yield from _import_chunk(db, chunk)
+
+
+def import_payments_csv(
+    db: Session, source: TextIO, report: TextIO, chunk_size: int | None = None
+) -> dict[str, int]:
+    """Import a payments CSV, writing a per-line report CSV.
+
+    The source must have a header row with at least `invoice_id`,
+    `paid_at`, `amount` and `method` (`reference` is optional), and be
+    opened with `errors=SOURCE_ERRORS`. Returns the number of created
+    and rejected rows.
+    """
+    reader = csv.DictReader(source)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise ValidationError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+    writer = csv.DictWriter(report, fieldnames=REPORT_COLUMNS)
+    writer.writeheader()
+    counts = {"created": 0, "rejected": 0}
+    numbered_rows = ((reader.line_num, row) for row in reader)
+    for result in import_payments(db, numbered_rows, chunk_size):
+        counts[result["status"]] += 1
+        writer.writerow(result)
+    return counts
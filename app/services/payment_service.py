@@ -4,23 +4,108 @@ Handles recording payments against invoices. Payments reduce
 the outstanding balance on an invoice and affect the school/student
 account statements.
 """
+from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import Select, case, cast, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.cache import cache_invalidate_prefix
-from app.core.exceptions import BusinessRuleError, EntityNotFoundError, ValidationError
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
+from app.core.exceptions import (
+    BusinessRuleError,
+    DomainException,
+    EntityNotFoundError,
+    ValidationError,
+)
+from app.models.archive import InvoiceArchive, PaymentArchive
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.payment import Payment
 from app.schemas.payment import PaymentCreate
-from app.utils.pagination import paginate
+from app.services.archive_service import live_columns, union_with_archive
+from app.utils.batch import get_batch_async
+from app.utils.pagination import TotalMode, paginate, paginate_async
 
 
 def get_payment(db: Session, payment_id: int) -> Payment | None:
     return db.get(Payment, payment_id)
 
 
+async def get_payments_batch_async(db: AsyncSession, ids: list[int]) -> dict:
+    """Fetch payments by ids in one query (see app.utils.batch)."""
+    return await get_batch_async(db, Payment.id, ids)
+
+
+def _payment_filters(
+    payments,
+    invoices,
+    invoice_id: int | None,
+    student_id: int | None,
+    school_id: int | None,
+    paid_from: datetime | None,
+    paid_to: datetime | None,
+) -> list:
+    """WHERE clauses on `payments` joined to `invoices` (models or `.c`)."""
+    filters = []
+
+    if invoice_id is not None:
+        filters.append(payments.invoice_id == invoice_id)
+
+    if student_id is not None:
+        filters.append(invoices.student_id == student_id)
+
+    if school_id is not None:
+        filters.append(invoices.school_id == school_id)
+
+    # Bounds on the partition key let Postgres skip other months' partitions
+    if paid_from is not None:
+        filters.append(payments.paid_at >= paid_from)
+
+    if paid_to is not None:
+        filters.append(payments.paid_at < paid_to)
+
+    return filters
+
+
+def _list_payments_query(
+    invoice_id: int | None,
+    student_id: int | None,
+    school_id: int | None,
+    paid_from: datetime | None,
+    paid_to: datetime | None,
+    include_archived: bool = False,
+) -> tuple[Select, list[str]]:
+    filters = (invoice_id, student_id, school_id, paid_from, paid_to)
+    joined = invoice_id is not None or student_id is not None or school_id is not None
+
+    if include_archived:
+        selects = []
+        for payments, invoices in (
+            (Payment.__table__, Invoice.__table__),
+            (PaymentArchive.__table__, InvoiceArchive.__table__),
+        ):
+            query = select(*live_columns(payments, Payment))
+            if joined:
+                query = query.join(invoices, invoices.c.id == payments.c.invoice_id)
+            selects.append(query.where(*_payment_filters(payments.c, invoices.c, *filters)))
+        base_query = select(union_with_archive(Payment, *selects))
+    else:
+        base_query = select(Payment)
+        if joined:
+            base_query = base_query.join(Invoice)
+        base_query = base_query.where(*_payment_filters(Payment, Invoice, *filters))
+
+    # Cached totals are invalidated by writes to the narrowest filtered entity
+    if school_id is not None:
+        count_scopes = [school_scope(school_id)]
+    elif student_id is not None:
+        count_scopes = [student_scope(student_id)]
+    else:
+        count_scopes = [table_scope("payments")]
+
+    return base_query, count_scopes
+
+
 def list_payments(
     db: Session,
     limit: int,
@@ -28,22 +113,96 @@ def list_payments(
     invoice_id: int | None = None,
     student_id: int | None = None,
     school_id: int | None = None,
+    paid_from: datetime | None = None,
+    paid_to: datetime | None = None,
+    include_archived: bool = False,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
 ) -> dict:
-    base_query = select(Payment)
+    base_query, count_scopes = _list_payments_query(
+        invoice_id, student_id, school_id, paid_from, paid_to, include_archived
+    )
+    return paginate(
+        base_query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=count_scopes,
+    )
 
-    if invoice_id is not None or student_id is not None or school_id is not None:
-        base_query = base_query.join(Invoice)
 
-    if invoice_id is not None:
-        base_query = base_query.where(Payment.invoice_id == invoice_id)
+async def list_payments_async(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    invoice_id: int | None = None,
+    student_id: int | None = None,
+    school_id: int | None = None,
+    paid_from: datetime | None = None,
+    paid_to: datetime | None = None,
+    include_archived: bool = False,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+) -> dict:
+    base_query, count_scopes = _list_payments_query(
+        invoice_id, student_id, school_id, paid_from, paid_to, include_archived
+    )
+    return await paginate_async(
+        base_query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=count_scopes,
+    )
 
-    if student_id is not None:
-        base_query = base_query.where(Invoice.student_id == student_id)
 
-    if school_id is not None:
-        base_query = base_query.where(Invoice.school_id == school_id)
+def _apply_payment_statement(invoice_id: int, amount: Decimal):
+    """Atomically add amount to an open invoice's stored running totals.
+
+    The WHERE clause re-checks the not-cancelled and no-overpayment rules
+    against the row's current values, and the UPDATE holds that row's
+    lock until commit, so concurrent payments on the same invoice are
+    serialized while payments on other invoices proceed in parallel. No
+    row is returned when a rule fails.
+    """
+    total_paid = Invoice.total_paid + amount
+    balance = Invoice.amount - total_paid
+    status = case(
+        (balance <= 0, InvoiceStatus.paid.value),
+        else_=InvoiceStatus.partially_paid.value,
+    )
+    return (
+        update(Invoice)
+        .where(
+            Invoice.id == invoice_id,
+            Invoice.status != InvoiceStatus.cancelled,
+            total_paid <= Invoice.amount,
+        )
+        .values(
+            total_paid=total_paid,
+            balance=balance,
+            # Postgres types the CASE as text, which does not assign to the enum
+            status=cast(status, Invoice.status.type),
+        )
+        .returning(Invoice.school_id, Invoice.student_id)
+        .execution_options(synchronize_session=False)
+    )
+
 
-    return paginate(base_query, db, limit, offset)
+def _payment_rejection(db: Session, payment_in: PaymentCreate) -> DomainException:
+    """Explain why a payment cannot be applied, checking rules in order."""
+    invoice = db.get(Invoice, payment_in.invoice_id)
+    if not invoice:
+        return EntityNotFoundError("Invoice", payment_in.invoice_id)
+    if invoice.status == InvoiceStatus.cancelled:
+        return BusinessRuleError("Cannot add payment to cancelled invoice")
+    if payment_in.amount <= 0:
+        return ValidationError("Payment amount must be greater than zero")
+    return BusinessRuleError("Total payments cannot exceed invoice amount")
 
 
 def create_payment(db: Session, payment_in: PaymentCreate) -> Payment:
@@ -55,29 +214,27 @@ def create_payment(db: Session, payment_in: PaymentCreate) -> Payment:
     - Total payments cannot exceed invoice amount (no overpayment)
     
     Side Effects:
+    - Updates the invoice's stored total_paid, balance and status with a
+      single conditional UPDATE in the same transaction as the payment
+      insert; only the target invoice row is locked
     - Invalidates cached statements for the related school and student
     """
-    invoice = db.get(Invoice, payment_in.invoice_id)
-    if not invoice:
-        raise EntityNotFoundError("Invoice", payment_in.invoice_id)
-    if invoice.status == InvoiceStatus.cancelled:
-        raise BusinessRuleError("Cannot add payment to cancelled invoice")
-    if payment_in.amount <= 0:
-        raise ValidationError("Payment amount must be greater than zero")
-
-    # Prevent overpayment
-    total_paid = sum((p.amount for p in invoice.payments or []), Decimal("0"))
-    if total_paid + payment_in.amount > invoice.amount:
-        raise BusinessRuleError("Total payments cannot exceed invoice amount")
+    invoice = None
+    if payment_in.amount > 0:
+        invoice = db.execute(
+            _apply_payment_statement(payment_in.invoice_id, payment_in.amount)
+        ).first()
+    if invoice is None:
+        raise _payment_rejection(db, payment_in)
 
     payment = Payment(**payment_in.model_dump())
     db.add(payment)
     db.commit()
     db.refresh(payment)
-    cache_invalidate_prefix(
-        f"cache:GET:/api/v1/schools/{invoice.school_id}/statement"
-    )
-    cache_invalidate_prefix(
-        f"cache:GET:/api/v1/students/{invoice.student_id}/statement"
+    bump_cache_versions(
+        school_scope(invoice.school_id),
+        student_scope(invoice.student_id),
+        table_scope("invoices"),
+        table_scope("payments"),
     )
     return payment
@@ -1,18 +1,62 @@
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
 from app.models.school import School
+from app.models.student import Student
 from app.schemas.school import SchoolCreate, SchoolUpdate
-from app.utils.pagination import paginate
+from app.utils.batch import batch_key, get_batch_async
+from app.utils.pagination import TotalMode, paginate, paginate_async
 
 
 def get_school(db: Session, school_id: int) -> School | None:
     return db.get(School, school_id)
 
 
-def list_schools(db: Session, limit: int, offset: int) -> dict:
+def list_schools(
+    db: Session,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+) -> dict:
     query = select(School)
-    return paginate(query, db, limit, offset)
+    return paginate(
+        query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=[table_scope("schools")],
+    )
+
+
+async def list_schools_async(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+) -> dict:
+    query = select(School)
+    return await paginate_async(
+        query,
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=[table_scope("schools")],
+    )
+
+
+async def get_schools_batch_async(
+    db: AsyncSession, ids: list[int] | None = None, external_ids: list[str] | None = None
+) -> dict:
+    """Fetch schools by ids or by external_ids in one query (see app.utils.batch)."""
+    return await get_batch_async(db, *batch_key(School, ids, external_ids))
 
 
 def create_school(db: Session, school_in: SchoolCreate) -> School:
@@ -20,6 +64,7 @@ def create_school(db: Session, school_in: SchoolCreate) -> School:
     db.add(school)
     db.commit()
     db.refresh(school)
+    bump_cache_versions(table_scope("schools"))
     return school
 
 
@@ -31,6 +76,13 @@ def update_school(db: Session, school_id: int, school_in: SchoolUpdate) -> Schoo
         setattr(school, field, value)
     db.commit()
     db.refresh(school)
+    # Student statements embed the school's name too
+    student_ids = db.scalars(select(Student.id).where(Student.school_id == school_id)).all()
+    bump_cache_versions(
+        school_scope(school_id),
+        *(student_scope(student_id) for student_id in student_ids),
+        table_scope("schools"),
+    )
     return school
 
 
@@ -40,4 +92,12 @@ def delete_school(db: Session, school_id: int) -> bool:
         return False
     db.delete(school)
     db.commit()
+    # Students, invoices and payments are deleted with the school
+    bump_cache_versions(
+        school_scope(school_id),
+        table_scope("schools"),
+        table_scope("students"),
+        table_scope("invoices"),
+        table_scope("payments"),
+    )
     return True
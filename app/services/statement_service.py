@@ -1,122 +1,250 @@
+"""Account statement generation for schools and students.
+
+Statements are aggregated in the database: a single grouped query
+LEFT JOINs invoices to their payments and returns per-invoice paid
+amounts, balances and derived statuses, so no ORM objects are built
+for invoices or payments. The CASE expression mirrors
+`Invoice.calculate_balance()`. The statement totals are window sums
+(`SUM(...) OVER ()`) over the same SELECT, so Python only builds items.
+
+Only live invoices are scanned: totals of archived invoices come from
+the opening balances carried forward by `archive_service`.
+"""
 from decimal import Decimal
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Select, Table, case, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.models.archive import InvoiceArchive, OpeningBalance, PaymentArchive
 from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
 from app.models.school import School
 from app.models.student import Student
 from app.schemas.statement import SchoolStatement, StatementInvoiceItem, StudentStatement
 
 
-def get_school_statement(db: Session, school_id: int) -> SchoolStatement | None:
-    """Generate an account statement for a school.
-    
-    Returns aggregated financial data including:
-    - Total invoiced amount (excluding cancelled)
-    - Total payments received
-    - Outstanding balance
-    - Breakdown by invoice with per-invoice balances
-    """
-    school = db.get(School, school_id)
-    if not school:
-        return None
+def _statement_rows_query(invoices: Table, payments: Table, archived: bool) -> Select:
+    """Build the grouped per-invoice statement query over the given tables.
 
-    invoices = db.scalars(
-        select(Invoice)
-        .where(Invoice.school_id == school_id)
-        .options(
-            selectinload(Invoice.payments),
-            selectinload(Invoice.student),
+    Callers add the WHERE clause (school or student scope).
+    """
+    total_paid = func.coalesce(func.sum(payments.c.amount), literal(Decimal("0")))
+    balance = invoices.c.amount - total_paid
+    status = case(
+        (invoices.c.status == InvoiceStatus.cancelled, InvoiceStatus.cancelled.value),
+        (balance <= 0, InvoiceStatus.paid.value),
+        (balance < invoices.c.amount, InvoiceStatus.partially_paid.value),
+        else_=InvoiceStatus.pending.value,
+    )
+    return (
+        select(
+            invoices.c.id.label("invoice_id"),
+            invoices.c.student_id,
+            Student.first_name,
+            Student.last_name,
+            invoices.c.amount,
+            total_paid.label("total_paid"),
+            balance.label("balance"),
+            status.label("status"),
+            invoices.c.due_date,
+            literal(archived).label("archived"),
+        )
+        .join(Student, Student.id == invoices.c.student_id)
+        .outerjoin(payments, payments.c.invoice_id == invoices.c.id)
+        .group_by(
+            invoices.c.id,
+            invoices.c.student_id,
+            Student.first_name,
+            Student.last_name,
+            invoices.c.amount,
+            invoices.c.status,
+            invoices.c.due_date,
         )
-    ).all()
+    )
 
-    students_count = db.scalar(
-        select(func.count()).select_from(Student).where(Student.school_id == school_id)
-    ) or 0
 
-    total_invoiced = Decimal("0")
-    total_paid = Decimal("0")
-    items: list[StatementInvoiceItem] = []
+def _statement_rows(scope_column: str, scope_id: int, include_archived: bool) -> Select:
+    """Statement rows of the invoices whose `scope_column` is `scope_id`.
 
-    for invoice in invoices:
-        balance_info = invoice.calculate_balance()
-        if balance_info.status != InvoiceStatus.cancelled.value:
-            total_invoiced += invoice.amount
-            total_paid += balance_info.total_paid
+    Archived invoices are only listed with `include_archived`. Every row
+    also carries the totals of the listed live, non-cancelled invoices
+    (`live_invoiced`, `live_paid`); archived invoices are left out, as
+    the opening balance already covers them.
+    """
+    invoices = Invoice.__table__
+    query = _statement_rows_query(invoices, Payment.__table__, archived=False).where(
+        invoices.c[scope_column] == scope_id
+    )
+    if include_archived:
+        archive = InvoiceArchive.__table__
+        archived = _statement_rows_query(archive, PaymentArchive.__table__, archived=True)
+        query = union_all(query, archived.where(archive.c[scope_column] == scope_id))
+    rows = query.subquery()
+
+    counted = (rows.c.status != InvoiceStatus.cancelled.value) & rows.c.archived.is_(False)
+    return select(
+        rows,
+        *(
+            func.sum(case((counted, column), else_=literal(Decimal("0")))).over().label(label)
+            for column, label in (
+                (rows.c.amount, "live_invoiced"),
+                (rows.c.total_paid, "live_paid"),
+            )
+        ),
+    ).order_by(rows.c.invoice_id)
 
+
+def _build_items(rows, header) -> tuple[list[StatementInvoiceItem], Decimal, Decimal]:
+    """Convert statement rows into items and add up the totals.
+
+    Totals are the header's opening balance, which already covers
+    archived invoices, plus the rows' window totals of live invoices.
+    Cancelled invoices are listed but excluded from the totals.
+    """
+    rows = rows.all()
+    total_invoiced = header.opening_invoiced or Decimal("0")
+    total_paid = header.opening_paid or Decimal("0")
+    if rows:
+        total_invoiced += rows[0].live_invoiced
+        total_paid += rows[0].live_paid
+
+    items: list[StatementInvoiceItem] = []
+    for row in rows:
         items.append(
             StatementInvoiceItem(
-                invoice_id=invoice.id,
-                student_id=invoice.student_id,
-                student_name=f"{invoice.student.first_name} {invoice.student.last_name}",
-                amount=invoice.amount,
-                total_paid=balance_info.total_paid,
-                balance=balance_info.balance,
-                status=balance_info.status,
-                due_date=invoice.due_date,
+                invoice_id=row.invoice_id,
+                student_id=row.student_id,
+                student_name=f"{row.first_name} {row.last_name}",
+                amount=row.amount,
+                total_paid=row.total_paid,
+                balance=row.balance,
+                status=row.status,
+                due_date=row.due_date,
+                archived=row.archived,
             )
         )
 
-    total_pending = total_invoiced - total_paid
+    return items, total_invoiced, total_paid
+
+
+def _opening_balance(*where) -> tuple:
+    """Opening invoiced and paid totals (scalar subqueries) matching where."""
+    return tuple(
+        select(func.coalesce(func.sum(column), literal(Decimal("0"))))
+        .where(*where)
+        .scalar_subquery()
+        .label(label)
+        for column, label in (
+            (OpeningBalance.total_invoiced, "opening_invoiced"),
+            (OpeningBalance.total_paid, "opening_paid"),
+        )
+    )
+
+
+def _school_header_query(school_id: int) -> Select:
+    students_count = (
+        select(func.count())
+        .select_from(Student)
+        .where(Student.school_id == School.id)
+        .scalar_subquery()
+    )
+    return select(
+        School.id,
+        School.name,
+        students_count.label("students_count"),
+        *_opening_balance(OpeningBalance.school_id == School.id),
+    ).where(School.id == school_id)
+
+
+def _student_header_query(student_id: int) -> Select:
+    return (
+        select(
+            Student.id,
+            Student.first_name,
+            Student.last_name,
+            Student.school_id,
+            School.name.label("school_name"),
+            *_opening_balance(OpeningBalance.student_id == Student.id),
+        )
+        .join(School, School.id == Student.school_id)
+        .where(Student.id == student_id)
+    )
+
 
+def _school_statement(header, rows) -> SchoolStatement:
+    items, total_invoiced, total_paid = _build_items(rows, header)
     return SchoolStatement(
-        school_id=school.id,
-        school_name=school.name,
-        students_count=students_count,
+        school_id=header.id,
+        school_name=header.name,
+        students_count=header.students_count or 0,
+        total_invoiced=total_invoiced,
+        total_paid=total_paid,
+        total_pending=total_invoiced - total_paid,
+        invoices=items,
+    )
+
+
+def _student_statement(header, rows) -> StudentStatement:
+    items, total_invoiced, total_paid = _build_items(rows, header)
+    return StudentStatement(
+        student_id=header.id,
+        student_name=f"{header.first_name} {header.last_name}",
+        school_id=header.school_id,
+        school_name=header.school_name,
         total_invoiced=total_invoiced,
         total_paid=total_paid,
-        total_pending=total_pending,
+        total_pending=total_invoiced - total_paid,
         invoices=items,
     )
 
 
-def get_student_statement(db: Session, student_id: int) -> StudentStatement | None:
-    student = db.get(Student, student_id)
-    if not student:
+def get_school_statement(
+    db: Session, school_id: int, include_archived: bool = False
+) -> SchoolStatement | None:
+    """Generate an account statement for a school.
+
+    Returns aggregated financial data including:
+    - Total invoiced amount (excluding cancelled)
+    - Total payments received
+    - Outstanding balance
+    - Breakdown by invoice with per-invoice balances (archived invoices
+      only with `include_archived`; their totals are always included
+      through the opening balance)
+    """
+    header = db.execute(_school_header_query(school_id)).first()
+    if not header:
         return None
+    rows = db.execute(_statement_rows("school_id", school_id, include_archived))
+    return _school_statement(header, rows)
 
-    invoices = db.scalars(
-        select(Invoice)
-        .where(Invoice.student_id == student_id)
-        .options(
-            selectinload(Invoice.payments),
-            selectinload(Invoice.school),
-        )
-    ).all()
 
-    total_invoiced = Decimal("0")
-    total_paid = Decimal("0")
-    items: list[StatementInvoiceItem] = []
+def get_student_statement(
+    db: Session, student_id: int, include_archived: bool = False
+) -> StudentStatement | None:
+    header = db.execute(_student_header_query(student_id)).first()
+    if not header:
+        return None
+    rows = db.execute(_statement_rows("student_id", student_id, include_archived))
+    return _student_statement(header, rows)
 
-    for invoice in invoices:
-        balance_info = invoice.calculate_balance()
-        if balance_info.status != InvoiceStatus.cancelled.value:
-            total_invoiced += invoice.amount
-            total_paid += balance_info.total_paid
 
-        items.append(
-            StatementInvoiceItem(
-                invoice_id=invoice.id,
-                student_id=invoice.student_id,
-                student_name=f"{student.first_name} {student.last_name}",
-                amount=invoice.amount,
-                total_paid=balance_info.total_paid,
-                balance=balance_info.balance,
-                status=balance_info.status,
-                due_date=invoice.due_date,
-            )
-        )
+async def get_school_statement_async(
+    db: AsyncSession, school_id: int, include_archived: bool = False
+) -> SchoolStatement | None:
+    """Async `get_school_statement`, same queries on an `AsyncSession`."""
+    header = (await db.execute(_school_header_query(school_id))).first()
+    if not header:
+        return None
+    rows = await db.execute(_statement_rows("school_id", school_id, include_archived))
+    return _school_statement(header, rows)
 
-    total_pending = total_invoiced - total_paid
 
-    return StudentStatement(
-        student_id=student.id,
-        student_name=f"{student.first_name} {student.last_name}",
-        school_id=student.school_id,
-        school_name=student.school.name,
-        total_invoiced=total_invoiced,
-        total_paid=total_paid,
-        total_pending=total_pending,
-        invoices=items,
-    )
+async def get_student_statement_async(
+    db: AsyncSession, student_id: int, include_archived: bool = False
+) -> StudentStatement | None:
+    header = (await db.execute(_student_header_query(student_id))).first()
+    if not header:
+        return None
+    rows = await db.execute(_statement_rows("student_id", student_id, include_archived))
+    return _student_statement(header, rows)
@@ -1,13 +1,19 @@
 """Student management service."""
-from sqlalchemy import select
+from sqlalchemy import Select, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import bump_cache_versions, school_scope, student_scope, table_scope
+from app.core.config import settings
 from app.core.exceptions import EntityNotFoundError, ValidationError
 from app.models.school import School
 from app.models.student import Student
 from app.models.student import StudentStatus
-from app.schemas.student import StudentCreate, StudentUpdate
-from app.utils.pagination import paginate
+from app.schemas.student import StudentCreate, StudentUpdate, StudentUpsert
+from app.utils.batch import batch_key, get_batch_async
+from app.utils.fieldsets import load_fields, load_fields_options
+from app.utils.pagination import TotalMode, paginate, paginate_async
 
 
 def ensure_valid_student_status(status: str | StudentStatus) -> StudentStatus:
@@ -19,19 +25,135 @@ def ensure_valid_student_status(status: str | StudentStatus) -> StudentStatus:
         raise ValidationError("Invalid student status") from exc
 
 
-def get_student(db: Session, student_id: int) -> Student | None:
-    return db.get(Student, student_id)
+def get_student(
+    db: Session, student_id: int, fields: list[str] | None = None
+) -> Student | None:
+    """Fetch a student, loading only `fields` when given (see app.utils.fieldsets)."""
+    return db.get(Student, student_id, options=load_fields_options(Student, fields))
 
 
-def list_students(
-    db: Session, limit: int, offset: int, school_id: int | None = None
-) -> dict:
+def _list_students_query(school_id: int | None) -> tuple[Select, list[str]]:
     base_query = select(Student)
 
     if school_id is not None:
         base_query = base_query.where(Student.school_id == school_id)
 
-    return paginate(base_query, db, limit, offset)
+    if school_id is not None:
+        count_scopes = [school_scope(school_id)]
+    else:
+        count_scopes = [table_scope("students")]
+
+    return base_query, count_scopes
+
+
+def list_students(
+    db: Session,
+    limit: int,
+    offset: int,
+    school_id: int | None = None,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+    fields: list[str] | None = None,
+) -> dict:
+    base_query, count_scopes = _list_students_query(school_id)
+    return paginate(
+        load_fields(base_query, fields),
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=count_scopes,
+    )
+
+
+async def list_students_async(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    school_id: int | None = None,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+    fields: list[str] | None = None,
+) -> dict:
+    base_query, count_scopes = _list_students_query(school_id)
+    return await paginate_async(
+        load_fields(base_query, fields),
+        db,
+        limit,
+        offset,
+        cursor=cursor,
+        total=total,
+        count_scopes=count_scopes,
+    )
+
+
+def _student_batch_filters(school_id: int | None) -> list:
+    return [] if school_id is None else [Student.school_id == school_id]
+
+
+async def get_students_batch_async(
+    db: AsyncSession,
+    ids: list[int] | None = None,
+    external_ids: list[str] | None = None,
+    school_id: int | None = None,
+) -> dict:
+    """Fetch students by ids or by external_ids in one query (see app.utils.batch).
+
+    Student external_ids are only unique per school; pass `school_id` to
+    resolve them within one school.
+    """
+    column, keys = batch_key(Student, ids, external_ids)
+    return await get_batch_async(db, column, keys, *_student_batch_filters(school_id))
+
+
+def _search_students_query(
+    dialect: str, q: str, school_id: int | None, limit: int
+) -> Select:
+    """Students whose full name matches q, best match first.
+
+    On Postgres, `full_name %> q` keeps names containing a run of words
+    trigram-similar to q (above `pg_trgm.word_similarity_threshold`),
+    served by the GIN index on (school_id, full_name), and ranks them
+    by word similarity. Elsewhere (SQLite in tests) it falls back to a
+    case-insensitive substring match, ranked by where q occurs.
+    """
+    terms = " ".join(q.split())
+    if not terms:
+        raise ValidationError("Search query must not be blank")
+
+    name = Student.full_name()
+    query = select(Student)
+    if school_id is not None:
+        query = query.where(Student.school_id == school_id)
+
+    if dialect == "postgresql":
+        query = query.where(name.op("%>")(terms)).order_by(
+            func.word_similarity(terms, name).desc(),
+            func.similarity(name, terms).desc(),
+            Student.id,
+        )
+    else:
+        lowered, needle = func.lower(name), terms.lower()
+        query = query.where(lowered.contains(needle, autoescape=True)).order_by(
+            func.instr(lowered, needle), func.length(name), Student.id
+        )
+    return query.limit(limit)
+
+
+def search_students(
+    db: Session, q: str, school_id: int | None = None, limit: int = 20
+) -> list[Student]:
+    """Look students up by (partial, possibly misspelled) name."""
+    query = _search_students_query(db.get_bind().dialect.name, q, school_id, limit)
+    return list(db.scalars(query).all())
+
+
+async def search_students_async(
+    db: AsyncSession, q: str, school_id: int | None = None, limit: int = 20
+) -> list[Student]:
+    query = _search_students_query(db.get_bind().dialect.name, q, school_id, limit)
+    return list((await db.scalars(query)).all())
 
 
 def create_student(db: Session, student_in: StudentCreate) -> Student:
@@ -52,9 +174,124 @@ def create_student(db: Session, student_in: StudentCreate) -> Student:
     db.add(student)
     db.commit()
     db.refresh(student)
+    bump_cache_versions(school_scope(student.school_id), table_scope("students"))
     return student
 
 
+_UPSERT_COLUMNS = ("first_name", "last_name", "status")
+
+
+def _upsert_statement(db: Session, rows: list[dict]):
+    """INSERT ... ON CONFLICT (school_id, external_id) DO UPDATE for rows.
+
+    Conflicting rows are only updated (and returned) when a synced column
+    actually changed, so unchanged students are neither written nor counted.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(Student)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(Student)
+    else:
+        raise NotImplementedError(f"Student upsert is not supported on {dialect}")
+
+    statement = statement.values(rows)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[Student.school_id, Student.external_id],
+        set_={
+            **{column: excluded[column] for column in _UPSERT_COLUMNS},
+            "updated_at": func.now(),
+        },
+        where=or_(
+            *(
+                getattr(Student, column).is_distinct_from(excluded[column])
+                for column in _UPSERT_COLUMNS
+            )
+        ),
+    ).returning(Student.id, Student.school_id, Student.external_id)
+
+
+def bulk_upsert_students(db: Session, students_in: list[StudentUpsert]) -> dict:
+    """Sync roster rows from the SIS, keyed on (school, external_id).
+
+    Schools are resolved by `external_id` with a single query; rows for
+    unknown schools, for external_ids shared by several schools (they are
+    not unique), or repeating a student already in the request, are
+    reported in `errors`. The rest are upserted in chunks of
+    `settings.bulk_insert_chunk_size` in one transaction. Returns the
+    created/updated/unchanged counts and the errors.
+    """
+    school_keys = {student_in.school_external_id for student_in in students_in}
+    school_ids: dict[str, list[int]] = {}
+    for external_id, school_id in db.execute(
+        select(School.external_id, School.id).where(School.external_id.in_(school_keys))
+    ):
+        school_ids.setdefault(external_id, []).append(school_id)
+
+    rows: list[dict] = []
+    errors: list[dict] = []
+    seen: set[tuple[int, str]] = set()
+    for index, student_in in enumerate(students_in):
+        matches = school_ids.get(student_in.school_external_id, [])
+        school_id = matches[0] if len(matches) == 1 else None
+        if not matches:
+            message = f"School with external_id {student_in.school_external_id} not found"
+        elif school_id is None:
+            message = (
+                f"School external_id {student_in.school_external_id} "
+                "matches several schools"
+            )
+        elif (school_id, student_in.external_id) in seen:
+            message = f"Duplicate student external_id {student_in.external_id} in request"
+        else:
+            seen.add((school_id, student_in.external_id))
+            rows.append(
+                {
+                    "school_id": school_id,
+                    "external_id": student_in.external_id,
+                    "first_name": student_in.first_name,
+                    "last_name": student_in.last_name,
+                    "status": student_in.status,
+                }
+            )
+            continue
+        errors.append({"index": index, "message": message})
+
+    created = updated = 0
+    updated_ids: list[int] = []
+    chunk_size = settings.bulk_insert_chunk_size
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        keys = [(row["school_id"], row["external_id"]) for row in chunk]
+        existing = set(
+            db.execute(
+                select(Student.school_id, Student.external_id).where(
+                    tuple_(Student.school_id, Student.external_id).in_(keys)
+                )
+            ).all()
+        )
+        for student_id, school_id, external_id in db.execute(_upsert_statement(db, chunk)):
+            if (school_id, external_id) in existing:
+                updated += 1
+                updated_ids.append(student_id)
+            else:
+                created += 1
+    db.commit()
+
+    if created or updated:
+        scopes = {school_scope(row["school_id"]) for row in rows}
+        scopes |= {student_scope(student_id) for student_id in updated_ids}
+        bump_cache_versions(*sorted(scopes), table_scope("students"))
+
+    return {
+        "created": created,
+        "updated": updated,
+        "unchanged": len(rows) - created - updated,
+        "errors": errors,
+    }
+
+
 def update_student(db: Session, student_id: int, student_in: StudentUpdate) -> Student | None:
     student = db.get(Student, student_id)
     if not student:
@@ -66,6 +303,10 @@ def update_student(db: Session, student_id: int, student_in: StudentUpdate) -> S
         setattr(student, field, value)
     db.commit()
     db.refresh(student)
+    # Statements embed the student's name
+    bump_cache_versions(
+        school_scope(student.school_id), student_scope(student.id), table_scope("students")
+    )
     return student
 
 
@@ -73,6 +314,15 @@ def delete_student(db: Session, student_id: int) -> bool:
     student = db.get(Student, student_id)
     if not student:
         return False
+    school_id = student.school_id
     db.delete(student)
     db.commit()
+    # Invoices and payments are deleted with the student
+    bump_cache_versions(
+        school_scope(school_id),
+        student_scope(student_id),
+        table_scope("students"),
+        table_scope("invoices"),
+        table_scope("payments"),
+    )
     return True
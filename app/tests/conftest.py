@@ -1,8 +1,12 @@
+from collections.abc import Iterator
+
+import fakeredis
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
+from app.core import cache
 from app.core.db import Base
 import app.models  # noqa: F401
 
@@ -25,3 +29,13 @@ def db_session() -> Session:
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture(autouse=True)
+def redis_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[fakeredis.FakeRedis]:
+    """Point the cache layer at an in-process fake Redis for each test."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "_redis_client", client)
+    cache.clear_local_cache()
+    yield client
+    cache.clear_local_cache()
@@ -0,0 +1,117 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from app.models.archive import InvoiceArchive, OpeningBalance, PaymentArchive
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+from app.models.school import School
+from app.models.student import Student
+from app.services.archive_service import archive_settled_invoices
+from app.services.invoice_service import list_invoices
+from app.services.payment_service import list_payments
+from app.services.statement_service import get_school_statement, get_student_statement
+
+HORIZON = date(2025, 1, 1)
+
+
+def _seed(db_session):
+    school = School(name="Archive School")
+    db_session.add(school)
+    db_session.flush()
+    ana = Student(school_id=school.id, first_name="Ana", last_name="Lopez")
+    luis = Student(school_id=school.id, first_name="Luis", last_name="Perez")
+    db_session.add_all([ana, luis])
+    db_session.flush()
+
+    def invoice(student, issued, amount, status, payments=()):
+        inv = Invoice(
+            school_id=school.id,
+            student_id=student.id,
+            issue_date=issued,
+            due_date=issued,
+            amount=Decimal(amount),
+            status=status,
+            total_paid=sum((Decimal(paid) for paid in payments), Decimal("0")),
+        )
+        db_session.add(inv)
+        db_session.flush()
+        for paid in payments:
+            db_session.add(
+                Payment(
+                    invoice_id=inv.id,
+                    paid_at=datetime(issued.year, issued.month, 5),
+                    amount=Decimal(paid),
+                    method="transfer",
+                )
+            )
+        return inv
+
+    old_paid = invoice(ana, date(2024, 1, 1), "100.00", InvoiceStatus.paid, ["60.00", "40.00"])
+    old_cancelled = invoice(luis, date(2024, 2, 1), "80.00", InvoiceStatus.cancelled, ["10.00"])
+    old_open = invoice(ana, date(2024, 3, 1), "50.00", InvoiceStatus.partially_paid, ["20.00"])
+    old_paid_luis = invoice(luis, date(2024, 4, 1), "70.00", InvoiceStatus.paid, ["70.00"])
+    recent_paid = invoice(ana, date(2026, 1, 1), "30.00", InvoiceStatus.paid, ["30.00"])
+    db_session.commit()
+    invoice_ids = [
+        inv.id for inv in (old_paid, old_cancelled, old_open, old_paid_luis, recent_paid)
+    ]
+    return school, ana, invoice_ids
+
+
+def _totals(statement):
+    return statement.total_invoiced, statement.total_paid, statement.total_pending
+
+
+def test_archiving_keeps_statement_totals_exact(db_session):
+    school, ana, invoice_ids = _seed(db_session)
+    school_before = _totals(get_school_statement(db_session, school.id))
+    student_before = _totals(get_student_statement(db_session, ana.id))
+
+    moved = archive_settled_invoices(db_session, before=HORIZON, chunk_size=2)
+
+    assert moved == {"invoices": 3, "payments": 4}
+    school_statement = get_school_statement(db_session, school.id)
+    assert _totals(school_statement) == school_before
+    assert _totals(get_student_statement(db_session, ana.id)) == student_before
+    # Only live invoices are listed by default
+    assert [item.invoice_id for item in school_statement.invoices] == [
+        invoice_ids[2],
+        invoice_ids[4],
+    ]
+    assert db_session.scalar(select(func.count()).select_from(OpeningBalance)) == 2
+
+
+def test_archived_rows_are_listed_on_request(db_session):
+    school, _, invoice_ids = _seed(db_session)
+    archive_settled_invoices(db_session, before=HORIZON)
+
+    statement = get_school_statement(db_session, school.id, include_archived=True)
+    live = list_invoices(db_session, limit=10, offset=0, school_id=school.id)
+    everything = list_invoices(
+        db_session, limit=10, offset=0, school_id=school.id, include_archived=True
+    )
+    payments = list_payments(
+        db_session, limit=10, offset=0, school_id=school.id, include_archived=True
+    )
+
+    assert [item.invoice_id for item in statement.invoices] == invoice_ids
+    assert [item.archived for item in statement.invoices] == [True, True, False, True, False]
+    assert _totals(statement) == _totals(get_school_statement(db_session, school.id))
+    assert live["total"] == 2
+    assert [inv.id for inv in everything["items"]] == invoice_ids
+    assert everything["total"] == 5
+    assert payments["total"] == 6
+
+
+def test_rerun_only_moves_what_is_left(db_session):
+    _seed(db_session)
+    archive_settled_invoices(db_session, before=HORIZON)
+
+    assert archive_settled_invoices(db_session, before=HORIZON) == {
+        "invoices": 0,
+        "payments": 0,
+    }
+    assert db_session.scalar(select(func.count()).select_from(InvoiceArchive)) == 3
+    assert db_session.scalar(select(func.count()).select_from(PaymentArchive)) == 4
@@ -1,11 +1,20 @@
+from datetime import date
+from decimal import Decimal
+
 import pytest
+from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.exceptions import EntityNotFoundError, ValidationError
-from app.models.invoice import InvoiceStatus
-from app.schemas.invoice import InvoiceCreate
+from app.models.invoice import Invoice, InvoiceStatus
+from app.schemas.invoice import InvoiceCreate, InvoiceUpdate
 from app.schemas.school import SchoolCreate
 from app.schemas.student import StudentCreate
-from app.services.invoice_service import create_invoice
+from app.services.invoice_service import (
+    bulk_create_invoices,
+    create_invoice,
+    update_invoice,
+)
 from app.services.school_service import create_school
 from app.services.student_service import create_student
 
@@ -82,3 +91,119 @@ def test_invoice_due_date_must_be_after_issue_date(db_session):
     )
     with pytest.raises(ValidationError, match="due_date"):
         create_invoice(db_session, invoice_in)
+
+
+def test_new_invoice_cannot_start_paid(db_session):
+    school, student = _create_school_and_student(db_session)
+    invoice_in = InvoiceCreate(
+        school_id=school.id,
+        student_id=student.id,
+        issue_date="2026-01-01",
+        due_date="2026-01-10",
+        amount="100.00",
+        status=InvoiceStatus.paid,
+    )
+    with pytest.raises(ValidationError, match="pending or cancelled"):
+        create_invoice(db_session, invoice_in)
+
+    cancelled = create_invoice(
+        db_session, invoice_in.model_copy(update={"status": InvoiceStatus.cancelled})
+    )
+    assert cancelled.status == InvoiceStatus.cancelled
+
+
+def test_bulk_create_rejects_rows_with_a_paid_status(db_session):
+    school, student = _create_school_and_student(db_session)
+    row = InvoiceCreate(
+        school_id=school.id,
+        student_id=student.id,
+        issue_date="2026-01-01",
+        due_date="2026-01-10",
+        amount="100.00",
+    )
+
+    result = bulk_create_invoices(
+        db_session,
+        [
+            row,
+            row.model_copy(update={"status": InvoiceStatus.partially_paid}),
+            row.model_copy(update={"status": InvoiceStatus.paid}),
+        ],
+    )
+
+    assert [item["index"] for item in result["created"]] == [0]
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert "pending or cancelled" in result["errors"][0]["message"]
+
+
+def test_bulk_create_inserts_in_chunks_preserving_order(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "bulk_insert_chunk_size", 2)
+    school, student = _create_school_and_student(db_session)
+    invoices_in = [
+        InvoiceCreate(
+            school_id=school.id,
+            student_id=student.id,
+            issue_date="2026-01-01",
+            due_date="2026-01-10",
+            amount=f"{100 + i}.00",
+        )
+        for i in range(5)
+    ]
+
+    result = bulk_create_invoices(db_session, invoices_in)
+
+    assert result["errors"] == []
+    ids = [item["id"] for item in result["created"]]
+    amounts = db_session.execute(
+        select(Invoice.id, Invoice.amount).where(Invoice.id.in_(ids))
+    ).all()
+    assert {invoice_id: str(amount) for invoice_id, amount in amounts} == {
+        invoice_id: f"{100 + i}.00" for i, invoice_id in enumerate(ids)
+    }
+
+
+def _partially_paid_invoice(db_session):
+    school, student = _create_school_and_student(db_session)
+    invoice = create_invoice(
+        db_session,
+        InvoiceCreate(
+            school_id=school.id,
+            student_id=student.id,
+            issue_date=date(2026, 1, 1),
+            due_date=date(2026, 1, 10),
+            amount=Decimal("1000.00"),
+        ),
+    )
+    invoice.apply_payment(Decimal("500.00"))
+    db_session.commit()
+    return invoice
+
+
+def test_invoice_status_cannot_be_set_against_payments(db_session):
+    invoice = _partially_paid_invoice(db_session)
+
+    with pytest.raises(ValidationError, match="only cancelled"):
+        update_invoice(db_session, invoice.id, InvoiceUpdate(status=InvoiceStatus.paid))
+
+    # Echoing the derived status is accepted; cancelling is always allowed
+    same = update_invoice(
+        db_session, invoice.id, InvoiceUpdate(status=InvoiceStatus.partially_paid)
+    )
+    assert same.status == InvoiceStatus.partially_paid
+    cancelled = update_invoice(
+        db_session, invoice.id, InvoiceUpdate(status=InvoiceStatus.cancelled)
+    )
+    assert cancelled.status == InvoiceStatus.cancelled
+    with pytest.raises(ValidationError):
+        update_invoice(db_session, invoice.id, InvoiceUpdate(status=InvoiceStatus.pending))
+
+
+def test_invoice_amount_cannot_drop_below_total_paid(db_session):
+    invoice = _partially_paid_invoice(db_session)
+
+    with pytest.raises(ValidationError, match="already paid"):
+        update_invoice(db_session, invoice.id, InvoiceUpdate(amount=Decimal("100.00")))
+
+    # Lowering it to the amount paid settles the invoice
+    settled = update_invoice(db_session, invoice.id, InvoiceUpdate(amount=Decimal("500.00")))
+    assert (settled.status, settled.balance) == (InvoiceStatus.paid, Decimal("0.00"))
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 import pytest
 
 from app.core.exceptions import BusinessRuleError, EntityNotFoundError, ValidationError
@@ -7,6 +9,7 @@ from app.schemas.payment import PaymentCreate
 from app.schemas.school import SchoolCreate
 from app.schemas.student import StudentCreate
 from app.services.invoice_service import cancel_invoice, create_invoice
+from app.services.payment_import_service import import_payments
 from app.services.payment_service import create_payment
 from app.services.school_service import create_school
 from app.services.student_service import create_student
@@ -94,3 +97,61 @@ def test_payment_total_cannot_exceed_invoice_amount(db_session):
                 method="transfer",
             ),
         )
+
+
+def test_payments_update_stored_totals_and_status(db_session):
+    invoice = _create_invoice(db_session)
+    assert invoice.total_paid == Decimal("0")
+    assert invoice.balance == Decimal("100.00")
+    assert invoice.status == InvoiceStatus.pending
+
+    create_payment(
+        db_session,
+        PaymentCreate(
+            invoice_id=invoice.id,
+            paid_at="2026-01-05T10:00:00",
+            amount="40.00",
+            method="transfer",
+        ),
+    )
+    db_session.refresh(invoice)
+    assert invoice.total_paid == Decimal("40.00")
+    assert invoice.balance == Decimal("60.00")
+    assert invoice.status == InvoiceStatus.partially_paid
+
+    create_payment(
+        db_session,
+        PaymentCreate(
+            invoice_id=invoice.id,
+            paid_at="2026-01-06T10:00:00",
+            amount="60.00",
+            method="card",
+        ),
+    )
+    db_session.refresh(invoice)
+    assert invoice.total_paid == Decimal("100.00")
+    assert invoice.balance == Decimal("0.00")
+    assert invoice.status == InvoiceStatus.paid
+
+
+def test_import_overpayment_check_spans_chunks(db_session):
+    invoice = _create_invoice(db_session)
+    row = {
+        "invoice_id": str(invoice.id),
+        "paid_at": "2026-01-05T10:00:00",
+        "amount": "40.00",
+        "method": "transfer",
+    }
+    rows = [(line, row) for line in range(2, 6)]
+
+    results = list(import_payments(db_session, rows, chunk_size=1))
+
+    assert [result["status"] for result in results] == [
+        "created",
+        "created",
+        "rejected",
+        "rejected",
+    ]
+    db_session.refresh(invoice)
+    assert invoice.total_paid == Decimal("80.00")
+    assert invoice.status == InvoiceStatus.partially_paid
@@ -0,0 +1,134 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.core.exceptions import ConflictError
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.overdue import OverdueEvent, OverdueEventKind, OverdueInvoice
+from app.models.school import School
+from app.models.student import Student
+from app.services.overdue_service import (
+    SCAN_LOCK_NAME,
+    get_school_overdue_summary,
+    list_overdue_invoices,
+    scan_overdue_invoices,
+)
+from app.utils.pagination import TotalMode
+
+AS_OF = date(2026, 3, 1)
+
+
+def _seed(db_session):
+    school = School(name="Overdue School")
+    db_session.add(school)
+    db_session.flush()
+    student = Student(school_id=school.id, first_name="Ana", last_name="Lopez")
+    db_session.add(student)
+    db_session.flush()
+
+    def invoice(due, status=InvoiceStatus.pending, amount="100.00"):
+        inv = Invoice(
+            school_id=school.id,
+            student_id=student.id,
+            issue_date=date(2025, 1, 1),
+            due_date=due,
+            amount=Decimal(amount),
+            status=status,
+        )
+        db_session.add(inv)
+        db_session.flush()
+        return inv.id
+
+    invoice_ids = [
+        invoice(date(2026, 2, 20)),
+        invoice(date(2025, 12, 1), InvoiceStatus.partially_paid),
+        invoice(date(2025, 10, 1)),
+        invoice(date(2026, 1, 1), InvoiceStatus.paid),
+        invoice(date(2026, 3, 1)),
+    ]
+    db_session.commit()
+    return school, invoice_ids
+
+
+def _events(db_session):
+    return db_session.execute(
+        select(OverdueEvent.invoice_id, OverdueEvent.kind).order_by(OverdueEvent.id)
+    ).all()
+
+
+def test_overdue_invoices_listed_oldest_due_first(db_session):
+    school, invoice_ids = _seed(db_session)
+
+    first = list_overdue_invoices(
+        db_session, limit=2, offset=0, school_id=school.id, as_of=AS_OF, total=TotalMode.exact
+    )
+    rest = list_overdue_invoices(
+        db_session, limit=2, offset=0, school_id=school.id, as_of=AS_OF, cursor=first["next_cursor"]
+    )
+
+    assert first["total"] == 3
+    assert [inv.id for inv in first["items"] + rest["items"]] == [
+        invoice_ids[2],
+        invoice_ids[1],
+        invoice_ids[0],
+    ]
+    assert rest["next_cursor"] is None
+
+
+def test_school_overdue_summary_buckets_by_days_past_due(db_session):
+    school, _ = _seed(db_session)
+
+    summary = get_school_overdue_summary(db_session, school.id, AS_OF)
+
+    assert summary.invoices == 3
+    assert summary.balance == Decimal("300.00")
+    assert summary.oldest_due_date == date(2025, 10, 1)
+    assert [(bucket.min_days, bucket.invoices) for bucket in summary.buckets] == [
+        (1, 1),
+        (31, 0),
+        (61, 1),
+        (91, 1),
+    ]
+    assert get_school_overdue_summary(db_session, school.id + 1, AS_OF) is None
+
+
+def test_scan_records_state_changes_once(db_session):
+    _, invoice_ids = _seed(db_session)
+
+    result = scan_overdue_invoices(db_session, as_of=AS_OF, chunk_size=2)
+
+    assert (result["flagged"], result["cleared"]) == (3, 0)
+    assert set(db_session.scalars(select(OverdueInvoice.invoice_id))) == set(invoice_ids[:3])
+
+    # Rerunning (e.g. after an interrupted scan) records nothing new
+    again = scan_overdue_invoices(db_session, as_of=AS_OF, chunk_size=2)
+    assert (again["flagged"], again["cleared"]) == (0, 0)
+
+    # Paying one off clears it; the invoice due on AS_OF becomes overdue the next day
+    paid = db_session.get(Invoice, invoice_ids[1])
+    paid.apply_payment(paid.balance)
+    db_session.commit()
+    next_day = scan_overdue_invoices(db_session, as_of=date(2026, 3, 2), chunk_size=2)
+
+    assert (next_day["flagged"], next_day["cleared"]) == (1, 1)
+    events = _events(db_session)
+    assert sorted(events[:3]) == sorted(
+        (invoice_id, OverdueEventKind.overdue) for invoice_id in invoice_ids[:3]
+    )
+    assert events[3:] == [
+        (invoice_ids[1], OverdueEventKind.cleared),
+        (invoice_ids[4], OverdueEventKind.overdue),
+    ]
+    cleared = db_session.scalar(
+        select(OverdueEvent.balance).where(OverdueEvent.kind == OverdueEventKind.cleared)
+    )
+    assert cleared == Decimal("0.00")
+
+
+def test_scan_refuses_to_run_twice_at_once(db_session, redis_client):
+    redis_client.set(SCAN_LOCK_NAME, "other-scan")
+
+    with pytest.raises(ConflictError):
+        scan_overdue_invoices(db_session, as_of=AS_OF)
@@ -0,0 +1,105 @@
+"""Concurrency stress test for the payment write path.
+
+Runs against a SQLite file by default; set STRESS_DATABASE_URL to a
+(disposable) Postgres database to exercise real row-level locking.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.core.exceptions import BusinessRuleError
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+from app.models.school import School
+from app.models.student import Student
+from app.schemas.payment import PaymentCreate
+from app.services.payment_service import create_payment
+
+INVOICES = 4
+ATTEMPTS_PER_INVOICE = 40
+INVOICE_AMOUNT = Decimal("100.00")
+PAYMENT_AMOUNT = Decimal("7.00")
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    url = os.getenv("STRESS_DATABASE_URL") or f"sqlite+pysqlite:///{tmp_path / 'stress.db'}"
+    # SQLite serializes writers; give waiting threads time instead of failing
+    connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, pool_size=20, connect_args=connect_args)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _seed(session_factory) -> list[int]:
+    with session_factory() as db:
+        school = School(name="Stress School")
+        db.add(school)
+        db.flush()
+        student = Student(school_id=school.id, first_name="Leo", last_name="Diaz")
+        db.add(student)
+        db.flush()
+        invoices = [
+            Invoice(
+                school_id=school.id,
+                student_id=student.id,
+                issue_date=date(2026, 1, 1),
+                due_date=date(2026, 1, 10),
+                amount=INVOICE_AMOUNT,
+            )
+            for _ in range(INVOICES)
+        ]
+        db.add_all(invoices)
+        db.commit()
+        return [invoice.id for invoice in invoices]
+
+
+def test_concurrent_payments_never_overpay(session_factory) -> None:
+    invoice_ids = _seed(session_factory)
+    start = threading.Barrier(16)
+
+    def pay(invoice_id: int) -> bool:
+        try:
+            start.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        with session_factory() as db:
+            try:
+                create_payment(
+                    db,
+                    PaymentCreate(
+                        invoice_id=invoice_id,
+                        paid_at=datetime(2026, 1, 5, 10, 0, 0),
+                        amount=PAYMENT_AMOUNT,
+                        method="card",
+                    ),
+                )
+                return True
+            except BusinessRuleError:
+                return False
+
+    attempts = [invoice_id for invoice_id in invoice_ids for _ in range(ATTEMPTS_PER_INVOICE)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(pay, attempts))
+
+    max_payments = int(INVOICE_AMOUNT // PAYMENT_AMOUNT)
+    assert sum(results) == max_payments * INVOICES
+    with session_factory() as db:
+        for invoice_id in invoice_ids:
+            invoice = db.get(Invoice, invoice_id)
+            paid = db.scalar(
+                select(func.coalesce(func.sum(Payment.amount), 0)).where(
+                    Payment.invoice_id == invoice_id
+                )
+            )
+            assert Decimal(paid) == invoice.total_paid == PAYMENT_AMOUNT * max_payments
+            assert invoice.balance == INVOICE_AMOUNT - invoice.total_paid
+            assert invoice.status == InvoiceStatus.partially_paid
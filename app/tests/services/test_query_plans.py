@@ -0,0 +1,131 @@
+"""Check that the hot service queries are planned on the intended indexes.
+
+SQLite's planner has no table statistics, so its choice follows the
+available indexes and the query shape alone; a query that stops
+matching its index (e.g. a filter the index predicate no longer
+implies) fails here.
+"""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.invoice import InvoiceStatus
+from app.models.school import School
+from app.services.invoice_service import list_invoices
+from app.services.overdue_service import get_school_overdue_summary, list_overdue_invoices
+from app.services.payment_service import list_payments
+from app.services.statement_service import get_school_statement
+from app.utils.pagination import TotalMode
+
+
+@contextmanager
+def query_plans(db: Session) -> Iterator[list[str]]:
+    """Collect the EXPLAIN QUERY PLAN of every statement run on db."""
+    plans: list[str] = []
+    engine = db.get_bind()
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.extend(row[3] for row in cursor.fetchall())
+
+    event.listen(engine, "before_cursor_execute", explain)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", explain)
+
+
+def test_invoices_by_school_and_status_page_on_covering_index(db_session: Session) -> None:
+    with query_plans(db_session) as plans:
+        list_invoices(
+            db_session,
+            limit=10,
+            offset=0,
+            school_id=1,
+            status=InvoiceStatus.pending,
+            total=TotalMode.none,
+        )
+
+    assert any("USING INDEX ix_invoices_school_status_id" in step for step in plans)
+    assert not any("TEMP B-TREE" in step for step in plans)
+
+
+def test_invoices_by_school_page_on_keyset_index(db_session: Session) -> None:
+    with query_plans(db_session) as plans:
+        list_invoices(db_session, limit=10, offset=0, school_id=1, total=TotalMode.none)
+
+    assert any("USING INDEX ix_invoices_school_id_id" in step for step in plans)
+    assert not any("TEMP B-TREE" in step for step in plans)
+
+
+def test_payments_by_school_join_through_indexes(db_session: Session) -> None:
+    with query_plans(db_session) as plans:
+        list_payments(db_session, limit=10, offset=0, school_id=1, total=TotalMode.none)
+
+    # Any (school_id, ...) index covers the invoice ids; SQLite picks
+    # between equally costed ones by creation order, which is not fixed
+    assert any(
+        step.startswith("SEARCH invoices USING COVERING INDEX ix_invoices_school_id_")
+        for step in plans
+    )
+    assert any("payments USING INDEX ix_payments_invoice_id" in step for step in plans)
+    assert not any(step.startswith("SCAN") for step in plans)
+
+
+def test_invoices_by_school_and_min_balance_use_balance_index(db_session: Session) -> None:
+    with query_plans(db_session) as plans:
+        list_invoices(
+            db_session,
+            limit=10,
+            offset=0,
+            school_id=1,
+            min_balance=Decimal("100"),
+            total=TotalMode.none,
+        )
+
+    assert any("USING INDEX ix_invoices_school_id_balance" in step for step in plans)
+
+
+def test_statement_sums_payments_through_invoice_index(db_session: Session) -> None:
+    school = School(name="Plan School")
+    db_session.add(school)
+    db_session.flush()
+
+    with query_plans(db_session) as plans:
+        get_school_statement(db_session, school.id)
+
+    assert any("payments USING INDEX ix_payments_invoice_id_amount" in step for step in plans)
+    # The window totals scan the materialized statement rows, never a table
+    scanned = {step.split()[1] for step in plans if step.startswith("SCAN")}
+    assert not scanned & {"invoices", "payments", "students", "schools", "opening_balances"}
+
+
+def test_overdue_invoices_page_on_partial_index(db_session: Session) -> None:
+    with query_plans(db_session) as plans:
+        list_overdue_invoices(
+            db_session,
+            limit=10,
+            offset=0,
+            school_id=1,
+            as_of=date(2026, 1, 1),
+            total=TotalMode.none,
+        )
+
+    assert any("USING INDEX ix_invoices_open_due_date" in step for step in plans)
+    assert not any("TEMP B-TREE" in step for step in plans)
+
+
+def test_overdue_summary_reads_partial_index(db_session: Session) -> None:
+    school = School(name="Plan School")
+    db_session.add(school)
+    db_session.flush()
+
+    with query_plans(db_session) as plans:
+        get_school_overdue_summary(db_session, school.id, date(2026, 1, 1))
+
+    assert any("USING INDEX ix_invoices_open_due_date" in step for step in plans)
+    assert not any(step.startswith("SCAN invoices") for step in plans)
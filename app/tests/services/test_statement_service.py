@@ -0,0 +1,87 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+from app.models.school import School
+from app.models.student import Student
+from app.services.statement_service import get_school_statement, get_student_statement
+
+
+def _seed(db_session):
+    school = School(name="Statement School")
+    db_session.add(school)
+    db_session.flush()
+    ana = Student(school_id=school.id, first_name="Ana", last_name="Lopez")
+    luis = Student(school_id=school.id, first_name="Luis", last_name="Perez")
+    db_session.add_all([ana, luis])
+    db_session.flush()
+
+    def invoice(student, amount, status=InvoiceStatus.pending):
+        inv = Invoice(
+            school_id=school.id,
+            student_id=student.id,
+            issue_date=date(2026, 1, 1),
+            due_date=date(2026, 1, 10),
+            amount=Decimal(amount),
+            status=status,
+        )
+        db_session.add(inv)
+        db_session.flush()
+        return inv
+
+    def pay(inv, amount):
+        db_session.add(
+            Payment(
+                invoice_id=inv.id,
+                paid_at=datetime(2026, 1, 5, 10, 0, 0),
+                amount=Decimal(amount),
+                method="transfer",
+            )
+        )
+
+    unpaid = invoice(ana, "100.00")
+    partial = invoice(ana, "200.00")
+    pay(partial, "50.00")
+    pay(partial, "25.00")
+    paid = invoice(luis, "300.00")
+    pay(paid, "300.00")
+    cancelled = invoice(luis, "400.00", status=InvoiceStatus.cancelled)
+    pay(cancelled, "10.00")
+    db_session.commit()
+    return school, ana, luis, [unpaid, partial, paid, cancelled]
+
+
+def test_school_statement_matches_calculate_balance(db_session):
+    school, _, _, invoices = _seed(db_session)
+
+    statement = get_school_statement(db_session, school.id)
+
+    assert statement.students_count == 2
+    assert statement.total_invoiced == Decimal("600.00")
+    assert statement.total_paid == Decimal("375.00")
+    assert statement.total_pending == Decimal("225.00")
+    assert [item.invoice_id for item in statement.invoices] == [inv.id for inv in invoices]
+    for item, inv in zip(statement.invoices, invoices):
+        db_session.refresh(inv)
+        expected = inv.calculate_balance()
+        assert item.total_paid == expected.total_paid
+        assert item.balance == expected.balance
+        assert item.status == expected.status
+
+
+def test_student_statement_only_includes_student_invoices(db_session):
+    school, ana, _, _ = _seed(db_session)
+
+    statement = get_student_statement(db_session, ana.id)
+
+    assert statement.school_name == school.name
+    assert statement.student_name == "Ana Lopez"
+    assert [item.status for item in statement.invoices] == ["pending", "partially_paid"]
+    assert statement.total_invoiced == Decimal("300.00")
+    assert statement.total_paid == Decimal("75.00")
+
+
+def test_statement_for_missing_entity_returns_none(db_session):
+    assert get_school_statement(db_session, 999) is None
+    assert get_student_statement(db_session, 999) is None
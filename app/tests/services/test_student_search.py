@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationError
+from app.models.school import School
+from app.models.student import Student
+from app.services.student_service import _search_students_query, search_students
+
+
+def _seed(db_session):
+    school, other = School(name="Search School"), School(name="Other School")
+    db_session.add_all([school, other])
+    db_session.flush()
+    students = [
+        Student(school_id=school.id, first_name="Mariana", last_name="Lopez"),
+        Student(school_id=school.id, first_name="Ana", last_name="Lopez"),
+        Student(school_id=school.id, first_name="Luis", last_name="Perez"),
+        Student(school_id=other.id, first_name="Ana", last_name="Lopez"),
+    ]
+    db_session.add_all(students)
+    db_session.commit()
+    return school, [student.id for student in students]
+
+
+def test_search_is_scoped_and_ranks_leading_matches_first(db_session):
+    school, ids = _seed(db_session)
+
+    found = search_students(db_session, "ana  LOP", school_id=school.id)
+
+    assert [student.id for student in found] == [ids[1], ids[0]]
+    assert len(search_students(db_session, "ana lop")) == 3
+    assert search_students(db_session, "an%", school_id=school.id) == []
+
+
+def test_blank_search_is_rejected(db_session):
+    with pytest.raises(ValidationError):
+        search_students(db_session, "   ")
+
+
+def test_postgres_search_matches_trigram_index_expression():
+    sql = str(
+        _search_students_query("postgresql", "ana", 1, 20).compile(dialect=postgresql.dialect())
+    )
+
+    # Same expression as ix_students_school_full_name_trgm, with an operator it serves
+    assert "students.first_name || ' ' || students.last_name %%> " in sql
+    assert "ORDER BY word_similarity(" in sql
@@ -0,0 +1,78 @@
+"""Multi-get of rows by id or external id in one round trip.
+
+Integrations resolve many keys at a time; instead of one `db.get` per
+key, `get_batch_async` fetches all of them with a single `IN` query on an
+indexed key column and returns the rows in the order the keys were
+requested, along with the keys nothing matched.
+"""
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+
+
+def parse_keys(raw: str | None, cast: type = str) -> list | None:
+    """Parse a comma-separated query parameter into distinct keys, in order.
+
+    Returns None when the parameter is absent.
+    """
+    if raw is None:
+        return None
+    keys: dict[Any, None] = {}
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            keys[cast(part)] = None
+        except ValueError as exc:
+            raise ValidationError(f"Invalid key: {part}") from exc
+    if not keys:
+        raise ValidationError("At least one key is required")
+    if len(keys) > settings.batch_lookup_max_keys:
+        raise ValidationError(
+            f"At most {settings.batch_lookup_max_keys} keys can be looked up at once"
+        )
+    return list(keys)
+
+
+def batch_key(
+    model, ids: Sequence[int] | None, external_ids: Sequence[str] | None = None
+) -> tuple[Any, Sequence]:
+    """The key column of `model` to look up and the keys, from exactly one of the key lists."""
+    if (ids is None) == (external_ids is None):
+        raise ValidationError("Pass either ids or external_ids")
+    if ids is not None:
+        return model.id, ids
+    return model.external_id, external_ids
+
+
+def _batch_query(column, keys: Sequence, filters: Sequence) -> Select:
+    entity = column.class_
+    return select(entity).where(column.in_(keys), *filters).order_by(entity.id)
+
+
+def _batch(rows: Sequence, column, keys: Sequence) -> dict:
+    by_key: dict[Any, list] = {}
+    for row in rows:
+        by_key.setdefault(getattr(row, column.key), []).append(row)
+    return {
+        # Keys matching several rows (e.g. an external_id used by two
+        # schools) list all of them, by id
+        "items": [row for key in keys for row in by_key.get(key, [])],
+        "missing": [key for key in keys if key not in by_key],
+    }
+
+
+async def get_batch_async(db: AsyncSession, column, keys: Sequence, *filters) -> dict:
+    """Fetch the rows whose `column` is in keys.
+
+    Returns a dict with `items` (in the order of keys) and `missing`
+    (the keys no row matched).
+    """
+    rows = (await db.scalars(_batch_query(column, keys, filters))).all()
+    return _batch(rows, column, keys)
@@ -0,0 +1,65 @@
+"""Sparse fieldsets: `?fields=id,amount,status` on read endpoints.
+
+A fieldset narrows both ends of a read: the ORM only loads the named
+columns (`load_only`, always with the primary key), and the response is
+serialized with a schema holding just those fields of the full read
+schema (`partial_schema`), so unrequested columns are neither read,
+turned into Python objects, nor sent.
+"""
+from collections.abc import Sequence
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import Select
+from sqlalchemy.orm import load_only
+
+from app.core.exceptions import ValidationError
+
+
+def parse_fields(raw: str | None, schema: type[BaseModel]) -> list[str] | None:
+    """Parse a comma-separated fieldset against `schema`'s fields.
+
+    Returns None when the parameter is absent, otherwise the fields in
+    the schema's order; `id` is always included.
+    """
+    if raw is None:
+        return None
+    requested = {part.strip() for part in raw.split(",") if part.strip()}
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return [name for name in schema.model_fields if name in requested]
+
+
+@lru_cache(maxsize=256)
+def _partial_schema(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields", __config__=ConfigDict(from_attributes=True), **definitions
+    )
+
+
+def partial_schema(schema: type[BaseModel], fields: Sequence[str] | None) -> type[BaseModel]:
+    """`schema` reduced to `fields` (as returned by `parse_fields`); all of it when None."""
+    if fields is None:
+        return schema
+    return _partial_schema(schema, tuple(fields))
+
+
+def load_fields(query: Select, fields: Sequence[str] | None) -> Select:
+    """Only load `fields` of the query's entity (all columns when None)."""
+    if fields is None:
+        return query
+    entity = query.column_descriptions[0]["entity"]
+    return query.options(load_only(*(getattr(entity, name) for name in fields)))
+
+
+def load_fields_options(model, fields: Sequence[str] | None) -> list:
+    """`Session.get` options loading only `fields` of `model`."""
+    if fields is None:
+        return []
+    return [load_only(*(getattr(model, name) for name in fields))]
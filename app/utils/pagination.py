@@ -1,24 +1,266 @@
-"""Database query pagination utilities."""
-from sqlalchemy import func, select
+"""Database query pagination utilities.
+
+Two modes share one response shape:
+
+- Offset mode (`offset`): simple, but the database still walks every
+  skipped row, so deep pages get slower linearly.
+- Cursor (keyset) mode (`cursor`): the opaque token encodes the last
+  `(sort_key, id)` of the previous page and the next page starts right
+  after it with an indexed range scan, so every page costs the same.
+
+Both modes order by `(sort_key, id)` for a stable order and return a
+`next_cursor` when more rows follow, so a client can start with offset 0
+and continue with cursors.
+
+The `total` can be exact (cached in Redis per filter combination when
+the caller names the cache scopes the query depends on), a planner
+estimate (Postgres only; other databases fall back to an exact count),
+or skipped entirely.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.async_cache import cache_get_async, cache_set_async, get_cache_versions_async
+from app.core.cache import cache_get, cache_set, get_cache_versions
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, SessionLocal, is_replica_session
+from app.core.exceptions import ValidationError
 
-def paginate(query, db: Session, limit: int, offset: int) -> dict:
-    """Apply offset-based pagination to a SQLAlchemy query.
-    
-    Returns a dict with:
-    - items: The paginated results
-    - total: Total count of all matching records
-    - limit/offset: The pagination parameters used
-    
-    Note: For large datasets, consider cursor-based pagination
-    to avoid performance issues with high offset values.
+
+class TotalMode(str, Enum):
+    """How the `total` of a paginated response is computed."""
+
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+def encode_cursor(sort_key: str, sort_value: Any, last_id: int) -> str:
+    payload = json.dumps({"k": sort_key, "v": sort_value, "id": last_id}, default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> tuple[Any, int]:
+    """Decode a cursor produced for `sort_column` into (sort_value, id)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != sort_column.key:
+            raise ValueError("cursor was issued for another ordering")
+        return _coerce(payload["v"], sort_column), int(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error) as exc:
+        raise ValidationError("Invalid pagination cursor") from exc
+
+
+def _coerce(value: Any, column) -> Any:
+    """Convert a JSON-decoded sort value back to the column's Python type."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def _render(query: Select, db: Session | AsyncSession) -> str:
+    return str(
+        query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    )
+
+
+def _count_query(query: Select) -> Select:
+    return select(func.count()).select_from(query.subquery())
+
+
+def _count_cache_key(query: Select, db: Session | AsyncSession, scopes, versions) -> str:
+    digest = hashlib.sha1(_render(query, db).encode()).hexdigest()
+    tags = ",".join(f"{scope}@{version}" for scope, version in zip(scopes, versions))
+    return f"cache:count:{digest}:{tags}"
+
+
+def _explain_query(query: Select, db: Session | AsyncSession):
+    return text("EXPLAIN (FORMAT JSON) " + _render(query, db))
+
+
+def _primary_count(query: Select, db: Session) -> int:
+    """Count on the primary: a replica might not see the write that bumped the versions."""
+    if not is_replica_session(db):
+        return db.scalar(_count_query(query)) or 0
+    with SessionLocal() as primary:
+        return primary.scalar(_count_query(query)) or 0
+
+
+async def _primary_count_async(query: Select, db: AsyncSession) -> int:
+    if not is_replica_session(db):
+        return await db.scalar(_count_query(query)) or 0
+    async with AsyncSessionLocal() as primary:
+        return await primary.scalar(_count_query(query)) or 0
+
+
+def exact_count(query: Select, db: Session, scopes: Sequence[str] | None = None) -> int:
+    """Count the rows of query, cached per filter combination.
+
+    With `scopes`, the count is cached under a key derived from the
+    rendered SQL and tagged with the scopes' versions, so any write that
+    bumps one of them invalidates it. Counts to be cached are computed
+    on the primary, so a lagging replica cannot store a stale count
+    under the new versions.
     """
-    total = db.scalar(select(func.count()).select_from(query.subquery())) or 0
-    items = db.scalars(query.offset(offset).limit(limit)).all()
+    if scopes is None:
+        return db.scalar(_count_query(query)) or 0
+
+    key = _count_cache_key(query, db, scopes, get_cache_versions(*scopes))
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
+    count = _primary_count(query, db)
+    cache_set(key, str(count), ttl=settings.count_cache_ttl)
+    return count
+
+
+async def exact_count_async(
+    query: Select, db: AsyncSession, scopes: Sequence[str] | None = None
+) -> int:
+    if scopes is None:
+        return await db.scalar(_count_query(query)) or 0
+
+    key = _count_cache_key(query, db, scopes, await get_cache_versions_async(*scopes))
+    cached = await cache_get_async(key)
+    if cached is not None:
+        return cached
+    count = await _primary_count_async(query, db)
+    await cache_set_async(key, str(count), ttl=settings.count_cache_ttl)
+    return count
+
+
+def estimate_count(query: Select, db: Session) -> int:
+    """Return the planner's row estimate for query.
+
+    Only Postgres exposes one; other databases get an exact count.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return exact_count(query, db)
+    plan = db.execute(_explain_query(query, db)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def estimate_count_async(query: Select, db: AsyncSession) -> int:
+    if db.get_bind().dialect.name != "postgresql":
+        return await exact_count_async(query, db)
+    plan = (await db.execute(_explain_query(query, db))).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _page_query(query: Select, offset: int, cursor: str | None, sort_column) -> tuple[Select, Any]:
+    """Order query by `(sort_column, id)` and position it at offset or cursor.
+
+    Returns the page query (without LIMIT) and the resolved sort column.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    id_column = entity.id
+    sort_column = sort_column if sort_column is not None else id_column
+    sort_by_id = sort_column is id_column
+
+    page_query = query.order_by(*([id_column] if sort_by_id else [sort_column, id_column]))
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_column)
+        if sort_by_id:
+            page_query = page_query.where(id_column > last_id)
+        else:
+            page_query = page_query.where(
+                tuple_(sort_column, id_column) > tuple_(sort_value, last_id)
+            )
+    else:
+        page_query = page_query.offset(offset)
+    return page_query, sort_column
+
+
+def _page(
+    rows: Sequence, limit: int, offset: int, cursor: str | None, sort_column, count: int | None
+) -> dict:
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_column.key, getattr(last, sort_column.key), last.id)
+
     return {
         "items": items,
-        "total": total,
+        "total": count,
         "limit": limit,
-        "offset": offset,
+        "offset": 0 if cursor else offset,
+        "next_cursor": next_cursor,
     }
+
+
+def paginate(
+    query: Select,
+    db: Session,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+    sort_column=None,
+    count_scopes: Sequence[str] | None = None,
+) -> dict:
+    """Paginate a single-entity SQLAlchemy query.
+
+    Returns a dict with:
+    - items: The paginated results
+    - total: Count of all matching records: exact, estimated, or None
+      with TotalMode.none
+    - limit/offset: The pagination parameters used
+    - next_cursor: Token for the page after this one, or None on the last page
+
+    `sort_column` defaults to the entity's primary key `id`; the `id` is
+    always appended as a tie-breaker. Keyset pages need an index on the
+    filter columns followed by `(sort_column, id)` to stay cheap.
+    `count_scopes` enables caching of exact totals (see `exact_count`).
+    """
+    count = None
+    if total == TotalMode.exact:
+        count = exact_count(query, db, count_scopes)
+    elif total == TotalMode.estimate:
+        count = estimate_count(query, db)
+
+    page_query, sort_column = _page_query(query, offset, cursor, sort_column)
+    # Fetch one extra row to learn whether another page follows
+    rows = db.scalars(page_query.limit(limit + 1)).all()
+    return _page(rows, limit, offset, cursor, sort_column, count)
+
+
+async def paginate_async(
+    query: Select,
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    cursor: str | None = None,
+    total: TotalMode = TotalMode.exact,
+    sort_column=None,
+    count_scopes: Sequence[str] | None = None,
+) -> dict:
+    """Async `paginate` on an `AsyncSession`; same arguments and result."""
+    count = None
+    if total == TotalMode.exact:
+        count = await exact_count_async(query, db, count_scopes)
+    elif total == TotalMode.estimate:
+        count = await estimate_count_async(query, db)
+
+    page_query, sort_column = _page_query(query, offset, cursor, sort_column)
+    rows = (await db.scalars(page_query.limit(limit + 1))).all()
+    return _page(rows, limit, offset, cursor, sort_column, count)
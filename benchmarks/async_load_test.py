@@ -0,0 +1,127 @@
+"""Load-test the sync and async read stacks against the same database.
+
+The sync stack runs the services on a thread pool the size of AnyIO's
+default worker limit (what sync `def` endpoints get); the async stack
+runs the `_async` services on one event loop with only the connection
+pool bounding concurrency. Each simulated request reads a school
+statement and one page of invoices.
+
+Redis is left out (`total=none`, no response cache) so the comparison
+measures the database stacks only.
+
+Usage:
+    python -m benchmarks.async_load_test [--requests N] [--pool-size N]
+
+Runs against a temporary SQLite file by default; pass --database-url
+(sync driver URL) to load-test Postgres (the database must be empty and
+migrated). The async URL is derived from it.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.db import Base, to_async_url
+from app.services.invoice_service import list_invoices, list_invoices_async
+from app.services.statement_service import get_school_statement, get_school_statement_async
+from app.utils.pagination import TotalMode
+from benchmarks.statement_benchmark import seed
+
+# AnyIO's default thread limiter, shared by every sync endpoint
+WORKER_THREADS = 40
+
+
+def sync_request(session_factory: sessionmaker, school_id: int) -> float:
+    start = time.perf_counter()
+    with session_factory() as db:
+        get_school_statement(db, school_id)
+        list_invoices(db, limit=50, offset=0, school_id=school_id, total=TotalMode.none)
+    return (time.perf_counter() - start) * 1000
+
+
+async def async_request(session_factory: async_sessionmaker, school_id: int) -> float:
+    start = time.perf_counter()
+    async with session_factory() as db:
+        await get_school_statement_async(db, school_id)
+        await list_invoices_async(
+            db, limit=50, offset=0, school_id=school_id, total=TotalMode.none
+        )
+    return (time.perf_counter() - start) * 1000
+
+
+def run_sync(database_url: str, school_id: int, requests: int, pool_size: int) -> tuple:
+    engine = create_engine(
+        database_url, poolclass=QueuePool, pool_size=pool_size, max_overflow=0
+    )
+    session_factory = sessionmaker(bind=engine)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKER_THREADS) as executor:
+        latencies = list(
+            executor.map(lambda _: sync_request(session_factory, school_id), range(requests))
+        )
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return latencies, elapsed
+
+
+async def run_async(database_url: str, school_id: int, requests: int, pool_size: int) -> tuple:
+    engine = create_async_engine(
+        to_async_url(database_url),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    start = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(async_request(session_factory, school_id) for _ in range(requests))
+    )
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return latencies, elapsed
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:>5}: requests={len(latencies)} rps={len(latencies) / elapsed:.1f} "
+        f"p50_ms={statistics.median(ordered):.1f} p95_ms={p95:.1f} max_ms={ordered[-1]:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--invoices", type=int, default=2_000)
+    parser.add_argument("--students", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite+pysqlite:///{Path(tmp) / 'load.db'}"
+        engine = create_engine(database_url)
+        if database_url.startswith("sqlite"):
+            Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            school_id = seed(db, args.invoices, 3, args.students)
+        engine.dispose()
+
+        report("sync", *run_sync(database_url, school_id, args.requests, args.pool_size))
+        report(
+            "async",
+            *asyncio.run(run_async(database_url, school_id, args.requests, args.pool_size)),
+        )
+
+
+if __name__ == "__main__":
+    main()
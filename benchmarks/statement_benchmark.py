@@ -0,0 +1,176 @@
+"""Compare the SQL-aggregated statement engine against the ORM path.
+
+The ORM path is the previous implementation: it loads every invoice with
+its payments and student through `selectinload` and calls
+`Invoice.calculate_balance()` per row in Python.
+
+Usage:
+    python -m benchmarks.statement_benchmark [--invoices N] [--payments N] [--repeat N]
+
+Runs against an in-memory SQLite database by default; pass --database-url
+to benchmark against Postgres (the database must be empty and migrated).
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.core.db import Base
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.payment import Payment
+from app.models.school import School
+from app.models.student import Student
+from app.schemas.statement import SchoolStatement, StatementInvoiceItem
+from app.services.statement_service import get_school_statement
+
+
+def orm_school_statement(db: Session, school_id: int) -> SchoolStatement | None:
+    school = db.get(School, school_id)
+    if not school:
+        return None
+
+    invoices = db.scalars(
+        select(Invoice)
+        .where(Invoice.school_id == school_id)
+        .options(selectinload(Invoice.payments), selectinload(Invoice.student))
+    ).all()
+    students_count = db.scalar(
+        select(func.count()).select_from(Student).where(Student.school_id == school_id)
+    ) or 0
+
+    total_invoiced = Decimal("0")
+    total_paid = Decimal("0")
+    items: list[StatementInvoiceItem] = []
+    for invoice in invoices:
+        balance_info = invoice.calculate_balance()
+        if balance_info.status != InvoiceStatus.cancelled.value:
+            total_invoiced += invoice.amount
+            total_paid += balance_info.total_paid
+        items.append(
+            StatementInvoiceItem(
+                invoice_id=invoice.id,
+                student_id=invoice.student_id,
+                student_name=f"{invoice.student.first_name} {invoice.student.last_name}",
+                amount=invoice.amount,
+                total_paid=balance_info.total_paid,
+                balance=balance_info.balance,
+                status=balance_info.status,
+                due_date=invoice.due_date,
+            )
+        )
+
+    return SchoolStatement(
+        school_id=school.id,
+        school_name=school.name,
+        students_count=students_count,
+        total_invoiced=total_invoiced,
+        total_paid=total_paid,
+        total_pending=total_invoiced - total_paid,
+        invoices=items,
+    )
+
+
+def seed(db: Session, invoices: int, payments_per_invoice: int, students: int) -> int:
+    rng = random.Random(42)
+    school = School(name="Benchmark School")
+    db.add(school)
+    db.flush()
+
+    db.execute(
+        insert(Student),
+        [
+            {"school_id": school.id, "first_name": f"First{i}", "last_name": f"Last{i}"}
+            for i in range(students)
+        ],
+    )
+    student_ids = db.scalars(select(Student.id).where(Student.school_id == school.id)).all()
+
+    issue = date(2026, 1, 1)
+    db.execute(
+        insert(Invoice),
+        [
+            {
+                "school_id": school.id,
+                "student_id": student_ids[i % len(student_ids)],
+                "issue_date": issue,
+                "due_date": issue + timedelta(days=10),
+                "amount": Decimal("1000.00"),
+                "currency": "MXN",
+                "status": InvoiceStatus.cancelled if i % 50 == 0 else InvoiceStatus.pending,
+            }
+            for i in range(invoices)
+        ],
+    )
+    invoice_ids = db.scalars(select(Invoice.id).where(Invoice.school_id == school.id)).all()
+
+    paid_at = datetime(2026, 1, 5, 10, 0, 0)
+    db.execute(
+        insert(Payment),
+        [
+            {
+                "invoice_id": invoice_id,
+                "paid_at": paid_at,
+                "amount": Decimal(rng.choice(["50.00", "100.00", "150.00"])),
+                "method": "transfer",
+            }
+            for invoice_id in invoice_ids
+            for _ in range(rng.randint(0, payments_per_invoice))
+        ],
+    )
+    db.commit()
+    return school.id
+
+
+def measure(fn, db: Session, school_id: int, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db, school_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite+pysqlite:///:memory:")
+    parser.add_argument("--invoices", type=int, default=20_000)
+    parser.add_argument("--payments", type=int, default=3, help="max payments per invoice")
+    parser.add_argument("--students", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.database_url.startswith("sqlite"):
+        engine = create_engine(
+            args.database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(engine)
+    else:
+        engine = create_engine(args.database_url)
+
+    with Session(engine) as db:
+        school_id = seed(db, args.invoices, args.payments, args.students)
+
+        orm_result = orm_school_statement(db, school_id)
+        sql_result = get_school_statement(db, school_id)
+        assert orm_result == sql_result, "statement engines disagree"
+
+        for name, fn in (("orm", orm_school_statement), ("sql", get_school_statement)):
+            timings = measure(fn, db, school_id, args.repeat)
+            print(
+                f"{name:>4}: invoices={args.invoices} "
+                f"median_ms={statistics.median(timings):.1f} "
+                f"min_ms={min(timings):.1f} max_ms={max(timings):.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
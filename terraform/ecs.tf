@@ -146,6 +146,10 @@ resource "aws_ecs_task_definition" "backend" {
         {
           name  = "ENVIRONMENT"
           value = var.environment
+        },
+        {
+          name  = "PARTITION_MAINTENANCE_INTERVAL"
+          value = "86400"
         }
       ]
 
@@ -0,0 +1,72 @@
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def create_school(client: TestClient, name: str = "Billing School") -> int:
+    response = client.post("/api/v1/schools", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def create_student(client: TestClient, school_id: int, status: str = "active") -> int:
+    response = client.post(
+        "/api/v1/students",
+        json={"school_id": school_id, "first_name": "Eva", "last_name": "Ruiz", "status": status},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_billing_run_is_chunked_and_idempotent(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "billing_run_chunk_size", 2)
+    school_id = create_school(client)
+    other_school_id = create_school(client, "Other School")
+    active = [create_student(client, school_id) for _ in range(3)]
+    create_student(client, school_id, status="inactive")
+    create_student(client, other_school_id)
+    run = {"period": "2026-03", "amount": "1500.00", "school_id": school_id}
+
+    first = client.post("/api/v1/billing-runs", json=run)
+
+    assert first.status_code == 200
+    assert first.json() == {
+        "period": "2026-03",
+        "school_id": school_id,
+        "created": 3,
+        "skipped": 0,
+        "chunks": 2,
+    }
+    invoices = client.get(f"/api/v1/invoices?school_id={school_id}").json()["items"]
+    assert sorted(invoice["student_id"] for invoice in invoices) == active
+    assert {
+        (invoice["issue_date"], invoice["due_date"], invoice["balance"], invoice["billing_period"])
+        for invoice in invoices
+    } == {("2026-03-01", "2026-03-10", "1500.00", "2026-03")}
+
+    second = client.post("/api/v1/billing-runs", json=run).json()
+    assert (second["created"], second["skipped"]) == (0, 3)
+
+
+def test_concurrent_billing_run_for_period_is_rejected(
+    client: TestClient, redis_client: fakeredis.FakeRedis
+) -> None:
+    school_id = create_school(client)
+    create_student(client, school_id)
+    redis_client.set("lock:billing-run:2026-04", "other-task")
+
+    response = client.post(
+        "/api/v1/billing-runs", json={"period": "2026-04", "amount": "100.00"}
+    )
+
+    assert response.status_code == 409
+    assert response.json()["error"]["code"] == "CONFLICT"
+
+
+def test_billing_run_rejects_invalid_period(client: TestClient) -> None:
+    response = client.post("/api/v1/billing-runs", json={"period": "2026-13", "amount": "1"})
+    assert response.status_code == 422
@@ -78,3 +78,128 @@ def test_cancel_invoice(client: TestClient) -> None:
     response = client.delete(f"/api/v1/invoices/{invoice['id']}")
     assert response.status_code == 200
     assert response.json()["status"] == "cancelled"
+
+
+def test_list_invoices_filters_on_stored_status_and_balance(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    paid = create_invoice(client, school_id, student_id)
+    open_invoice = create_invoice(client, school_id, student_id)
+    response = client.post(
+        "/api/v1/payments",
+        json={
+            "invoice_id": paid["id"],
+            "paid_at": "2026-01-05T10:00:00",
+            "amount": "1000.00",
+            "method": "transfer",
+        },
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"/api/v1/invoices?school_id={school_id}&status=paid")
+    assert [item["id"] for item in response.json()["items"]] == [paid["id"]]
+    assert response.json()["items"][0]["balance"] == "0.00"
+
+    response = client.get(f"/api/v1/invoices?school_id={school_id}&min_balance=1")
+    assert [item["id"] for item in response.json()["items"]] == [open_invoice["id"]]
+
+
+def test_bulk_create_invoices_reports_row_errors(client: TestClient) -> None:
+    school_id = create_school(client)
+    other_school_id = create_school(client, "Other School")
+    student_id = create_student(client, school_id)
+    row = {
+        "school_id": school_id,
+        "student_id": student_id,
+        "issue_date": "2026-02-01",
+        "due_date": "2026-02-10",
+        "amount": "500.00",
+    }
+    statement = client.get(f"/api/v1/students/{student_id}/statement").json()
+    assert statement["total_invoiced"] == "0"
+
+    response = client.post(
+        "/api/v1/invoices/bulk",
+        json={
+            "invoices": [
+                row,
+                {**row, "student_id": 999_999},
+                {**row, "school_id": other_school_id},
+                {**row, "due_date": "2026-01-01"},
+                {**row, "amount": "250.00"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["index"] for item in payload["created"]] == [0, 4]
+    assert [error["index"] for error in payload["errors"]] == [1, 2, 3]
+    assert "not found" in payload["errors"][0]["message"]
+    created = client.get(f"/api/v1/invoices/{payload['created'][1]['id']}").json()
+    assert created["amount"] == "250.00"
+    assert created["balance"] == "250.00"
+    assert created["status"] == "pending"
+    statement = client.get(f"/api/v1/students/{student_id}/statement").json()
+    assert statement["total_invoiced"] == "750.00"
+
+
+def test_list_overdue_invoices_and_school_summary(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice = create_invoice(client, school_id, student_id)
+
+    not_yet = client.get(f"/api/v1/invoices/overdue?school_id={school_id}&as_of=2026-01-10")
+    assert not_yet.status_code == 200
+    assert not_yet.json()["items"] == []
+
+    overdue = client.get(f"/api/v1/invoices/overdue?school_id={school_id}&as_of=2026-03-01")
+    assert [item["id"] for item in overdue.json()["items"]] == [invoice["id"]]
+
+    summary = client.get(f"/api/v1/schools/{school_id}/overdue-summary?as_of=2026-03-01")
+    assert summary.status_code == 200
+    body = summary.json()
+    assert body["invoices"] == 1
+    assert body["oldest_due_date"] == "2026-01-10"
+    assert [(bucket["min_days"], bucket["invoices"]) for bucket in body["buckets"]] == [
+        (1, 0),
+        (31, 1),
+        (61, 0),
+        (91, 0),
+    ]
+
+    assert client.get("/api/v1/schools/999999/overdue-summary").status_code == 404
+
+
+def test_get_invoices_batch(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice = create_invoice(client, school_id, student_id)
+
+    response = client.get(f"/api/v1/invoices/batch?ids=999999,{invoice['id']}")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [invoice["id"]]
+    assert response.json()["missing"] == [999999]
+
+
+def test_invoice_sparse_fieldsets(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice = create_invoice(client, school_id, student_id)
+
+    page = client.get(f"/api/v1/invoices?school_id={school_id}&fields=amount,status,due_date")
+    assert page.status_code == 200
+    assert page.json()["items"] == [
+        {"id": invoice["id"], "due_date": "2026-01-10", "amount": "1000.00", "status": "pending"}
+    ]
+    assert page.json()["total"] == 1
+
+    archived_too = client.get(
+        f"/api/v1/invoices?school_id={school_id}&include_archived=true&fields=balance"
+    )
+    assert archived_too.json()["items"] == [{"id": invoice["id"], "balance": "1000.00"}]
+
+    detail = client.get(f"/api/v1/invoices/{invoice['id']}?fields=balance")
+    assert detail.json() == {"id": invoice["id"], "balance": "1000.00"}
+
+    assert client.get("/api/v1/invoices?fields=amount,secret").status_code == 400
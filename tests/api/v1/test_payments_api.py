@@ -1,3 +1,6 @@
+import csv
+import io
+
 from fastapi.testclient import TestClient
 
 
@@ -36,12 +39,14 @@ def create_invoice(client: TestClient, school_id: int, student_id: int) -> int:
     return response.json()["id"]
 
 
-def create_payment(client: TestClient, invoice_id: int) -> dict:
+def create_payment(
+    client: TestClient, invoice_id: int, paid_at: str = "2026-01-05T10:00:00"
+) -> dict:
     response = client.post(
         "/api/v1/payments",
         json={
             "invoice_id": invoice_id,
-            "paid_at": "2026-01-05T10:00:00",
+            "paid_at": paid_at,
             "amount": "200.00",
             "method": "transfer",
         },
@@ -75,3 +80,122 @@ def test_get_payment(client: TestClient) -> None:
     payment = create_payment(client, invoice_id)
     response = client.get(f"/api/v1/payments/{payment['id']}")
     assert response.status_code == 200
+
+
+def test_list_payments_total_follows_writes(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice_id = create_invoice(client, school_id, student_id)
+    create_payment(client, invoice_id)
+    url = f"/api/v1/payments?school_id={school_id}"
+    assert client.get(url).json()["total"] == 1
+
+    create_payment(client, invoice_id)
+    assert client.get(url).json()["total"] == 2
+    assert client.get(url + "&total=estimate").json()["total"] == 2
+
+
+def test_list_payments_by_paid_at_window(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice_id = create_invoice(client, school_id, student_id)
+    create_payment(client, invoice_id, paid_at="2026-01-31T23:00:00")
+    february = create_payment(client, invoice_id, paid_at="2026-02-01T00:00:00")
+
+    response = client.get(
+        "/api/v1/payments",
+        params={
+            "school_id": school_id,
+            "paid_from": "2026-02-01T00:00:00",
+            "paid_to": "2026-03-01T00:00:00",
+        },
+    )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [february["id"]]
+
+
+def test_import_payments_csv_reports_each_line(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice_id = create_invoice(client, school_id, student_id)
+    cancelled_id = create_invoice(client, school_id, student_id)
+    client.delete(f"/api/v1/invoices/{cancelled_id}")
+    body = "\n".join(
+        [
+            "invoice_id,paid_at,amount,method,reference",
+            f"{invoice_id},2026-01-05T10:00:00,300.00,transfer,A1",
+            f"{invoice_id},2026-01-06T10:00:00,300.00,transfer,A2",
+            f"{invoice_id},2026-01-06T11:00:00,200.00,card,",
+            f"{cancelled_id},2026-01-06T10:00:00,10.00,card,",
+            "999999,2026-01-06T10:00:00,10.00,card,",
+            f"{invoice_id},not-a-date,10.00,card,",
+        ]
+    )
+
+    response = client.post(
+        "/api/v1/payments/import",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Import-Created"] == "2"
+    assert response.headers["X-Import-Rejected"] == "4"
+    report = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["line"] for row in report] == ["2", "3", "4", "5", "6", "7"]
+    assert [row["status"] for row in report] == [
+        "created",
+        "rejected",
+        "created",
+        "rejected",
+        "rejected",
+        "rejected",
+    ]
+    assert "exceed" in report[1]["message"]
+    assert "cancelled" in report[3]["message"]
+    assert "not found" in report[4]["message"]
+    assert report[5]["message"].startswith("paid_at")
+    invoice = client.get(f"/api/v1/invoices/{invoice_id}").json()
+    assert invoice["total_paid"] == "500.00"
+    assert invoice["status"] == "paid"
+
+
+def test_import_payments_csv_requires_columns(client: TestClient) -> None:
+    response = client.post(
+        "/api/v1/payments/import",
+        content=b"invoice_id,amount\n1,10.00\n",
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 400
+    assert "paid_at" in response.json()["error"]["message"]
+
+
+def test_import_payments_csv_rejects_lines_that_are_not_utf8(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    invoice_id = create_invoice(client, school_id, student_id)
+    body = b"\n".join(
+        [
+            b"invoice_id,paid_at,amount,method,reference",
+            f"{invoice_id},2026-01-05T10:00:00,100.00,transfer,A1".encode(),
+            f"{invoice_id},2026-01-06T10:00:00,100.00,transfer,Cr".encode() + b"\xe9dito",
+            f"{invoice_id},2026-01-07T10:00:00,100.00,card,A3".encode(),
+        ]
+    )
+
+    response = client.post(
+        "/api/v1/payments/import",
+        content=body,
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Import-Created"] == "2"
+    assert response.headers["X-Import-Rejected"] == "1"
+    report = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["status"] for row in report] == ["created", "rejected", "created"]
+    assert report[1]["message"] == "Line is not valid UTF-8"
+    invoice = client.get(f"/api/v1/invoices/{invoice_id}").json()
+    assert invoice["total_paid"] == "200.00"
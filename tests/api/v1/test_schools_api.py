@@ -42,3 +42,17 @@ def test_delete_school(client: TestClient) -> None:
 
     missing_resp = client.get(f"/api/v1/schools/{school['id']}")
     assert missing_resp.status_code == 404
+
+
+def test_get_school_supports_conditional_requests(client: TestClient) -> None:
+    school = create_school(client)
+    response = client.get(f"/api/v1/schools/{school['id']}")
+    etag = response.headers["ETag"]
+
+    cached = client.get(f"/api/v1/schools/{school['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    client.put(f"/api/v1/schools/{school['id']}", json={"address": "Main St"})
+    changed = client.get(f"/api/v1/schools/{school['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
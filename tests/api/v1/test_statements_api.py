@@ -1,5 +1,8 @@
 from fastapi.testclient import TestClient
 
+from app.core.db import get_async_read_db
+from app.main import app
+
 
 def create_school(client: TestClient, name: str = "Statement School") -> int:
     response = client.post("/api/v1/schools", json={"name": name})
@@ -71,3 +74,34 @@ def test_student_statement(client: TestClient) -> None:
     assert student_statement.status_code == 200
     assert student_statement.json()["total_invoiced"] == "1000.00"
     assert student_statement.json()["total_paid"] == "400.00"
+
+
+def test_renames_invalidate_cached_statements(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+    create_invoice(client, school_id, student_id)
+    school_url = f"/api/v1/schools/{school_id}/statement"
+    student_url = f"/api/v1/students/{student_id}/statement"
+    assert client.get(school_url).json()["invoices"][0]["student_name"] == "Lia Ortega"
+    assert client.get(student_url).json()["school_name"] == "Statement School"
+
+    client.put(f"/api/v1/students/{student_id}", json={"last_name": "Ruiz"})
+    client.put(f"/api/v1/schools/{school_id}", json={"name": "Renamed School"})
+
+    assert client.get(school_url).json()["invoices"][0]["student_name"] == "Lia Ruiz"
+    student_statement = client.get(student_url).json()
+    assert student_statement["student_name"] == "Lia Ruiz"
+    assert student_statement["school_name"] == "Renamed School"
+
+
+def test_statements_are_built_on_the_primary(client: TestClient) -> None:
+    school_id = create_school(client)
+    student_id = create_student(client, school_id)
+
+    async def replica_unavailable():
+        raise AssertionError("statements must not be built on the replica")
+        yield
+
+    app.dependency_overrides[get_async_read_db] = replica_unavailable
+    assert client.get(f"/api/v1/schools/{school_id}/statement").status_code == 200
+    assert client.get(f"/api/v1/students/{student_id}/statement").status_code == 200
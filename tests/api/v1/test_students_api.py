@@ -59,3 +59,122 @@ def test_delete_student(client: TestClient) -> None:
 
     missing_resp = client.get(f"/api/v1/students/{student['id']}")
     assert missing_resp.status_code == 404
+
+
+def test_list_students_with_cursor(client: TestClient) -> None:
+    school_id = create_school(client)
+    created = [create_student(client, school_id)["id"] for _ in range(3)]
+
+    first = client.get(f"/api/v1/students?school_id={school_id}&limit=2&total=none").json()
+    assert first["total"] is None
+    assert [item["id"] for item in first["items"]] == created[:2]
+
+    second = client.get(
+        f"/api/v1/students?school_id={school_id}&limit=2&cursor={first['next_cursor']}"
+    ).json()
+    assert [item["id"] for item in second["items"]] == created[2:]
+    assert second["next_cursor"] is None
+
+    bad = client.get("/api/v1/students?cursor=garbage")
+    assert bad.status_code == 400
+
+
+def test_bulk_upsert_students_by_external_id(client: TestClient) -> None:
+    school = client.post(
+        "/api/v1/schools", json={"name": "SIS School", "external_id": "sis-1"}
+    ).json()
+    def row(external_id: str, first_name: str, school: str = "sis-1") -> dict:
+        return {
+            "school_external_id": school,
+            "external_id": external_id,
+            "first_name": first_name,
+            "last_name": "Lopez",
+        }
+
+    roster = [row("s-1", "Ana"), row("s-2", "Luis")]
+    first = client.put("/api/v1/students/bulk", json={"students": roster})
+    assert first.status_code == 200
+    assert first.json() == {"created": 2, "updated": 0, "unchanged": 0, "errors": []}
+
+    roster[1] = {**roster[1], "status": "inactive"}
+    second = client.put(
+        "/api/v1/students/bulk",
+        json={
+            "students": roster
+            + [
+                {**roster[0], "first_name": "Dup"},
+                row("s-3", "Eva", school="unknown"),
+            ]
+        },
+    ).json()
+
+    assert (second["created"], second["updated"], second["unchanged"]) == (0, 1, 1)
+    assert [error["index"] for error in second["errors"]] == [2, 3]
+    students = client.get(f"/api/v1/students?school_id={school['id']}").json()["items"]
+    assert {(s["external_id"], s["first_name"], s["status"]) for s in students} == {
+        ("s-1", "Ana", "active"),
+        ("s-2", "Luis", "inactive"),
+    }
+
+
+def test_bulk_upsert_students_rejects_ambiguous_school_external_id(client: TestClient) -> None:
+    for name in ("SIS North", "SIS South"):
+        client.post("/api/v1/schools", json={"name": name, "external_id": "sis-shared"})
+    row = {
+        "school_external_id": "sis-shared",
+        "external_id": "s-1",
+        "first_name": "Ana",
+        "last_name": "Lopez",
+    }
+
+    response = client.put("/api/v1/students/bulk", json={"students": [row]})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["created"], payload["updated"], payload["unchanged"]) == (0, 0, 0)
+    assert payload["errors"] == [
+        {"index": 0, "message": "School external_id sis-shared matches several schools"}
+    ]
+
+
+def test_search_students_by_partial_name(client: TestClient) -> None:
+    school_id = create_school(client)
+    student = create_student(client, school_id)
+
+    response = client.get(f"/api/v1/students/search?q=lop&school_id={school_id}")
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [student["id"]]
+
+    assert client.get("/api/v1/students/search?q=a").status_code == 422
+
+
+def test_get_students_batch_by_ids_and_external_ids(client: TestClient) -> None:
+    school_id = create_school(client)
+    first = create_student(client, school_id)
+    second = create_student(client, school_id)
+    client.put(f"/api/v1/students/{second['id']}", json={"external_id": "STU-2"})
+
+    by_id = client.get(f"/api/v1/students/batch?ids={second['id']},999999,{first['id']}")
+    assert by_id.status_code == 200
+    assert [item["id"] for item in by_id.json()["items"]] == [second["id"], first["id"]]
+    assert by_id.json()["missing"] == [999999]
+
+    by_external_id = client.get(
+        f"/api/v1/students/batch?external_ids=STU-2,STU-9&school_id={school_id}"
+    )
+    assert [item["id"] for item in by_external_id.json()["items"]] == [second["id"]]
+    assert by_external_id.json()["missing"] == ["STU-9"]
+
+    assert client.get("/api/v1/students/batch").status_code == 400
+    assert client.get("/api/v1/students/batch?ids=1,x").status_code == 400
+
+
+def test_student_sparse_fieldsets(client: TestClient) -> None:
+    school_id = create_school(client)
+    student = create_student(client, school_id)
+
+    page = client.get(f"/api/v1/students?school_id={school_id}&fields=last_name")
+    assert page.json()["items"] == [{"id": student["id"], "last_name": "Lopez"}]
+
+    detail = client.get(f"/api/v1/students/{student['id']}?fields=first_name,status")
+    assert detail.json() == {"id": student["id"], "first_name": "Ana", "status": "active"}
@@ -1,13 +1,25 @@
+from collections.abc import Iterator
 from datetime import date, datetime
 from decimal import Decimal
+from pathlib import Path
 
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
-from sqlalchemy.pool import StaticPool
-
-from app.core.db import Base, get_db
+from sqlalchemy.pool import NullPool
+
+from app.core import async_cache, cache
+from app.core.db import (
+    Base,
+    get_async_db,
+    get_async_read_db,
+    get_async_session_factory,
+    get_db,
+    get_read_db,
+)
 from app.core.config import settings
 from app.main import app
 from app.models.invoice import Invoice
@@ -16,46 +28,76 @@ from app.models.school import School
 from app.models.student import Student
 
 
-def create_test_session() -> Session:
-    engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        future=True,
-    )
-    Base.metadata.create_all(engine)
-    return Session(engine)
+@pytest.fixture()
+def database_path(tmp_path: Path) -> Path:
+    # A file rather than :memory: so the sync and async engines share it
+    return tmp_path / "test.db"
 
 
 @pytest.fixture()
-def db_session() -> Session:
-    session = create_test_session()
+def db_session(database_path: Path) -> Session:
+    engine: Engine = create_engine(f"sqlite+pysqlite:///{database_path}", future=True)
+    Base.metadata.create_all(engine)
+    session = Session(engine)
     try:
         yield session
     finally:
         session.close()
+        engine.dispose()
 
 
 @pytest.fixture()
-def client(db_session: Session) -> TestClient:
+def client(db_session: Session, database_path: Path) -> TestClient:
     def override_get_db() -> Session:
         try:
             yield db_session
         finally:
             pass
 
+    # Async endpoints read through their own connections, so they only
+    # see what the test session has committed
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db() -> AsyncSession:
+        async with async_session_factory() as session:
+            yield session
+
+    # No replica in tests: read dependencies share the primary's sessions
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: async_session_factory
     with TestClient(app) as test_client:
         test_client.headers.update({"X-API-Key": settings.api_key})
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def redis_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[fakeredis.FakeRedis]:
+    """Point the cache layer at an in-process fake Redis for each test."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(cache, "_redis_client", client)
+    monkeypatch.setattr(
+        async_cache,
+        "_async_redis_client",
+        fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    )
+    cache.clear_local_cache()
+    yield client
+    cache.clear_local_cache()
+
+
 @pytest.fixture()
 def school(db_session: Session) -> School:
     school = School(name="Mattilda Academy")
     db_session.add(school)
-    db_session.flush()
+    db_session.commit()
     return school
 
 
@@ -67,7 +109,7 @@ def student(db_session: Session, school: School) -> Student:
         last_name="Lopez",
     )
     db_session.add(student)
-    db_session.flush()
+    db_session.commit()
     return student
 
 
@@ -82,7 +124,7 @@ def invoice(db_session: Session, school: School, student: Student) -> Invoice:
         currency="MXN",
     )
     db_session.add(invoice)
-    db_session.flush()
+    db_session.commit()
     return invoice
 
 
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from app.core import async_cache
+from app.core.cache import cache_get, cache_get_entry, cache_set, clear_local_cache
+from app.core.config import settings
+
+
+def test_async_entries_are_shared_with_sync_cache(redis_client: fakeredis.FakeRedis) -> None:
+    async def scenario() -> None:
+        await async_cache.cache_set_async("cache:shared", {"total": 1})
+        cache_set("cache:from-sync", {"total": 2})
+        clear_local_cache()
+        assert await async_cache.cache_get_async("cache:from-sync") == {"total": 2}
+
+    asyncio.run(scenario())
+
+    assert cache_get("cache:shared") == {"total": 1}
+
+
+def test_concurrent_async_misses_build_once(redis_client: fakeredis.FakeRedis) -> None:
+    calls = 0
+
+    async def loader() -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"total": calls}
+
+    async def scenario() -> list:
+        return await asyncio.gather(
+            *(async_cache.cache_get_or_compute_async("cache:coalesced", loader) for _ in range(10))
+        )
+
+    entries = asyncio.run(scenario())
+
+    assert calls == 1
+    assert {entry.body for entry in entries} == {entries[0].body}
+
+
+async def _fail_loader() -> dict:
+    pytest.fail("loader should not run")
+
+
+def test_waits_for_builder_in_another_worker(redis_client: fakeredis.FakeRedis) -> None:
+    lock = redis_client.lock("cache:lock:k", timeout=5, thread_local=False)
+    assert lock.acquire(blocking=False)
+
+    def other_worker_finishes() -> None:
+        time.sleep(0.2)
+        cache_set("k", {"total": 2})
+        lock.release()
+
+    threading.Thread(target=other_worker_finishes).start()
+
+    entry = asyncio.run(async_cache.cache_get_or_compute_async("k", _fail_loader))
+    assert entry.value == {"total": 2}
+
+
+def test_crashed_lock_holder_does_not_block_readers(
+    redis_client: fakeredis.FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "cache_lock_wait", 0.3)
+    # Held by a worker that died without releasing it or storing a value
+    redis_client.set("cache:lock:k", "dead-token", px=60_000)
+
+    async def loader() -> dict:
+        return {"total": 3}
+
+    start = time.monotonic()
+    entry = asyncio.run(async_cache.cache_get_or_compute_async("k", loader))
+    assert entry.value == {"total": 3}
+    assert time.monotonic() - start < 2
+
+
+def test_stale_entry_is_served_and_refreshed(redis_client: fakeredis.FakeRedis) -> None:
+    cache_set("k", {"total": 1}, ttl=60, soft_ttl=0)
+    scheduled = []
+
+    async def loader() -> dict:
+        return {"total": 2}
+
+    async def serve_then_refresh():
+        entry = await async_cache.cache_get_or_compute_async(
+            "k", loader, ttl=60, soft_ttl=30, on_stale=lambda: scheduled.append(1)
+        )
+        await async_cache.refresh_cache_entry_async("k", loader, ttl=60, soft_ttl=30)
+        return entry
+
+    entry = asyncio.run(serve_then_refresh())
+    assert entry.value == {"total": 1}
+    assert entry.is_stale
+    assert scheduled == [1]
+
+    entry = cache_get_entry("k")
+    assert entry.value == {"total": 2}
+    assert not entry.is_stale
+    assert 0 < redis_client.ttl("k") <= 60
+
+
+def test_refresh_is_skipped_while_another_worker_holds_the_lock(
+    redis_client: fakeredis.FakeRedis,
+) -> None:
+    cache_set("k", {"total": 1}, ttl=60, soft_ttl=0)
+    redis_client.set("cache:lock:k", "other-worker", px=60_000)
+
+    asyncio.run(async_cache.refresh_cache_entry_async("k", _fail_loader, ttl=60))
+
+    assert cache_get("k") == {"total": 1}
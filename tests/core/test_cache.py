@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.core.async_cache import build_cache_key_async
+from app.core.cache import (
+    bump_cache_versions,
+    cache_get,
+    cache_set,
+    get_cache_versions,
+    school_scope,
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from app.core.config import settings
+from app.models.school import School
+
+
+def make_request(path: str, query_string: str = "") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query_string.encode(),
+            "headers": [],
+        }
+    )
+
+
+def test_bump_changes_key_without_touching_entries(redis_client: fakeredis.FakeRedis) -> None:
+    request = make_request("/api/v1/schools/1/statement")
+
+    async def keys_around_bump() -> tuple[str, str]:
+        old_key = await build_cache_key_async(request, school_scope(1))
+        cache_set(old_key, {"total": 1})
+        bump_cache_versions(school_scope(1))
+        return old_key, await build_cache_key_async(request, school_scope(1))
+
+    old_key, new_key = asyncio.run(keys_around_bump())
+
+    assert new_key != old_key
+    assert cache_get(new_key) is None
+    assert cache_get(old_key) == {"total": 1}
+    assert get_cache_versions(school_scope(1), school_scope(2)) == [1, 0]
+
+
+def test_cache_key_includes_sorted_query_params(redis_client: fakeredis.FakeRedis) -> None:
+    async def keys() -> list[str]:
+        return [
+            await build_cache_key_async(make_request("/x", query), school_scope(1))
+            for query in ("b=2&a=1", "a=1&b=2")
+        ]
+
+    first, second = asyncio.run(keys())
+    assert first == second
+
+
+def test_payment_invalidates_cached_statement(
+    client: TestClient, redis_client: fakeredis.FakeRedis
+) -> None:
+    school_id = client.post("/api/v1/schools", json={"name": "Cache School"}).json()["id"]
+    student_id = client.post(
+        "/api/v1/students",
+        json={"school_id": school_id, "first_name": "Eva", "last_name": "Ruiz"},
+    ).json()["id"]
+    invoice_id = client.post(
+        "/api/v1/invoices",
+        json={
+            "school_id": school_id,
+            "student_id": student_id,
+            "issue_date": "2026-01-01",
+            "due_date": "2026-01-10",
+            "amount": "500.00",
+        },
+    ).json()["id"]
+
+    assert client.get(f"/api/v1/schools/{school_id}/statement").json()["total_paid"] == "0.00"
+    assert client.get(f"/api/v1/students/{student_id}/statement").json()["total_paid"] == "0.00"
+    assert len(redis_client.keys("cache:GET:*")) == 2
+
+    client.post(
+        "/api/v1/payments",
+        json={
+            "invoice_id": invoice_id,
+            "paid_at": "2026-01-05T10:00:00",
+            "amount": "100.00",
+            "method": "card",
+        },
+    )
+
+    assert client.get(f"/api/v1/schools/{school_id}/statement").json()["total_paid"] == "100.00"
+    assert client.get(f"/api/v1/students/{student_id}/statement").json()["total_paid"] == "100.00"
+
+
+def test_local_tier_serves_hits_without_redis(
+    redis_client: fakeredis.FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "local_cache_enabled", True)
+    request = make_request("/api/v1/schools/1/statement")
+
+    async def keys_around_flush() -> tuple[str, str]:
+        key = await build_cache_key_async(request, school_scope(1))
+        cache_set(key, {"total": 1})
+        redis_client.flushall()
+        return key, await build_cache_key_async(request, school_scope(1))
+
+    key, key_after_flush = asyncio.run(keys_around_flush())
+
+    assert key_after_flush == key
+    assert cache_get(key) == {"total": 1}
+
+
+def test_local_tier_follows_versions_published_by_other_workers(
+    redis_client: fakeredis.FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "local_cache_enabled", True)
+    request = make_request("/api/v1/schools/1/statement")
+
+    async def wait_for_new_key() -> None:
+        old_key = await build_cache_key_async(request, school_scope(1))
+        # Another worker bumps the version and publishes it
+        redis_client.incr("cache:version:school:1")
+        redis_client.publish(settings.cache_invalidation_channel, json.dumps({"school:1": 1}))
+
+        deadline = time.monotonic() + 5
+        while await build_cache_key_async(request, school_scope(1)) == old_key:
+            assert time.monotonic() < deadline, "invalidation was not applied"
+            await asyncio.sleep(0.05)
+
+    start_invalidation_listener()
+    try:
+        asyncio.run(wait_for_new_key())
+    finally:
+        stop_invalidation_listener()
+
+
+def test_statement_response_reports_age(
+    client: TestClient, redis_client: fakeredis.FakeRedis
+) -> None:
+    school_id = client.post("/api/v1/schools", json={"name": "Age School"}).json()["id"]
+
+    first = client.get(f"/api/v1/schools/{school_id}/statement")
+    second = client.get(f"/api/v1/schools/{school_id}/statement")
+
+    assert first.headers["Age"] == "0"
+    assert int(second.headers["Age"]) >= 0
+    assert second.json() == first.json()
+
+
+def test_stale_statement_is_served_then_refreshed_in_background(
+    client: TestClient,
+    db_session: Session,
+    redis_client: fakeredis.FakeRedis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "statement_cache_soft_ttl", 0)
+    school_id = client.post("/api/v1/schools", json={"name": "Old Name"}).json()["id"]
+    assert client.get(f"/api/v1/schools/{school_id}/statement").json()["school_name"] == "Old Name"
+
+    # A write outside the services does not bump the statement version
+    db_session.execute(update(School).where(School.id == school_id).values(name="New Name"))
+    db_session.commit()
+
+    stale = client.get(f"/api/v1/schools/{school_id}/statement")
+    assert stale.json()["school_name"] == "Old Name"
+    refreshed = client.get(f"/api/v1/schools/{school_id}/statement")
+    assert refreshed.json()["school_name"] == "New Name"
+
+
+def test_statement_hits_are_served_with_etag_and_304(
+    client: TestClient, redis_client: fakeredis.FakeRedis
+) -> None:
+    school_id = client.post("/api/v1/schools", json={"name": "ETag School"}).json()["id"]
+    first = client.get(f"/api/v1/schools/{school_id}/statement")
+    etag = first.headers["ETag"]
+
+    (key,) = redis_client.keys("cache:GET:*")
+    # Conditional requests only read the ETag field, never the body
+    redis_client.hdel(key, "body")
+    not_modified = client.get(
+        f"/api/v1/schools/{school_id}/statement", headers={"If-None-Match": etag}
+    )
+
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import db
+from app.core.config import settings
+from app.core.db import ReplicaLagGuard, TimedQueuePool, engine_options, pool_status
+from app.core.metrics import get_pool_checkout_stats
+
+
+def test_postgres_engines_get_pool_and_session_timeouts() -> None:
+    sync = engine_options("postgresql+psycopg2://u:p@db/app", "sync")
+    async_ = engine_options("postgresql+asyncpg://u:p@db/app", "async")
+
+    assert sync["pool_pre_ping"] is True
+    assert "-c statement_timeout=" in sync["connect_args"]["options"]
+    assert "idle_in_transaction_session_timeout" in async_["connect_args"]["server_settings"]
+    assert engine_options("sqlite+pysqlite:///:memory:", "sync") == {}
+
+
+def test_pool_records_checkout_waits_and_timeouts(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_logging_name="test-pool",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    stats = get_pool_checkout_stats()["test-pool"]
+    assert stats["count"] >= 2
+    assert stats["timeouts"] >= 1
+    assert stats["wait_ms_max"] >= 50
+    assert pool_status(engine.pool)["checked_out"] == 1
+    held.close()
+    engine.dispose()
+
+
+def test_metrics_expose_pool_state(client: TestClient) -> None:
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert set(response.json()["db_pools"]) == {"sync", "async"}
+
+
+@pytest.fixture()
+def replica(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Stand in a SQLite "replica" reporting a configurable lag."""
+    replica_engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(db, "read_engine", replica_engine)
+    monkeypatch.setattr(db, "ReadSessionLocal", sessionmaker(bind=replica_engine))
+    monkeypatch.setattr(db, "replica_guard", ReplicaLagGuard())
+
+    def set_lag(sql: str) -> None:
+        monkeypatch.setattr(db, "REPLICA_LAG_SQL", text(sql))
+
+    yield replica_engine, set_lag
+    replica_engine.dispose()
+
+
+def _read_session_bind():
+    generator = db.get_read_db()
+    session = next(generator)
+    bind = session.get_bind()
+    generator.close()
+    return bind
+
+
+def test_reads_use_replica_within_lag_threshold(replica) -> None:
+    replica_engine, set_lag = replica
+    set_lag("SELECT 0.5")
+
+    assert _read_session_bind() is replica_engine
+    assert db.replica_guard.lag == 0.5
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_primary(
+    replica, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, set_lag = replica
+    monkeypatch.setattr(settings, "replica_lag_check_interval", 0.0)
+
+    set_lag(f"SELECT {settings.replica_max_lag_seconds + 1}")
+    assert _read_session_bind() is db.engine
+
+    set_lag("SELECT no_such_column")
+    assert _read_session_bind() is db.engine
+    assert db.replica_guard.lag is None
+
+
+def test_lag_is_checked_once_per_interval(replica) -> None:
+    _, set_lag = replica
+    set_lag("SELECT 0")
+    assert db.replica_guard.check() is True
+
+    set_lag(f"SELECT {settings.replica_max_lag_seconds + 1}")
+    assert db.replica_guard.check() is True
@@ -0,0 +1,169 @@
+import json
+import threading
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.idempotency import _completed_record, _fingerprint
+from app.models.invoice import Invoice
+
+
+def payment_body(invoice: Invoice, amount: str = "200.00") -> bytes:
+    return json.dumps(
+        {
+            "invoice_id": invoice.id,
+            "paid_at": "2026-01-05T10:00:00",
+            "amount": amount,
+            "method": "transfer",
+        }
+    ).encode()
+
+
+def post_payment(client: TestClient, body: bytes, key: str):
+    return client.post(
+        "/api/v1/payments",
+        content=body,
+        headers={"Content-Type": "application/json", "Idempotency-Key": key},
+    )
+
+
+def test_retry_replays_stored_response(client: TestClient, invoice: Invoice) -> None:
+    first = post_payment(client, payment_body(invoice), "retry-1")
+    second = post_payment(client, payment_body(invoice), "retry-1")
+
+    assert first.status_code == second.status_code == 201
+    assert second.content == first.content
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    payments = client.get("/api/v1/payments", params={"invoice_id": invoice.id}).json()
+    assert payments["total"] == 1
+
+
+def test_rejections_are_replayed_too(client: TestClient, invoice: Invoice) -> None:
+    body = payment_body(invoice, amount="5000.00")
+
+    first = post_payment(client, body, "overpay")
+    second = post_payment(client, body, "overpay")
+
+    assert first.status_code == second.status_code == 422
+    assert second.content == first.content
+
+
+def test_key_reuse_with_different_body_is_rejected(client: TestClient, invoice: Invoice) -> None:
+    post_payment(client, payment_body(invoice), "reused")
+
+    response = post_payment(client, payment_body(invoice, amount="100.00"), "reused")
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+def test_requests_without_key_are_not_deduplicated(client: TestClient, invoice: Invoice) -> None:
+    for _ in range(2):
+        response = client.post("/api/v1/payments", content=payment_body(invoice))
+        assert response.status_code == 201
+
+    payments = client.get("/api/v1/payments", params={"invoice_id": invoice.id}).json()
+    assert payments["total"] == 2
+
+
+def test_duplicate_waits_for_in_flight_request(
+    client: TestClient, invoice: Invoice, redis_client: fakeredis.FakeRedis
+) -> None:
+    body = payment_body(invoice)
+    record_key = "idempotency:POST:/api/v1/payments:in-flight"
+    fingerprint = _fingerprint(body)
+    redis_client.set(record_key, json.dumps({"state": "in_progress", "fingerprint": fingerprint}))
+    stored = _completed_record(
+        fingerprint, 201, [(b"content-type", b"application/json")], b'{"id": 42}'
+    )
+    finisher = threading.Timer(0.2, redis_client.set, args=(record_key, stored))
+    finisher.start()
+
+    response = post_payment(client, body, "in-flight")
+    finisher.join()
+
+    assert response.status_code == 201
+    assert response.content == b'{"id": 42}'
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+
+def test_duplicate_gives_up_after_wait(
+    client: TestClient,
+    invoice: Invoice,
+    redis_client: fakeredis.FakeRedis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "idempotency_wait", 0.1)
+    body = payment_body(invoice)
+    redis_client.set(
+        "idempotency:POST:/api/v1/payments:stuck",
+        json.dumps({"state": "in_progress", "fingerprint": _fingerprint(body)}),
+    )
+
+    response = post_payment(client, body, "stuck")
+
+    assert response.status_code == 409
+    assert response.json()["error"]["code"] == "CONFLICT"
+
+
+def test_stored_response_is_not_replayed_without_valid_api_key(
+    client: TestClient, invoice: Invoice
+) -> None:
+    body = payment_body(invoice)
+    post_payment(client, body, "auth-replay")
+
+    response = client.post(
+        "/api/v1/payments",
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "Idempotency-Key": "auth-replay",
+            "X-API-Key": "wrong",
+        },
+    )
+
+    assert response.status_code == 401
+    assert "Idempotent-Replayed" not in response.headers
+    assert "invoice_id" not in response.text
+
+
+def test_unauthorized_attempt_does_not_consume_key(
+    client: TestClient, invoice: Invoice, redis_client: fakeredis.FakeRedis
+) -> None:
+    body = payment_body(invoice)
+    rejected = client.post(
+        "/api/v1/payments",
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "Idempotency-Key": "auth-retry",
+            "X-API-Key": "wrong",
+        },
+    )
+    assert rejected.status_code == 401
+    assert not redis_client.keys("idempotency:*auth-retry")
+
+    retried = post_payment(client, body, "auth-retry")
+
+    assert retried.status_code == 201
+    assert "Idempotent-Replayed" not in retried.headers
+
+
+def test_auth_failures_from_endpoint_are_released(
+    client: TestClient,
+    invoice: Invoice,
+    redis_client: fakeredis.FakeRedis,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Credentials rejected by the endpoint itself (e.g. the key was rotated
+    # mid-request) must not be stored against the Idempotency-Key either
+    monkeypatch.setattr("app.core.idempotency._authenticated", lambda request: True)
+    client.headers["X-API-Key"] = "rotated"
+
+    response = post_payment(client, payment_body(invoice), "auth-released")
+
+    assert response.status_code == 401
+    assert not redis_client.keys("idempotency:*auth-released")
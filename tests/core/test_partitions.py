@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Session
+
+from app.core.partitions import ensure_partitions, partitioned_tables
+
+
+def test_payments_declare_their_partition_key() -> None:
+    assert {table.name: table.info["partition_key"] for table in partitioned_tables()} == {
+        "payments": "paid_at"
+    }
+
+
+def test_ensure_partitions_is_a_no_op_outside_postgres(db_session: Session) -> None:
+    assert ensure_partitions(db_session) == {}
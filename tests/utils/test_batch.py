@@ -0,0 +1,67 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.models.school import School
+from app.models.student import Student
+from app.utils.batch import batch_key, get_batch_async, parse_keys
+
+
+def test_parse_keys_keeps_first_occurrence_order() -> None:
+    assert parse_keys(None) is None
+    assert parse_keys("3, 1,,3,2", int) == [3, 1, 2]
+    assert parse_keys("a,b") == ["a", "b"]
+
+
+@pytest.mark.parametrize("raw", ["", " , ", "1,x"])
+def test_parse_keys_rejects_invalid_input(raw: str) -> None:
+    with pytest.raises(ValidationError):
+        parse_keys(raw, int)
+
+
+def test_parse_keys_caps_the_number_of_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "batch_lookup_max_keys", 2)
+
+    with pytest.raises(ValidationError, match="At most 2"):
+        parse_keys("1,2,3", int)
+
+
+def test_batch_key_requires_exactly_one_key_list() -> None:
+    assert batch_key(School, None, ["x"]) == (School.external_id, ["x"])
+    with pytest.raises(ValidationError):
+        batch_key(School, None, None)
+    with pytest.raises(ValidationError):
+        batch_key(School, [1], ["x"])
+
+
+def test_get_batch_preserves_order_in_one_query(
+    db_session: Session, database_path: Path, school: School, student: Student
+) -> None:
+    other = School(name="Other School", external_id="SCH-2")
+    db_session.add(other)
+    db_session.commit()
+    keys = [other.id, 999, school.id]
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+
+    async def fetch() -> dict:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            async with AsyncSession(engine) as session:
+                return await get_batch_async(session, School.id, keys)
+        finally:
+            await engine.dispose()
+
+    result = asyncio.run(fetch())
+
+    assert [item.id for item in result["items"]] == [keys[0], keys[2]]
+    assert result["missing"] == [999]
+    assert len(statements) == 1
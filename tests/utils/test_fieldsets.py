@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import ValidationError
+from app.models.invoice import Invoice
+from app.schemas.invoice import InvoiceRead
+from app.utils.fieldsets import load_fields, parse_fields, partial_schema
+
+
+def test_parse_fields_orders_by_schema_and_adds_id() -> None:
+    assert parse_fields(None, InvoiceRead) is None
+    assert parse_fields("status, amount,due_date", InvoiceRead) == [
+        "due_date",
+        "amount",
+        "status",
+        "id",
+    ]
+
+
+def test_parse_fields_rejects_unknown_fields() -> None:
+    with pytest.raises(ValidationError, match="Unknown fields: secret"):
+        parse_fields("amount,secret", InvoiceRead)
+
+
+def test_partial_schema_serializes_like_the_full_schema(invoice: Invoice) -> None:
+    fields = ["amount", "status", "id"]
+    schema = partial_schema(InvoiceRead, fields)
+
+    assert schema is partial_schema(InvoiceRead, fields)
+    assert partial_schema(InvoiceRead, None) is InvoiceRead
+    full = InvoiceRead.model_validate(invoice).model_dump(mode="json")
+    assert schema.model_validate(invoice).model_dump(mode="json") == {
+        name: full[name] for name in fields
+    }
+
+
+def test_load_fields_narrows_the_column_projection(db_session: Session, invoice: Invoice) -> None:
+    db_session.expunge_all()
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        loaded = db_session.scalars(load_fields(select(Invoice), ["amount", "id"])).one()
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert loaded.amount == Decimal("1000.00")
+    assert "invoices.description" not in statements[0]
+    assert "description" in inspect(loaded).unloaded
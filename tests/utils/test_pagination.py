@@ -0,0 +1,155 @@
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import bump_cache_versions, school_scope
+from app.core.db import Base
+from app.core.exceptions import ValidationError
+from app.models.invoice import Invoice
+from app.models.school import School
+from app.models.student import Student
+from app.utils import pagination
+from app.utils.pagination import TotalMode, paginate, paginate_async
+
+
+def _seed_invoices(db_session: Session, school: School, student: Student, count: int) -> None:
+    for i in range(count):
+        db_session.add(
+            Invoice(
+                school_id=school.id,
+                student_id=student.id,
+                issue_date=date(2026, 1, 1),
+                # Duplicate due dates exercise the id tie-breaker
+                due_date=date(2026, 1, 10) + timedelta(days=i // 2),
+                amount=Decimal("100.00"),
+            )
+        )
+    db_session.commit()
+
+
+def _walk(db_session: Session, query, limit: int, **kwargs) -> list[int]:
+    seen: list[int] = []
+    cursor = None
+    while True:
+        page = paginate(query, db_session, limit, 0, cursor=cursor, **kwargs)
+        seen.extend(item.id for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_cursor_pages_cover_every_row_once(
+    db_session: Session, school: School, student: Student
+) -> None:
+    _seed_invoices(db_session, school, student, 7)
+    query = select(Invoice)
+
+    ids = _walk(db_session, query, 3)
+
+    assert ids == sorted(db_session.scalars(select(Invoice.id)).all())
+
+
+def test_cursor_pages_by_sort_column_with_id_tie_breaker(
+    db_session: Session, school: School, student: Student
+) -> None:
+    _seed_invoices(db_session, school, student, 7)
+    query = select(Invoice)
+
+    ids = _walk(db_session, query, 2, sort_column=Invoice.due_date, total=TotalMode.none)
+
+    expected = db_session.scalars(select(Invoice.id).order_by(Invoice.due_date, Invoice.id))
+    assert ids == list(expected)
+
+
+def test_total_is_optional(db_session: Session, school: School, student: Student) -> None:
+    _seed_invoices(db_session, school, student, 3)
+
+    assert paginate(select(Invoice), db_session, 2, 0)["total"] == 3
+    assert paginate(select(Invoice), db_session, 2, 0, total=TotalMode.none)["total"] is None
+
+
+def test_invalid_cursor_is_rejected(db_session: Session) -> None:
+    with pytest.raises(ValidationError, match="cursor"):
+        paginate(select(Invoice), db_session, 2, 0, cursor="not-a-cursor")
+
+
+def test_exact_totals_are_cached_until_scope_is_bumped(
+    db_session: Session, school: School, student: Student, redis_client
+) -> None:
+    _seed_invoices(db_session, school, student, 2)
+    query = select(Invoice).where(Invoice.school_id == school.id)
+    scopes = [school_scope(school.id)]
+
+    assert paginate(query, db_session, 10, 0, count_scopes=scopes)["total"] == 2
+
+    # A row inserted without bumping the scope is not seen: the count is cached
+    _seed_invoices(db_session, school, student, 1)
+    assert paginate(query, db_session, 10, 0, count_scopes=scopes)["total"] == 2
+
+    bump_cache_versions(school_scope(school.id))
+    assert paginate(query, db_session, 10, 0, count_scopes=scopes)["total"] == 3
+
+
+def test_cached_totals_are_counted_on_the_primary(
+    db_session: Session,
+    school: School,
+    student: Student,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _seed_invoices(db_session, school, student, 2)
+    # A replica that has not replayed the inserts yet
+    replica_engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(replica_engine)
+    monkeypatch.setattr(
+        pagination, "is_replica_session", lambda db: db.get_bind() is replica_engine
+    )
+    monkeypatch.setattr(pagination, "SessionLocal", sessionmaker(bind=db_session.get_bind()))
+    query = select(Invoice).where(Invoice.school_id == school.id)
+
+    with Session(replica_engine) as replica:
+        page = paginate(query, replica, 10, 0, count_scopes=[school_scope(school.id)])
+
+    assert page["total"] == 2
+    replica_engine.dispose()
+
+
+def test_estimate_falls_back_to_exact_count_on_sqlite(
+    db_session: Session, school: School, student: Student
+) -> None:
+    _seed_invoices(db_session, school, student, 3)
+
+    page = paginate(select(Invoice), db_session, 2, 0, total=TotalMode.estimate)
+
+    assert page["total"] == 3
+
+
+def test_async_pages_match_sync_pages(
+    db_session: Session, database_path: Path, school: School, student: Student
+) -> None:
+    _seed_invoices(db_session, school, student, 5)
+    query = select(Invoice).where(Invoice.school_id == school.id)
+    sync_page = paginate(query, db_session, 2, 0, sort_column=Invoice.due_date)
+
+    async def fetch() -> dict:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+        try:
+            async with AsyncSession(engine) as db:
+                return await paginate_async(
+                    query, db, 2, 0, cursor=sync_page["next_cursor"], sort_column=Invoice.due_date
+                )
+        finally:
+            await engine.dispose()
+
+    async_page = asyncio.run(fetch())
+
+    assert async_page["total"] == sync_page["total"] == 5
+    assert [item.id for item in async_page["items"]] == [
+        item.id for item in paginate(query, db_session, 2, 2, sort_column=Invoice.due_date)["items"]
+    ]